@@ -1,11 +1,10 @@
 """
 API Routes para gerenciamento de designações - Motor de Regras
 """
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Optional, List
-import json
-from pathlib import Path
+from fastapi import APIRouter, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+from typing import Iterable, Optional, List
+from dataclasses import replace
 from uuid import uuid4
 
 from app.models.schemas import (
@@ -14,28 +13,36 @@ from app.models.schemas import (
     ParticipationType,
     PublisherStats
 )
-from app.core.allocator import calculate_stats
+from app.core.stats_store import get_stats_store
+from app.core.repository import participations_repository
+from app.core.executors import WorkerCrashed, run_cpu, run_io
 from app.core.assignment_engine import (
-    generate_assignments,
+    generate_assignments_sync,
+    generate_assignments_range_sync,
+    WeekToSchedule,
+    GeneratedAssignment,
     apply_rigid_filters,
     rank_candidates,
     get_category_for_part,
+    parse_reference_date,
     EngineConfig,
     DEFAULT_CONFIG,
     ApprovalStatus,
     TeachingCategory,
+    SolverMode,
 )
 from app.core.approval_service import (
     get_approval_service,
     ApprovalAction,
+    BulkApprovalAction,
+    BulkInsertError,
+    AssignmentPage,
     StoredAssignment,
+    MAX_PAGE_SIZE,
 )
 
 router = APIRouter()
 
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-PARTICIPATIONS_FILE = DATA_DIR / "participations.json"
-
 
 # ============================================================================
 # MODELOS DE REQUEST/RESPONSE
@@ -48,6 +55,22 @@ class GenerateRequest(BaseModel):
     publishers: List[Publisher]
     participations: List[Participation]
     parts: Optional[List[dict]] = None  # [{"title": str, "type": str, "needsHelper": bool}]
+    solver: SolverMode = SolverMode.GREEDY
+
+
+class BatchWeek(BaseModel):
+    """Semana a ser gerada no modo em lote"""
+    week: str
+    date: str
+    parts: Optional[List[dict]] = None  # mesmo formato de GenerateRequest.parts
+
+
+class GenerateBatchRequest(BaseModel):
+    """Request para gerar designações de várias semanas"""
+    weeks: List[BatchWeek]
+    publishers: List[Publisher]
+    participations: List[Participation]
+    solver: SolverMode = SolverMode.GREEDY
 
 
 class GeneratedAssignmentResponse(BaseModel):
@@ -65,6 +88,13 @@ class GeneratedAssignmentResponse(BaseModel):
     pairing_reason: Optional[str]
 
 
+class GeneratedWeekResponse(BaseModel):
+    """Resposta com as designações de uma semana gerada em lote"""
+    week: str
+    date: str
+    assignments: List[GeneratedAssignmentResponse]
+
+
 class ApprovalRequest(BaseModel):
     """Request para aprovar/rejeitar designação"""
     action: str  # 'APPROVE' or 'REJECT'
@@ -73,6 +103,15 @@ class ApprovalRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class BulkApprovalRequest(BaseModel):
+    """Request para aprovar/rejeitar/concluir várias designações"""
+    ids: List[str] = Field(min_length=1, max_length=1000)
+    action: str  # 'APPROVE', 'REJECT' or 'COMPLETE'
+    elder_id: str
+    elder_name: str
+    reason: Optional[str] = None
+
+
 class FilterTestRequest(BaseModel):
     """Request para testar filtro"""
     publishers: List[Publisher]
@@ -87,6 +126,7 @@ class RankTestRequest(BaseModel):
     publishers: List[Publisher]
     participations: List[Participation]
     part_title: str
+    date: Optional[str] = None  # data de referência (ISO); hoje se omitida
 
 
 # ============================================================================
@@ -94,21 +134,8 @@ class RankTestRequest(BaseModel):
 # ============================================================================
 
 def load_participations() -> list[Participation]:
-    """Carrega participações do arquivo JSON"""
-    if not PARTICIPATIONS_FILE.exists():
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        PARTICIPATIONS_FILE.write_text("[]", encoding="utf-8")
-        return []
-    
-    data = json.loads(PARTICIPATIONS_FILE.read_text(encoding="utf-8"))
-    return [Participation(**p) for p in data]
-
-
-def save_participations(participations: list[Participation]) -> None:
-    """Salva participações no arquivo JSON"""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    data = [p.model_dump() for p in participations]
-    PARTICIPATIONS_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    """Carrega participações (modelos em cache, recarregados quando o armazenamento muda)"""
+    return participations_repository.all()
 
 
 def get_part_type_enum(part_type_str: str) -> ParticipationType:
@@ -127,6 +154,59 @@ def get_part_type_enum(part_type_str: str) -> ParticipationType:
     return mapping.get(part_type_str.lower(), ParticipationType.MINISTERIO)
 
 
+def build_parts_to_fill(parts: Optional[List[dict]]) -> list:
+    """Converte as partes do request para tuplas do motor (ou usa as partes padrão)"""
+    if parts:
+        return [
+            (p["title"], get_part_type_enum(p.get("type", "ministerio")), p.get("needsHelper", False))
+            for p in parts
+        ]
+    return [
+        ("Leitura da Bíblia", ParticipationType.TESOUROS, False),
+        ("Iniciando conversas", ParticipationType.MINISTERIO, True),
+        ("Cultivando o interesse", ParticipationType.MINISTERIO, True),
+        ("Fazendo discípulos", ParticipationType.MINISTERIO, True),
+    ]
+
+
+def check_meeting_dates(dates: Iterable[str]) -> None:
+    """400 se alguma data de reunião não for ISO (o motor a usa como data de referência)"""
+    for date in dates:
+        try:
+            parse_reference_date(date)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+
+def bulk_insert_failure(e: BulkInsertError) -> HTTPException:
+    """
+    502 com o que já foi gravado e o que não foi: os blocos anteriores à
+    falha ficam no banco, então o cliente não deve simplesmente repetir tudo
+    """
+    return HTTPException(status_code=502, detail={
+        "message": str(e),
+        "stored_ids": [a.id for a in e.stored],
+        "failed_ids": e.failed_ids,
+    })
+
+
+def to_generated_response(r: GeneratedAssignment) -> GeneratedAssignmentResponse:
+    """Converte uma designação do motor para o modelo de resposta"""
+    return GeneratedAssignmentResponse(
+        part_title=r.part_title,
+        part_type=r.part_type.value if hasattr(r.part_type, 'value') else str(r.part_type),
+        teaching_category=r.category.value if hasattr(r.category, 'value') else str(r.category),
+        principal_name=r.principal_name,
+        principal_id=r.principal_id,
+        secondary_name=r.secondary_name,
+        secondary_id=r.secondary_id,
+        status=r.status.value if hasattr(r.status, 'value') else str(r.status),
+        score=r.score,
+        reason=r.reason,
+        pairing_reason=r.pairing_reason
+    )
+
+
 # ============================================================================
 # ENDPOINTS DE PARTICIPAÇÕES
 # ============================================================================
@@ -134,32 +214,25 @@ def get_part_type_enum(part_type_str: str) -> ParticipationType:
 @router.get("/participations")
 async def list_participations() -> list[Participation]:
     """Lista todas as participações"""
-    return load_participations()
+    return await run_io(load_participations)
 
 
 @router.post("/participations")
 async def create_participation(participation: Participation) -> Participation:
     """Cria uma nova participação"""
-    participations = load_participations()
-    
     if not participation.id:
         participation.id = str(uuid4())
     
-    participations.append(participation)
-    save_participations(participations)
+    # Grava e atualiza as estatísticas do publicador
+    await run_io(get_stats_store().insert, participation.model_dump(mode="json"))
     return participation
 
 
 @router.delete("/participations/{participation_id}")
 async def delete_participation(participation_id: str) -> dict:
     """Remove uma participação"""
-    participations = load_participations()
-    
-    for i, p in enumerate(participations):
-        if p.id == participation_id:
-            participations.pop(i)
-            save_participations(participations)
-            return {"message": "Participação removida com sucesso"}
+    if await run_io(get_stats_store().delete, participation_id):
+        return {"message": "Participação removida com sucesso"}
     
     raise HTTPException(status_code=404, detail="Participação não encontrada")
 
@@ -179,59 +252,97 @@ async def generate_schedule(request: GenerateRequest) -> List[GeneratedAssignmen
     3. Cooldown (penalidade por repetição recente)
     4. Pareamento de ajudantes
     5. Verificação de aprovação
+    
+    Com `solver="optimal"`, os titulares da semana são escolhidos por
+    emparelhamento ótimo em vez de parte a parte.
     """
+    check_meeting_dates([request.date])
+    
     try:
         # Partes padrão se não especificadas
-        if request.parts:
-            parts_to_fill = [
-                (p["title"], get_part_type_enum(p.get("type", "ministerio")), p.get("needsHelper", False))
-                for p in request.parts
-            ]
-        else:
-            parts_to_fill = [
-                ("Leitura da Bíblia", ParticipationType.TESOUROS, False),
-                ("Iniciando conversas", ParticipationType.MINISTERIO, True),
-                ("Cultivando o interesse", ParticipationType.MINISTERIO, True),
-                ("Fazendo discípulos", ParticipationType.MINISTERIO, True),
-            ]
+        parts_to_fill = build_parts_to_fill(request.parts)
         
-        results = await generate_assignments(
+        # Motor em processo separado: não bloqueia o event loop (a conversão
+        # para a representação compacta também é feita no worker)
+        results = await run_cpu(
+            generate_assignments_sync,
             week=request.week,
             date=request.date,
             parts_to_fill=parts_to_fill,
             publishers=request.publishers,
             participations=request.participations,
-            config=DEFAULT_CONFIG
+            config=replace(DEFAULT_CONFIG, solver=request.solver)
         )
         
         # Armazenar no serviço de aprovação
         approval_service = get_approval_service()
-        approval_service.store_generated_assignments(
+        await approval_service.store_generated_assignments_async(
             week_id=request.week,
             date=request.date,
             assignments=results
         )
         
-        return [
-            GeneratedAssignmentResponse(
-                part_title=r.part_title,
-                part_type=r.part_type.value if hasattr(r.part_type, 'value') else str(r.part_type),
-                teaching_category=r.category.value if hasattr(r.category, 'value') else str(r.category),
-                principal_name=r.principal_name,
-                principal_id=r.principal_id,
-                secondary_name=r.secondary_name,
-                secondary_id=r.secondary_id,
-                status=r.status.value if hasattr(r.status, 'value') else str(r.status),
-                score=r.score,
-                reason=r.reason,
-                pairing_reason=r.pairing_reason
-            )
-            for r in results
-        ]
+        return [to_generated_response(r) for r in results]
+    except BulkInsertError as e:
+        raise bulk_insert_failure(e)
+    except WorkerCrashed as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate/batch")
+async def generate_schedule_batch(request: GenerateBatchRequest) -> List[GeneratedWeekResponse]:
+    """
+    Gera designações para várias semanas em uma única requisição.
+    
+    As semanas são processadas em ordem cronológica e as escolhas de cada
+    semana entram no histórico usado para a rotação das semanas seguintes.
+    """
+    if not request.weeks:
+        raise HTTPException(status_code=400, detail="Informe ao menos uma semana")
+    check_meeting_dates(w.date for w in request.weeks)
+    
+    try:
+        return await run_schedule_batch(request)
+    except BulkInsertError as e:
+        raise bulk_insert_failure(e)
+    except WorkerCrashed as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def run_schedule_batch(request: GenerateBatchRequest) -> List[GeneratedWeekResponse]:
+    """Gera e armazena as designações de várias semanas (também usado pela fila de tarefas)"""
+    weeks = [
+        WeekToSchedule(week=w.week, date=w.date, parts_to_fill=build_parts_to_fill(w.parts))
+        for w in request.weeks
+    ]
+    
+    # Conversão para a representação compacta e geração no mesmo worker
+    generated = await run_cpu(
+        generate_assignments_range_sync,
+        weeks=weeks,
+        publishers=request.publishers,
+        participations=request.participations,
+        config=replace(DEFAULT_CONFIG, solver=request.solver)
+    )
+    
+    # Armazenar no serviço de aprovação (todas as semanas numa inserção em lote)
+    approval_service = get_approval_service()
+    await approval_service.store_generated_weeks_async(generated)
+    
+    return [
+        GeneratedWeekResponse(
+            week=g.week,
+            date=g.date,
+            assignments=[to_generated_response(r) for r in g.assignments]
+        )
+        for g in generated
+    ]
+
+
 @router.post("/filter-test")
 async def test_filter(request: FilterTestRequest) -> dict:
     """
@@ -240,7 +351,8 @@ async def test_filter(request: FilterTestRequest) -> dict:
     """
     try:
         part_type = get_part_type_enum(request.part_type)
-        result = apply_rigid_filters(
+        result = await run_cpu(
+            apply_rigid_filters,
             publishers=request.publishers,
             part_type=part_type,
             part_title=request.part_title,
@@ -254,6 +366,8 @@ async def test_filter(request: FilterTestRequest) -> dict:
             "rejected_count": len(result.rejected),
             "rejected": [{"id": p.id, "name": p.name, "reason": r} for p, r in result.rejected]
         }
+    except WorkerCrashed as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -266,11 +380,13 @@ async def test_ranking(request: RankTestRequest) -> dict:
     """
     try:
         category = get_category_for_part(request.part_title)
-        ranked = rank_candidates(
+        ranked = await run_cpu(
+            rank_candidates,
             candidates=request.publishers,
             participations=request.participations,
             part_title=request.part_title,
-            category=category
+            category=category,
+            reference_date=parse_reference_date(request.date) if request.date else None
         )
         
         return {
@@ -288,6 +404,8 @@ async def test_ranking(request: RankTestRequest) -> dict:
                 for r in ranked
             ]
         }
+    except WorkerCrashed as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -296,47 +414,78 @@ async def test_ranking(request: RankTestRequest) -> dict:
 # ENDPOINTS DE APROVAÇÃO
 # ============================================================================
 
+def set_next_cursor(response: Response, page: AssignmentPage) -> None:
+    """Cursor da próxima página no cabeçalho (o corpo continua sendo a lista)"""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+
+
 @router.get("/pending")
-async def list_pending_approvals() -> List[dict]:
-    """Lista todas as designações pendentes de aprovação"""
+async def list_pending_approvals(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+) -> List[dict]:
+    """
+    Lista as designações pendentes de aprovação, por semana.
+    Sem `limit`, devolve todas. Com `limit`, paginada: a próxima página é
+    pedida com ?cursor=<X-Next-Cursor>.
+    """
     service = get_approval_service()
-    pending = service.get_pending_approvals()
+    try:
+        page = await service.list_pending_page_async(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, page)
     
     return [
         {
-            "id": a.id,
-            "week_id": a.week_id,
-            "part_title": a.part_title,
-            "principal_name": a.principal_publisher_name,
-            "secondary_name": a.secondary_publisher_name,
-            "status": a.status.value if hasattr(a.status, 'value') else str(a.status),
-            "selection_reason": a.selection_reason,
-            "created_at": a.created_at
+            "id": row["id"],
+            "week_id": row["week_id"],
+            "part_title": row["part_title"],
+            "principal_name": row["principal_publisher_name"],
+            "secondary_name": row["secondary_publisher_name"],
+            "status": row["status"],
+            "selection_reason": row["selection_reason"],
+            "created_at": row["created_at"]
         }
-        for a in pending
+        for row in page.rows
     ]
 
 
 @router.get("/week/{week_id}")
-async def list_week_assignments(week_id: str) -> List[dict]:
-    """Lista todas as designações de uma semana"""
+async def list_week_assignments(
+    week_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+) -> List[dict]:
+    """
+    Lista as designações de uma semana, em ordem de criação.
+    Sem `limit`, devolve todas. Com `limit`, paginada: a próxima página é
+    pedida com ?cursor=<X-Next-Cursor>.
+    """
     service = get_approval_service()
-    assignments = service.get_assignments_by_week(week_id)
+    try:
+        page = await service.list_week_page_async(week_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor(response, page)
     
     return [
         {
-            "id": a.id,
-            "part_title": a.part_title,
-            "part_type": a.part_type,
-            "principal_name": a.principal_publisher_name,
-            "secondary_name": a.secondary_publisher_name,
-            "status": a.status.value if hasattr(a.status, 'value') else str(a.status),
-            "score": a.score,
-            "selection_reason": a.selection_reason,
-            "approved_by": a.approved_by_elder_name,
-            "rejection_reason": a.rejection_reason
+            "id": row["id"],
+            "part_title": row["part_title"],
+            "part_type": row["part_type"],
+            "principal_name": row["principal_publisher_name"],
+            "secondary_name": row["secondary_publisher_name"],
+            "status": row["status"],
+            "score": row["score"],
+            "selection_reason": row["selection_reason"],
+            "approved_by": row["approved_by_elder_name"],
+            "rejection_reason": row["rejection_reason"]
         }
-        for a in assignments
+        for row in page.rows
     ]
 
 
@@ -362,12 +511,7 @@ async def approve_assignment(assignment_id: str, request: ApprovalRequest) -> di
             reason=request.reason
         )
         
-        result = service.process_approval(
-            action=action,
-            publishers=[],  # TODO: passar lista real se necessário para regeneração
-            participations=[],
-            parts_to_fill=[]
-        )
+        result = await service.process_approval_async(action)
         
         return {
             "id": result.id,
@@ -380,11 +524,49 @@ async def approve_assignment(assignment_id: str, request: ApprovalRequest) -> di
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.patch("/approve")
+async def approve_assignments_bulk(request: BulkApprovalRequest) -> dict:
+    """
+    Aplica a mesma ação a várias designações (ex.: uma semana ou um mês).
+    Só mudam as que estão num status de origem válido; o resultado de cada id
+    é 'updated', 'invalid_status' (com o status atual), 'not_found' ou 'error'
+    (falha do bloco em que o id foi enviado: pode ser reenviado).
+    """
+    if request.action not in ['APPROVE', 'REJECT', 'COMPLETE']:
+        raise HTTPException(status_code=400, detail="Ação deve ser 'APPROVE', 'REJECT' ou 'COMPLETE'")
+    
+    if request.action == 'REJECT' and not request.reason:
+        raise HTTPException(status_code=400, detail="Motivo é obrigatório para rejeição")
+    
+    try:
+        service = get_approval_service()
+        outcomes = await service.process_bulk_approval_async(BulkApprovalAction(
+            assignment_ids=request.ids,
+            action=request.action,
+            elder_id=request.elder_id,
+            elder_name=request.elder_name,
+            reason=request.reason
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {
+        "updated": sum(1 for o in outcomes if o.outcome == 'updated'),
+        "failed": sum(1 for o in outcomes if o.outcome == 'error'),
+        "results": [
+            {"id": o.assignment_id, "outcome": o.outcome, "status": o.status, "error": o.error}
+            for o in outcomes
+        ]
+    }
+
+
 @router.get("/approval-stats")
 async def get_approval_stats() -> dict:
     """Retorna estatísticas das designações"""
     service = get_approval_service()
-    return service.get_stats()
+    return await service.get_stats_async()
 
 
 # ============================================================================
@@ -393,20 +575,21 @@ async def get_approval_stats() -> dict:
 
 @router.get("/stats")
 async def get_publisher_stats() -> list[PublisherStats]:
-    """Calcula estatísticas de participação dos publicadores"""
-    participations = load_participations()
-    return calculate_stats(participations)
+    """Retorna estatísticas de participação dos publicadores"""
+    return await run_io(lambda: get_stats_store().all())
+
+
+@router.post("/stats/rebuild")
+async def rebuild_publisher_stats() -> dict:
+    """Reconstrói as estatísticas a partir do histórico completo (recuperação)"""
+    count = await run_io(lambda: get_stats_store().rebuild())
+    return {"message": "Estatísticas reconstruídas", "publishers": count}
 
 
 @router.get("/stats/{publisher_id}")
 async def get_publisher_stat(publisher_id: str) -> PublisherStats:
     """Busca estatísticas de um publicador específico"""
-    participations = load_participations()
-    stats = calculate_stats(participations)
-    
-    for s in stats:
-        if s.publisher_id == publisher_id:
-            return s
-    
-    raise HTTPException(status_code=404, detail="Estatísticas não encontradas")
-
+    stats = await run_io(lambda: get_stats_store().get(publisher_id))
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Estatísticas não encontradas")
+    return stats
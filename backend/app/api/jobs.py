@@ -0,0 +1,272 @@
+"""
+API Routes da fila de tarefas
+Extração de PDFs, S-89 em lote e geração de várias semanas executadas em
+segundo plano: POST enfileira, GET acompanha o progresso e baixa o resultado
+"""
+import asyncio
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+
+from app.models.schemas import Assignment
+from app.core.jobs import (
+    MAX_LIST_LIMIT,
+    Job,
+    JobContext,
+    JobFile,
+    JobManager,
+    JobQueueFull,
+    JobStatus,
+    get_job_manager,
+)
+from app.core.executors import run_io
+from app.core.supabase_client import close_async_supabase
+from app.api.assignments import (
+    GenerateBatchRequest,
+    GeneratedWeekResponse,
+    check_meeting_dates,
+    run_schedule_batch,
+)
+from app.api.pdf_extractor import extract_workbook_parts_cached, save_temp_upload
+from app.api.pdf_parser import parse_history_pdf
+from app.pdf.batch import build_merged_s89, stream_s89_zip
+
+router = APIRouter()
+
+INPUT_PDF = "input.pdf"
+
+
+# ============================================================================
+# MODELOS
+# ============================================================================
+
+class JobResponse(BaseModel):
+    """Estado de uma tarefa"""
+    id: str
+    kind: str
+    status: JobStatus
+    progress: Optional[float] = None   # 0–1, quando o total é conhecido
+    done: int = 0
+    total: Optional[int] = None
+    message: str = ""
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result_url: Optional[str] = None
+
+
+def to_job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        progress=job.progress,
+        done=job.done,
+        total=job.total,
+        message=job.message,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result_url=f"/api/jobs/{job.id}/result" if job.status == JobStatus.SUCCEEDED else None,
+    )
+
+
+# ============================================================================
+# EXECUÇÃO DAS TAREFAS (threads da fila)
+# ============================================================================
+
+def run_workbook_job(ctx: JobContext, params: dict) -> dict:
+    """Extração da apostila com progresso por página"""
+    path = ctx.path(INPUT_PDF)
+    result = extract_workbook_parts_cached(
+        path.read_bytes(), str(path),
+        on_page=lambda done, total: ctx.progress(done, total, "Lendo páginas"),
+    )
+    if not result.success:
+        raise RuntimeError(result.error)
+    return result.model_dump()
+
+
+def run_history_job(ctx: JobContext, params: dict) -> dict:
+    """Parsing de PDF de histórico S-140"""
+    ctx.progress(0, 1, "Lendo PDF")
+    result = parse_history_pdf(ctx.path(INPUT_PDF).read_bytes())
+    if not result.success:
+        raise RuntimeError(result.error)
+    return result.model_dump()
+
+
+def run_s89_job(ctx: JobContext, params: dict) -> JobFile:
+    """S-89 em lote como PDF único ou ZIP"""
+    assignments = [Assignment.model_validate(a) for a in params["assignments"]]
+    total = len(assignments)
+    ctx.progress(0, total, "Gerando S-89")
+
+    if params.get("format") == "zip":
+        chunks = []
+        for done, chunk in enumerate(stream_s89_zip(assignments), 1):
+            chunks.append(chunk)
+            ctx.progress(min(done, total))
+        return JobFile(b"".join(chunks), "application/zip", "S-89.zip")
+
+    writer = build_merged_s89(assignments, four_up=bool(params.get("four_up")))
+    ctx.progress(total)
+    output = BytesIO()
+    writer.write(output)
+    return JobFile(output.getvalue(), "application/pdf", "S-89.pdf")
+
+
+async def schedule_batch_in_thread(request: GenerateBatchRequest) -> List[GeneratedWeekResponse]:
+    # Event loop próprio da tarefa: o cliente Supabase dele é fechado ao final
+    try:
+        return await run_schedule_batch(request)
+    finally:
+        await close_async_supabase()
+
+
+def run_schedule_job(ctx: JobContext, params: dict) -> list:
+    """Geração de várias semanas (motor assíncrono executado na thread da tarefa)"""
+    request = GenerateBatchRequest.model_validate(params)
+    ctx.progress(0, len(request.weeks), "Gerando designações")
+    generated = asyncio.run(schedule_batch_in_thread(request))
+    ctx.progress(len(request.weeks))
+    return [week.model_dump(mode="json") for week in generated]
+
+
+# Handlers registrados na fila quando a aplicação inicia (lifespan em main.py)
+JOB_HANDLERS = {
+    "workbook-extract": run_workbook_job,
+    "history-parse": run_history_job,
+    "s89-batch": run_s89_job,
+    "schedule-batch": run_schedule_job,
+}
+
+
+def job_manager() -> JobManager:
+    """Fila da aplicação (503 fora do ciclo de vida do servidor)"""
+    manager = get_job_manager()
+    if manager is None:
+        raise HTTPException(status_code=503, detail="Fila de tarefas indisponível")
+    return manager
+
+
+async def submit(kind: str, params: Optional[dict] = None, files: Optional[dict] = None) -> JobResponse:
+    jobs = job_manager()
+    try:
+        # Grava os arquivos e o estado da tarefa em disco fora do event loop
+        return to_job_response(await run_io(jobs.submit, kind, params, files))
+    except JobQueueFull as e:
+        # Uploads já copiados para arquivos temporários não serão usados
+        for content in (files or {}).values():
+            if isinstance(content, Path):
+                os.remove(content)
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+async def save_upload(file: UploadFile) -> Path:
+    """Copia o upload em pedaços para um arquivo temporário"""
+    if not file.filename or not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Arquivo deve ser PDF")
+
+    return Path(await save_temp_upload(file))
+
+
+# ============================================================================
+# ENFILEIRAR
+# ============================================================================
+
+@router.post("/workbook", status_code=202)
+async def enqueue_workbook_extraction(file: UploadFile = File(...)) -> JobResponse:
+    """Enfileira a extração de uma apostila (resultado: ExtractionResult)"""
+    return await submit("workbook-extract", files={INPUT_PDF: await save_upload(file)})
+
+
+@router.post("/history", status_code=202)
+async def enqueue_history_parse(file: UploadFile = File(...)) -> JobResponse:
+    """Enfileira o parsing de um PDF de histórico S-140 (resultado: ParseResult)"""
+    return await submit("history-parse", files={INPUT_PDF: await save_upload(file)})
+
+
+@router.post("/s89", status_code=202)
+async def enqueue_s89_batch(
+    assignments: List[Assignment],
+    format: Literal["pdf", "zip"] = "pdf",
+    four_up: bool = False
+) -> JobResponse:
+    """Enfileira a geração de S-89 em lote (resultado: PDF único ou ZIP)"""
+    if not assignments:
+        raise HTTPException(status_code=400, detail="Nenhuma designação informada")
+
+    return await submit("s89-batch", {
+        "assignments": [a.model_dump(mode="json") for a in assignments],
+        "format": format,
+        "four_up": four_up,
+    })
+
+
+@router.post("/schedule", status_code=202)
+async def enqueue_schedule_batch(request: GenerateBatchRequest) -> JobResponse:
+    """Enfileira a geração de designações de várias semanas (resultado: semanas geradas)"""
+    if not request.weeks:
+        raise HTTPException(status_code=400, detail="Informe ao menos uma semana")
+    check_meeting_dates(w.date for w in request.weeks)
+
+    return await submit("schedule-batch", request.model_dump(mode="json"))
+
+
+# ============================================================================
+# ACOMPANHAR
+# ============================================================================
+
+@router.get("/")
+async def list_jobs(limit: int = Query(50, ge=1, le=MAX_LIST_LIMIT)) -> List[JobResponse]:
+    """Tarefas mais recentes"""
+    return [to_job_response(job) for job in await run_io(job_manager().list, limit)]
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str) -> JobResponse:
+    """Estado e progresso de uma tarefa"""
+    job = await run_io(job_manager().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    return to_job_response(job)
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Resultado de uma tarefa concluída (JSON ou arquivo)"""
+    jobs = job_manager()
+    job = await run_io(jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Tarefa sem resultado (status: {job.status.value})")
+
+    path = await run_io(jobs.result_path, job)
+    if path is None:
+        raise HTTPException(status_code=410, detail="Resultado não está mais disponível")
+    return FileResponse(path, media_type=job.result_media_type, filename=job.result_filename)
+
+
+@router.delete("/{job_id}")
+async def cancel_or_delete_job(job_id: str) -> dict:
+    """Cancela uma tarefa pendente ou remove uma concluída"""
+    jobs = job_manager()
+    job = await run_io(jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+
+    if job.finished:
+        await run_io(jobs.delete, job_id)
+        return {"message": "Tarefa removida"}
+
+    await run_io(jobs.cancel, job_id)
+    return {"message": "Cancelamento solicitado"}
@@ -2,7 +2,7 @@
 API Routes para geração e extração de PDFs
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Optional
 import base64
 from pathlib import Path
@@ -10,51 +10,44 @@ from io import BytesIO
 import tempfile
 
 from app.models.schemas import Assignment, S89Request, WorkbookExtractRequest, WorkbookExtractResponse
-from app.pdf.generator import generate_s89_pdf
-from app.pdf.extractor import extract_workbook_data
+from app.pdf.generator import render_s89, archive_s89, assignment_filename
+from app.pdf.batch import stream_merged_s89, stream_s89_zip
+from app.pdf.extractor import extract_workbook_data, EXTRACTOR_VERSION
+from app.core.extraction_cache import get_extraction_cache
+from app.core.executors import run_cpu, run_io
 
 router = APIRouter()
 
 OUTPUT_DIR = Path(__file__).parent.parent.parent / "output"
 
 
+def s89_payload(assignment: Assignment, archive: bool) -> dict:
+    """Renderiza o S-89 em memória (gravando em OUTPUT_DIR só se pedido)"""
+    pdf_bytes = render_s89(assignment)
+    if archive:
+        archive_s89(pdf_bytes, assignment, OUTPUT_DIR)
+    
+    return {
+        "filename": assignment_filename(assignment),
+        "pdf_data": base64.b64encode(pdf_bytes).decode("utf-8")
+    }
+
+
 @router.post("/s89")
 async def generate_s89(request: S89Request) -> dict:
     """Gera um PDF S-89 para uma designação"""
     try:
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        
-        output_path = generate_s89_pdf(request.assignment, OUTPUT_DIR)
-        
-        # Retornar o PDF em base64
-        pdf_bytes = output_path.read_bytes()
-        pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
-        
-        return {
-            "success": True,
-            "filename": output_path.name,
-            "pdf_data": pdf_base64
-        }
+        payload = await run_io(s89_payload, request.assignment, request.archive)
+        return {"success": True, **payload}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/s89/batch")
-async def generate_s89_batch(assignments: list[Assignment]) -> dict:
+async def generate_s89_batch(assignments: list[Assignment], archive: bool = False) -> dict:
     """Gera múltiplos PDFs S-89"""
     try:
-        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        
-        results = []
-        for assignment in assignments:
-            output_path = generate_s89_pdf(assignment, OUTPUT_DIR)
-            pdf_bytes = output_path.read_bytes()
-            pdf_base64 = base64.b64encode(pdf_bytes).decode("utf-8")
-            
-            results.append({
-                "filename": output_path.name,
-                "pdf_data": pdf_base64
-            })
+        results = await run_io(lambda: [s89_payload(a, archive) for a in assignments])
         
         return {
             "success": True,
@@ -65,6 +58,50 @@ async def generate_s89_batch(assignments: list[Assignment]) -> dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/s89/batch/pdf")
+async def generate_s89_batch_pdf(assignments: list[Assignment], four_up: bool = False) -> StreamingResponse:
+    """
+    Gera um único PDF com todos os S-89.
+    Com four_up=true, quatro folhas por página A4 para impressão.
+    """
+    if not assignments:
+        raise HTTPException(status_code=400, detail="Nenhuma designação informada")
+    
+    return StreamingResponse(
+        stream_merged_s89(assignments, four_up=four_up),
+        media_type="application/pdf",
+        headers={"Content-Disposition": 'attachment; filename="S-89.pdf"'}
+    )
+
+
+@router.post("/s89/batch/zip")
+async def generate_s89_batch_zip(assignments: list[Assignment]) -> StreamingResponse:
+    """Gera um ZIP com um PDF S-89 por designação"""
+    if not assignments:
+        raise HTTPException(status_code=400, detail="Nenhuma designação informada")
+    
+    return StreamingResponse(
+        stream_s89_zip(assignments),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="S-89.zip"'}
+    )
+
+
+async def extract_workbook_cached(pdf_bytes: bytes, file_name: str) -> list[dict]:
+    """
+    Extração da apostila reaproveitando o resultado de PDFs já enviados.
+    O cache é consultado no pool de E/S; a leitura do PDF (pypdf) roda no
+    pool de processos.
+    """
+    cache = get_extraction_cache()
+    digest = await run_io(cache.digest, pdf_bytes)
+    weeks = await run_io(cache.get, "workbook-text", EXTRACTOR_VERSION, digest)
+    if weeks is None:
+        weeks = await run_cpu(extract_workbook_data, pdf_bytes, file_name)
+        await run_io(cache.put, "workbook-text", EXTRACTOR_VERSION, digest, weeks)
+    return weeks
+
+
 @router.post("/extract")
 async def extract_workbook(request: WorkbookExtractRequest) -> WorkbookExtractResponse:
     """Extrai dados de uma apostila PDF"""
@@ -73,7 +110,7 @@ async def extract_workbook(request: WorkbookExtractRequest) -> WorkbookExtractRe
         pdf_bytes = base64.b64decode(request.file_data)
         
         # Extrair dados
-        weeks = extract_workbook_data(pdf_bytes, request.file_name)
+        weeks = await extract_workbook_cached(pdf_bytes, request.file_name)
         
         return WorkbookExtractResponse(
             weeks=weeks,
@@ -93,7 +130,7 @@ async def extract_workbook_upload(file: UploadFile = File(...)) -> WorkbookExtra
     """Extrai dados de uma apostila PDF via upload"""
     try:
         pdf_bytes = await file.read()
-        weeks = extract_workbook_data(pdf_bytes, file.filename or "workbook.pdf")
+        weeks = await extract_workbook_cached(pdf_bytes, file.filename or "workbook.pdf")
         
         return WorkbookExtractResponse(
             weeks=weeks,
@@ -106,3 +143,16 @@ async def extract_workbook_upload(file: UploadFile = File(...)) -> WorkbookExtra
             success=False,
             message=str(e)
         )
+
+
+@router.get("/cache/stats")
+async def extraction_cache_stats() -> dict:
+    """Acertos/falhas e ocupação do cache de extrações de PDF"""
+    return await run_io(get_extraction_cache().stats)
+
+
+@router.delete("/cache")
+async def clear_extraction_cache() -> dict:
+    """Esvazia o cache de extrações de PDF"""
+    removed = await run_io(get_extraction_cache().clear)
+    return {"message": f"{removed} entradas removidas"}
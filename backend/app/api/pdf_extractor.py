@@ -2,13 +2,21 @@
 Endpoint para extração de partes da Apostila (Workbook) de PDFs.
 Reutiliza a lógica do script extract_detailed_parts.py.
 """
+import json
+import os
 import re
+import tempfile
 import uuid
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, Union
 from datetime import datetime
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-import fitz  # PyMuPDF
+
+from app.core.extraction_cache import get_extraction_cache
+from app.pdf.pages import count_pages, iter_mupdf_pages
+from app.core.executors import run_io
 
 router = APIRouter()
 
@@ -113,253 +121,302 @@ def derivar_modalidade(tipo_parte: str) -> str:
     """Deriva modalidade de execução a partir do tipoParte."""
     return TIPO_TO_MODALIDADE.get(tipo_parte, 'Demonstração')
 
-def extract_workbook_from_pdf(pdf_bytes: bytes) -> ExtractionResult:
+# Padrões
+WEEK_PATTERN_1 = re.compile(r'(\d{1,2})\s*[-–]\s*(\d{1,2})\s*(?:DE\s+)?([A-ZÇÃÉÍÓÚÂÊÎÔÛ]+)', re.IGNORECASE)
+WEEK_PATTERN_2 = re.compile(r'(\d{1,2})\s*(?:DE\s+)?([A-ZÇÃÉÍÓÚÂÊÎÔÛ]+)\s*[-–]\s*(\d{1,2})[°º.u]*\s*(?:DE\s+)?([A-ZÇÃÉÍÓÚÂÊÎÔÛ]+)', re.IGNORECASE)
+PART_PATTERN = re.compile(r'^(\d+)\.\s*(.+)$')
+TIME_PATTERN = re.compile(r'\((\d+)\s*min\)')
+SECTION_BREAK_PATTERN = re.compile(r'^(TESOUROS|FAÇA SEU MELHOR|NOSSA VIDA|CÂNTICO)', re.IGNORECASE)
+YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+
+# Versão do extrator (chave do cache de extrações): incrementar ao mudar a extração
+EXTRACTOR_VERSION = "1"
+
+# Tamanho dos blocos ao copiar uploads para disco (streaming)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+async def save_temp_upload(file: UploadFile) -> str:
+    """Copia o upload em blocos para um arquivo temporário (escritas fora do event loop)"""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await run_io(tmp.write, chunk)
+        return tmp.name
+
+
+def format_time(minutes: int) -> str:
+    """Minutos desde 00:00 -> HH:MM"""
+    h = minutes // 60
+    m = minutes % 60
+    return f"{h:02d}:{m:02d}"
+
+
+def detect_weeks(page_text: str, year: int, seen: set, current_week_id: Optional[str]) -> list[dict]:
     """
-    Extrai todas as partes da apostila de um PDF.
-    Retorna lista de registros prontos para upsert.
+    Cabeçalhos de semanas novas na página, na ordem em que aparecem.
+    O formato curto ("5-11 JANEIRO") só é considerado antes da primeira semana.
     """
-    try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
-        # Extrair ano da primeira página
-        first_page_text = doc[0].get_text()
-        year_match = re.search(r'\b(20\d{2})\b', first_page_text)
-        year = int(year_match.group(1)) if year_match else datetime.now().year
+    weeks = []
+    
+    for match in WEEK_PATTERN_2.finditer(page_text):
+        day1 = int(match.group(1))
+        month1_name = match.group(2).lower()
+        day2 = int(match.group(3))
         
-        all_weeks = {}
+        month1 = MESES.get(month1_name, MESES.get(month1_name.replace('ç', 'c'), 1))
         
-        # Padrões
-        week_pattern1 = re.compile(r'(\d{1,2})\s*[-–]\s*(\d{1,2})\s*(?:DE\s+)?([A-ZÇÃÉÍÓÚÂÊÎÔÛ]+)', re.IGNORECASE)
-        week_pattern2 = re.compile(r'(\d{1,2})\s*(?:DE\s+)?([A-ZÇÃÉÍÓÚÂÊÎÔÛ]+)\s*[-–]\s*(\d{1,2})[°º.u]*\s*(?:DE\s+)?([A-ZÇÃÉÍÓÚÂÊÎÔÛ]+)', re.IGNORECASE)
-        part_pattern = re.compile(r'^(\d+)\.\s*(.+)$')
-        time_pattern = re.compile(r'\((\d+)\s*min\)')
+        week_id = f"{year}-{month1:02d}-{day1:02d}"
+        if week_id not in seen:
+            seen.add(week_id)
+            current_week_id = week_id
+            weeks.append({
+                'weekId': week_id,
+                'display': f"{day1}-{day2} de {month1_name.title()}",
+                'parts': {},
+            })
+    
+    if current_week_id:
+        return weeks
+    
+    for match in WEEK_PATTERN_1.finditer(page_text):
+        if current_week_id:
+            continue
+        day1 = int(match.group(1))
+        day2 = int(match.group(2))
+        month_name = match.group(3).lower()
+        month = MESES.get(month_name, MESES.get(month_name.replace('ç', 'c'), 1))
         
-        current_week_id = None
+        week_id = f"{year}-{month:02d}-{day1:02d}"
+        if week_id not in seen:
+            seen.add(week_id)
+            current_week_id = week_id
+            weeks.append({
+                'weekId': week_id,
+                'display': f"{day1}-{day2} de {month_name.title()}",
+                'parts': {},
+            })
+    
+    return weeks
+
+
+def extract_parts(all_lines: list[dict], week: dict) -> None:
+    """Adiciona à semana as partes numeradas encontradas nas linhas da página"""
+    i = 0
+    while i < len(all_lines):
+        line_data = all_lines[i]
+        line_text = line_data['text']
+        line_color = line_data['color']
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = page.get_text()
+        part_match = PART_PATTERN.match(line_text)
+        if part_match:
+            num = int(part_match.group(1))
+            tema_raw = part_match.group(2)
+            
+            section = get_section_from_color(line_color) or 'INICIO'
             
-            # Detectar início de semana
-            for match in week_pattern2.finditer(page_text):
-                day1 = int(match.group(1))
-                month1_name = match.group(2).lower()
-                day2 = int(match.group(3))
-                month2_name = match.group(4).lower()
-                
-                month1 = MESES.get(month1_name, MESES.get(month1_name.replace('ç', 'c'), 1))
-                
-                week_id = f"{year}-{month1:02d}-{day1:02d}"
-                if week_id not in all_weeks:
-                    current_week_id = week_id
-                    all_weeks[week_id] = {
-                        'weekId': week_id,
-                        'display': f"{day1}-{day2} de {month1_name.title()}",
-                        'parts': {},
-                    }
+            time_match = TIME_PATTERN.search(tema_raw)
+            duracao = time_match.group(1) if time_match else ''
             
-            for match in week_pattern1.finditer(page_text):
-                if current_week_id:
-                    continue
-                day1 = int(match.group(1))
-                day2 = int(match.group(2))
-                month_name = match.group(3).lower()
-                month = MESES.get(month_name, MESES.get(month_name.replace('ç', 'c'), 1))
-                
-                week_id = f"{year}-{month:02d}-{day1:02d}"
-                if week_id not in all_weeks:
-                    current_week_id = week_id
-                    all_weeks[week_id] = {
-                        'weekId': week_id,
-                        'display': f"{day1}-{day2} de {month_name.title()}",
-                        'parts': {},
-                    }
+            if time_match:
+                tema = tema_raw[:time_match.start()].strip()
+                desc_same_line = tema_raw[time_match.end():].strip()
+                desc_same_line = re.sub(r'^[:\s\u2014\u2013-]+', '', desc_same_line).strip()
+            else:
+                tema = tema_raw.strip()
+                desc_same_line = ''
             
-            if not current_week_id:
-                continue
+            tema = re.sub(r'[:\s—–-]+$', '', tema).strip()
             
-            week = all_weeks[current_week_id]
+            # Capturar detalhes
+            detalhes_lines = []
+            if desc_same_line:
+                detalhes_lines.append(desc_same_line)
             
-            # Extrair partes
-            page_dict = page.get_text('dict')
-            all_lines = []
-            for block in page_dict.get('blocks', []):
-                if 'lines' not in block:
-                    continue
-                for line in block['lines']:
-                    line_text = ''
-                    line_color = None
-                    line_y = line['bbox'][1]
-                    for span in line['spans']:
-                        line_text += span['text']
-                        if span.get('color') and span['color'] != 0:
-                            line_color = span['color']
-                    line_text = line_text.strip()
-                    if line_text:
-                        all_lines.append({'text': line_text, 'color': line_color, 'y': line_y})
+            j = i + 1
+            while j < len(all_lines):
+                next_line = all_lines[j]['text']
+                if PART_PATTERN.match(next_line):
+                    break
+                if SECTION_BREAK_PATTERN.match(next_line):
+                    break
+                detalhes_lines.append(next_line)
+                j += 1
             
-            all_lines.sort(key=lambda x: x['y'])
+            descricao = detalhes_lines[0] if detalhes_lines else ''
+            detalhes = ' '.join(detalhes_lines[1:]) if len(detalhes_lines) > 1 else ''
             
-            i = 0
-            while i < len(all_lines):
-                line_data = all_lines[i]
-                line_text = line_data['text']
-                line_color = line_data['color']
-                
-                part_match = part_pattern.match(line_text)
-                if part_match:
-                    num = int(part_match.group(1))
-                    tema_raw = part_match.group(2)
-                    
-                    section = get_section_from_color(line_color) or 'INICIO'
-                    
-                    time_match = time_pattern.search(tema_raw)
-                    duracao = time_match.group(1) if time_match else ''
-                    
-                    if time_match:
-                        tema = tema_raw[:time_match.start()].strip()
-                        desc_same_line = tema_raw[time_match.end():].strip()
-                        desc_same_line = re.sub(r'^[:\s\u2014\u2013-]+', '', desc_same_line).strip()
-                    else:
-                        tema = tema_raw.strip()
-                        desc_same_line = ''
-                    
-                    tema = re.sub(r'[:\s—–-]+$', '', tema).strip()
-                    
-                    # Capturar detalhes
-                    detalhes_lines = []
-                    if desc_same_line:
-                        detalhes_lines.append(desc_same_line)
-                    
-                    j = i + 1
-                    while j < len(all_lines):
-                        next_line = all_lines[j]['text']
-                        if part_pattern.match(next_line):
-                            break
-                        if re.match(r'^(TESOUROS|FAÇA SEU MELHOR|NOSSA VIDA|CÂNTICO)', next_line, re.IGNORECASE):
-                            break
-                        detalhes_lines.append(next_line)
-                        j += 1
-                    
-                    descricao = detalhes_lines[0] if detalhes_lines else ''
-                    detalhes = ' '.join(detalhes_lines[1:]) if len(detalhes_lines) > 1 else ''
-                    
-                    if num not in week['parts']:
-                        week['parts'][num] = {
-                            'num': num,
-                            'tema': tema,
-                            'duracao': duracao,
-                            'descricao': descricao,
-                            'detalhes': detalhes,
-                            'section': section,
-                        }
-                
-                i += 1
+            if num not in week['parts']:
+                week['parts'][num] = {
+                    'num': num,
+                    'tema': tema,
+                    'duracao': duracao,
+                    'descricao': descricao,
+                    'detalhes': detalhes,
+                    'section': section,
+                }
+        
+        i += 1
+
+
+def iter_workbook_weeks(pages: Iterable[tuple[str, list[dict]]]) -> Iterator[tuple[int, dict]]:
+    """
+    Percorre as páginas (texto, linhas) em ordem e produz (ano, semana) assim
+    que a semana termina, ou seja, quando o cabeçalho da semana seguinte
+    aparece (a última ao fim do documento). As partes de uma página vão para a
+    última semana detectada nela, então uma semana encerrada não recebe mais partes.
+    """
+    year = None
+    seen = set()
+    week = None
+    
+    for page_text, all_lines in pages:
+        
+        # Ano extraído da primeira página
+        if year is None:
+            year_match = YEAR_PATTERN.search(page_text)
+            year = int(year_match.group(1)) if year_match else datetime.now().year
+        
+        for new_week in detect_weeks(page_text, year, seen, week['weekId'] if week else None):
+            if week is not None:
+                yield year, week
+            week = new_week
+        
+        if week is not None:
+            extract_parts(all_lines, week)
+    
+    if week is not None:
+        yield year, week
+
+
+def week_to_records(week: dict) -> list[ExtractedPart]:
+    """Converte uma semana extraída em registros (titular e ajudante)"""
+    records = []
+    week_id = week['weekId']
+    seq = 1
+    current_time = 19 * 60 + 30  # 19:30
+    
+    for num in sorted(week['parts'].keys()):
+        part = week['parts'][num]
+        section_key = part['section']
+        secao = SECOES.get(section_key, section_key)
+        tema = part['tema']
+        
+        # Determinar tipo
+        tipo = 'Parte'
+        needs_helper = False
+        tema_lower = tema.lower()
+        
+        if 'joias espirituais' in tema_lower:
+            tipo = 'Joias Espirituais'
+        elif 'leitura da bíblia' in tema_lower or 'leitura da biblia' in tema_lower:
+            tipo = 'Leitura da Bíblia'
+        elif 'iniciando' in tema_lower:
+            tipo = 'Iniciando Conversas'
+            needs_helper = True
+        elif 'cultivando' in tema_lower:
+            tipo = 'Cultivando o Interesse'
+            needs_helper = True
+        elif 'fazendo' in tema_lower:
+            tipo = 'Fazendo Discípulos'
+            needs_helper = True
+        elif 'explicando' in tema_lower:
+            tipo = 'Explicando Suas Crenças'
+            needs_helper = True
+        elif 'discurso' in tema_lower and section_key == 'MINISTERIO':
+            tipo = 'Discurso de Estudante'
+        elif 'estudo bíblico de congregação' in tema_lower:
+            tipo = 'Dirigente EBC'
+        elif 'necessidades' in tema_lower:
+            tipo = 'Necessidades Locais'
+        elif num == 1 and section_key == 'TESOUROS':
+            tipo = 'Discurso Tesouros'
+        elif section_key == 'VIDA':
+            tipo = 'Parte Vida Cristã'
+        elif section_key == 'MINISTERIO':
+            tipo = 'Parte Ministério'
+        elif section_key == 'TESOUROS':
+            tipo = 'Parte Tesouros'
         
-        doc.close()
+        modalidade = derivar_modalidade(tipo)
+        duracao_min = int(part['duracao']) if part['duracao'] else 5
+        
+        # Registro Titular
+        records.append(ExtractedPart(
+            id=str(uuid.uuid4()),
+            weekId=week_id,
+            weekDisplay=week['display'],
+            date=week_id,
+            section=secao,
+            tipoParte=tipo,
+            modalidade=modalidade,
+            tituloParte=f"{num}. {tema}",
+            descricaoParte=part['descricao'],
+            detalhesParte=part['detalhes'],
+            seq=seq,
+            funcao='Titular',
+            duracao=part['duracao'],
+            horaInicio=format_time(current_time),
+            horaFim=format_time(current_time + duracao_min),
+            rawPublisherName='',
+            status='DRAFT',
+        ))
+        current_time += duracao_min
+        seq += 1
+        
+        # Registro Ajudante
+        if needs_helper:
+            records.append(ExtractedPart(
+                id=str(uuid.uuid4()),
+                weekId=week_id,
+                weekDisplay=week['display'],
+                date=week_id,
+                section=secao,
+                tipoParte=f'{tipo} (Ajudante)',
+                modalidade=modalidade,
+                tituloParte=f"{num}. {tema} - Ajudante",
+                descricaoParte='',
+                detalhesParte='',
+                seq=seq,
+                funcao='Ajudante',
+                duracao='',
+                horaInicio=format_time(current_time - duracao_min),
+                horaFim=format_time(current_time),
+                rawPublisherName='',
+                status='DRAFT',
+            ))
+            seq += 1
+    
+    return records
+
+
+def _report_pages(pages: Iterable, total: int, on_page: Callable[[int, int], None]) -> Iterator:
+    for done, page in enumerate(pages, 1):
+        yield page
+        on_page(done, total)
+
+
+def extract_workbook_from_pdf(
+    pdf_source: Union[bytes, str],
+    on_page: Optional[Callable[[int, int], None]] = None
+) -> ExtractionResult:
+    """
+    Extrai todas as partes da apostila de um PDF (bytes ou caminho).
+    Retorna lista de registros prontos para upsert.
+    `on_page(concluídas, total)` é chamado após cada página lida.
+    """
+    try:
+        year = datetime.now().year
+        all_weeks = {}
+        pages = iter_mupdf_pages(pdf_source)
+        if on_page is not None:
+            pages = _report_pages(pages, count_pages(pdf_source), on_page)
+        for year, week in iter_workbook_weeks(pages):
+            all_weeks[week['weekId']] = week
         
         # Converter para registros
         records = []
         for week_id in sorted(all_weeks.keys()):
-            week = all_weeks[week_id]
-            seq = 1
-            current_time = 19 * 60 + 30  # 19:30
-            
-            for num in sorted(week['parts'].keys()):
-                part = week['parts'][num]
-                section_key = part['section']
-                secao = SECOES.get(section_key, section_key)
-                tema = part['tema']
-                
-                # Determinar tipo
-                tipo = 'Parte'
-                needs_helper = False
-                tema_lower = tema.lower()
-                
-                if 'joias espirituais' in tema_lower:
-                    tipo = 'Joias Espirituais'
-                elif 'leitura da bíblia' in tema_lower or 'leitura da biblia' in tema_lower:
-                    tipo = 'Leitura da Bíblia'
-                elif 'iniciando' in tema_lower:
-                    tipo = 'Iniciando Conversas'
-                    needs_helper = True
-                elif 'cultivando' in tema_lower:
-                    tipo = 'Cultivando o Interesse'
-                    needs_helper = True
-                elif 'fazendo' in tema_lower:
-                    tipo = 'Fazendo Discípulos'
-                    needs_helper = True
-                elif 'explicando' in tema_lower:
-                    tipo = 'Explicando Suas Crenças'
-                    needs_helper = True
-                elif 'discurso' in tema_lower and section_key == 'MINISTERIO':
-                    tipo = 'Discurso de Estudante'
-                elif 'estudo bíblico de congregação' in tema_lower:
-                    tipo = 'Dirigente EBC'
-                elif 'necessidades' in tema_lower:
-                    tipo = 'Necessidades Locais'
-                elif num == 1 and section_key == 'TESOUROS':
-                    tipo = 'Discurso Tesouros'
-                elif section_key == 'VIDA':
-                    tipo = 'Parte Vida Cristã'
-                elif section_key == 'MINISTERIO':
-                    tipo = 'Parte Ministério'
-                elif section_key == 'TESOUROS':
-                    tipo = 'Parte Tesouros'
-                
-                modalidade = derivar_modalidade(tipo)
-                duracao_min = int(part['duracao']) if part['duracao'] else 5
-                
-                def format_time(minutes: int) -> str:
-                    h = minutes // 60
-                    m = minutes % 60
-                    return f"{h:02d}:{m:02d}"
-                
-                # Registro Titular
-                records.append(ExtractedPart(
-                    id=str(uuid.uuid4()),
-                    weekId=week_id,
-                    weekDisplay=week['display'],
-                    date=week_id,
-                    section=secao,
-                    tipoParte=tipo,
-                    modalidade=modalidade,
-                    tituloParte=f"{num}. {tema}",
-                    descricaoParte=part['descricao'],
-                    detalhesParte=part['detalhes'],
-                    seq=seq,
-                    funcao='Titular',
-                    duracao=part['duracao'],
-                    horaInicio=format_time(current_time),
-                    horaFim=format_time(current_time + duracao_min),
-                    rawPublisherName='',
-                    status='DRAFT',
-                ))
-                current_time += duracao_min
-                seq += 1
-                
-                # Registro Ajudante
-                if needs_helper:
-                    records.append(ExtractedPart(
-                        id=str(uuid.uuid4()),
-                        weekId=week_id,
-                        weekDisplay=week['display'],
-                        date=week_id,
-                        section=secao,
-                        tipoParte=f'{tipo} (Ajudante)',
-                        modalidade=modalidade,
-                        tituloParte=f"{num}. {tema} - Ajudante",
-                        descricaoParte='',
-                        detalhesParte='',
-                        seq=seq,
-                        funcao='Ajudante',
-                        duracao='',
-                        horaInicio=format_time(current_time - duracao_min),
-                        horaFim=format_time(current_time),
-                        rawPublisherName='',
-                        status='DRAFT',
-                    ))
-                    seq += 1
+            records.extend(week_to_records(all_weeks[week_id]))
         
         return ExtractionResult(
             success=True,
@@ -379,6 +436,66 @@ def extract_workbook_from_pdf(pdf_bytes: bytes) -> ExtractionResult:
             error=str(e),
         )
 
+
+def extract_workbook_parts_cached(
+    content: bytes,
+    pdf_source: Union[bytes, str, None] = None,
+    on_page: Optional[Callable[[int, int], None]] = None
+) -> ExtractionResult:
+    """
+    Extração reaproveitando o resultado de PDFs já enviados (cache pelo
+    conteúdo). `pdf_source` permite ler as páginas de um arquivo já gravado.
+    """
+    data = get_extraction_cache().get_or_compute(
+        "workbook", EXTRACTOR_VERSION, content,
+        lambda: extract_workbook_from_pdf(
+            content if pdf_source is None else pdf_source, on_page
+        ).model_dump(),
+        should_store=lambda payload: payload["success"],
+    )
+    result = ExtractionResult.model_validate(data)
+    
+    # IDs novos a cada upload, como numa extração nova
+    for record in result.records:
+        record.id = str(uuid.uuid4())
+    
+    return result
+
+
+def stream_workbook_from_file(pdf_path: str) -> Iterator[str]:
+    """
+    Extração em streaming (NDJSON, um objeto JSON por linha):
+        {"type": "week", "year", "weekId", "weekDisplay", "records": [...]}  por semana concluída
+        {"type": "done", "totalParts", "totalWeeks", "year"}                 ao final
+        {"type": "error", "error"}                                           em caso de falha
+    As páginas são lidas sob demanda do arquivo; só a semana corrente fica em memória.
+    """
+    total_parts = 0
+    total_weeks = 0
+    year = 0
+    try:
+        for year, week in iter_workbook_weeks(iter_mupdf_pages(pdf_path)):
+            records = week_to_records(week)
+            total_parts += len(records)
+            total_weeks += 1
+            yield json.dumps({
+                'type': 'week',
+                'year': year,
+                'weekId': week['weekId'],
+                'weekDisplay': week['display'],
+                'records': [r.model_dump() for r in records],
+            }, ensure_ascii=False) + "\n"
+    except Exception as e:
+        yield json.dumps({'type': 'error', 'error': str(e)}, ensure_ascii=False) + "\n"
+        return
+    
+    yield json.dumps({
+        'type': 'done',
+        'totalParts': total_parts,
+        'totalWeeks': total_weeks,
+        'year': year,
+    }) + "\n"
+
 # =============================================================================
 # Endpoints
 # =============================================================================
@@ -395,10 +512,28 @@ async def extract_workbook_pdf(file: UploadFile = File(...)):
     # Ler conteúdo
     content = await file.read()
     
-    # Extrair
-    result = extract_workbook_from_pdf(content)
+    result = await run_io(extract_workbook_parts_cached, content)
     
     if not result.success:
         raise HTTPException(status_code=500, detail=result.error)
     
     return result
+
+
+@router.post("/extract-pdf/stream")
+async def extract_workbook_pdf_stream(file: UploadFile = File(...)):
+    """
+    Extrai partes da apostila em streaming (NDJSON).
+    Cada semana é enviada assim que termina; o upload é copiado para um
+    arquivo temporário em vez de ser lido inteiro para a memória.
+    """
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Arquivo deve ser PDF")
+    
+    tmp_path = await save_temp_upload(file)
+    
+    return StreamingResponse(
+        stream_workbook_from_file(tmp_path),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(os.remove, tmp_path),
+    )
@@ -7,11 +7,15 @@ import json
 import unicodedata
 from datetime import date
 from typing import List, Dict, Optional, Tuple
-from io import BytesIO
 
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from pydantic import BaseModel
 
+from app.core.name_resolver import NameResolver, get_name_resolver
+from app.core.extraction_cache import get_extraction_cache
+from app.pdf.pages import iter_pypdf_texts
+from app.core.executors import run_io
+
 
 router = APIRouter()
 
@@ -32,6 +36,9 @@ SECTION_HEADINGS = {
     "conclus": "Conclusão",
 }
 
+# Versão do parser (chave do cache de extrações): incrementar ao mudar o parsing
+PARSER_VERSION = "1"
+
 CONTROL_TOKENS = ("/CR", "/SUBC", "/CAN")
 SKIP_KEYWORDS = ("SALA B", "SALAO PRINCIPAL", "SALÃO PRINCIPAL")
 
@@ -258,14 +265,27 @@ def extract_weeks_from_text(text: str) -> List[ParsedWeek]:
     return weeks
 
 
-def convert_to_history_records(weeks: List[ParsedWeek], batch_id: str) -> List[dict]:
-    """Converte semanas parseadas para formato HistoryRecord"""
+def convert_to_history_records(
+    weeks: List[ParsedWeek],
+    batch_id: str,
+    resolver: Optional[NameResolver] = None
+) -> List[dict]:
+    """
+    Converte semanas parseadas para formato HistoryRecord.
+    Com `resolver`, os nomes distintos do lote são resolvidos de uma vez e os
+    registros recebem resolvedPublisherId/resolvedPublisherName/matchConfidence.
+    """
     records = []
+    resolutions = {}
+    if resolver is not None:
+        resolutions = resolver.resolve_many(
+            part.student for week in weeks for part in week.parts
+        )
     
     for week in weeks:
         for part in week.parts:
             if part.student:
-                records.append({
+                record = {
                     "id": f"hr-{batch_id}-{len(records)}",
                     "weekId": week.date[:7] if week.date else "",  # YYYY-MM
                     "weekDisplay": week.label,
@@ -277,11 +297,66 @@ def convert_to_history_records(weeks: List[ParsedWeek], batch_id: str) -> List[d
                     "status": "PENDING",
                     "importSource": "PDF",
                     "importBatchId": batch_id,
-                })
+                }
+                resolution = resolutions.get(part.student)
+                if resolution is not None and resolution.resolved:
+                    record["resolvedPublisherId"] = resolution.publisher_id
+                    record["resolvedPublisherName"] = resolution.publisher_name
+                    record["matchConfidence"] = resolution.confidence
+                records.append(record)
     
     return records
 
 
+def parse_weeks_payload(content: bytes) -> Optional[List[dict]]:
+    """
+    Extrai o texto do PDF e parseia as semanas (formato serializável do cache).
+    Retorna None se o PDF não tiver texto extraível.
+    """
+    # Páginas distribuídas entre processos, juntadas em ordem
+    text_parts = [page_text for page_text in iter_pypdf_texts(content) if page_text]
+    full_text = "\n".join(text_parts)
+    
+    if not full_text.strip():
+        return None
+    
+    return [week.model_dump() for week in extract_weeks_from_text(full_text)]
+
+
+def parse_history_pdf(content: bytes) -> ParseResult:
+    """Parsing completo de um PDF de histórico (semanas em cache + resolução de nomes)"""
+    # Semanas parseadas em cache pelo conteúdo do PDF; a resolução de nomes
+    # e o batch_id continuam sendo feitos a cada upload
+    cached = get_extraction_cache().get_or_compute(
+        "history", PARSER_VERSION, content,
+        lambda: parse_weeks_payload(content),
+        should_store=lambda payload: payload is not None,
+    )
+    
+    if cached is None:
+        return ParseResult(
+            success=False,
+            weeks=[],
+            records=[],
+            error="PDF sem texto extraível"
+        )
+    
+    weeks = [ParsedWeek.model_validate(week) for week in cached]
+    
+    # Gerar batch_id
+    import time
+    batch_id = f"batch-{int(time.time())}"
+    
+    # Converter para HistoryRecords
+    records = convert_to_history_records(weeks, batch_id, get_name_resolver())
+    
+    return ParseResult(
+        success=True,
+        weeks=weeks,
+        records=records
+    )
+
+
 # ==========================================
 # Endpoint API
 # ==========================================
@@ -308,43 +383,8 @@ async def parse_pdf(file: UploadFile = File(...)):
                 detail="Biblioteca pypdf não instalada no servidor"
             )
         
-        # Extrair texto
-        reader = PdfReader(BytesIO(content))
-        text_parts = []
-        
-        for page in reader.pages:
-            try:
-                page_text = page.extract_text(extraction_mode="layout")
-            except:
-                page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        
-        full_text = "\n".join(text_parts)
-        
-        if not full_text.strip():
-            return ParseResult(
-                success=False,
-                weeks=[],
-                records=[],
-                error="PDF sem texto extraível"
-            )
-        
-        # Parsear
-        weeks = extract_weeks_from_text(full_text)
-        
-        # Gerar batch_id
-        import time
-        batch_id = f"batch-{int(time.time())}"
-        
-        # Converter para HistoryRecords
-        records = convert_to_history_records(weeks, batch_id)
-        
-        return ParseResult(
-            success=True,
-            weeks=weeks,
-            records=records
-        )
+        # Páginas lidas no pool de processos (app.pdf.pages); a thread só coordena
+        return await run_io(parse_history_pdf, content)
         
     except Exception as e:
         return ParseResult(
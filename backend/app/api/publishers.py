@@ -3,106 +3,79 @@ API Routes para gerenciamento de publicadores
 """
 from fastapi import APIRouter, HTTPException
 from typing import Optional
-import json
-from pathlib import Path
 from uuid import uuid4
 
 from app.models.schemas import Publisher
+from app.core.storage import DuplicateIdError, get_storage
+from app.core.repository import publishers_repository
+from app.core.publisher_search import get_publisher_search_index
+from app.core.executors import run_io
 
 router = APIRouter()
 
-DATA_DIR = Path(__file__).parent.parent.parent / "data"
-PUBLISHERS_FILE = DATA_DIR / "publishers.json"
+COLLECTION = "publishers"
 
 
 def load_publishers() -> list[Publisher]:
-    """Carrega publicadores do arquivo JSON"""
-    if not PUBLISHERS_FILE.exists():
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        PUBLISHERS_FILE.write_text("[]", encoding="utf-8")
-        return []
-    
-    data = json.loads(PUBLISHERS_FILE.read_text(encoding="utf-8"))
-    return [Publisher(**p) for p in data]
-
-
-def save_publishers(publishers: list[Publisher]) -> None:
-    """Salva publicadores no arquivo JSON"""
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    data = [p.model_dump() for p in publishers]
-    PUBLISHERS_FILE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    """Carrega publicadores (modelos em cache, recarregados quando o armazenamento muda)"""
+    return publishers_repository.all()
 
 
 @router.get("/")
 async def list_publishers() -> list[Publisher]:
     """Lista todos os publicadores"""
-    return load_publishers()
+    return await run_io(load_publishers)
 
 
 @router.get("/{publisher_id}")
 async def get_publisher(publisher_id: str) -> Publisher:
     """Busca um publicador pelo ID"""
-    publishers = load_publishers()
-    for p in publishers:
-        if p.id == publisher_id:
-            return p
-    raise HTTPException(status_code=404, detail="Publicador não encontrado")
+    publisher = await run_io(publishers_repository.get, publisher_id)
+    if publisher is None:
+        raise HTTPException(status_code=404, detail="Publicador não encontrado")
+    return publisher
 
 
 @router.post("/")
 async def create_publisher(publisher: Publisher) -> Publisher:
     """Cria um novo publicador"""
-    publishers = load_publishers()
+    storage = get_storage()
     
     # Gerar ID se não fornecido
     if not publisher.id:
         publisher.id = str(uuid4())
     
     # Verificar duplicidade
-    for p in publishers:
-        if p.id == publisher.id:
-            raise HTTPException(status_code=400, detail="Publicador já existe")
+    if await run_io(publishers_repository.get, publisher.id) is not None:
+        raise HTTPException(status_code=400, detail="Publicador já existe")
     
-    publishers.append(publisher)
-    save_publishers(publishers)
+    # O id é único no armazenamento: uma criação concorrente com o mesmo id
+    # (entre a verificação acima e a inserção) falha aqui
+    try:
+        await run_io(storage.insert, COLLECTION, publisher.model_dump(mode="json"))
+    except DuplicateIdError:
+        raise HTTPException(status_code=409, detail="Publicador já existe")
     return publisher
 
 
 @router.put("/{publisher_id}")
 async def update_publisher(publisher_id: str, publisher: Publisher) -> Publisher:
     """Atualiza um publicador existente"""
-    publishers = load_publishers()
-    
-    for i, p in enumerate(publishers):
-        if p.id == publisher_id:
-            publisher.id = publisher_id
-            publishers[i] = publisher
-            save_publishers(publishers)
-            return publisher
-    
-    raise HTTPException(status_code=404, detail="Publicador não encontrado")
+    publisher.id = publisher_id
+    if not await run_io(get_storage().update, COLLECTION, publisher_id, publisher.model_dump(mode="json")):
+        raise HTTPException(status_code=404, detail="Publicador não encontrado")
+    return publisher
 
 
 @router.delete("/{publisher_id}")
 async def delete_publisher(publisher_id: str) -> dict:
     """Remove um publicador"""
-    publishers = load_publishers()
-    
-    for i, p in enumerate(publishers):
-        if p.id == publisher_id:
-            publishers.pop(i)
-            save_publishers(publishers)
-            return {"message": "Publicador removido com sucesso"}
-    
-    raise HTTPException(status_code=404, detail="Publicador não encontrado")
+    if not await run_io(get_storage().delete, COLLECTION, publisher_id):
+        raise HTTPException(status_code=404, detail="Publicador não encontrado")
+    return {"message": "Publicador removido com sucesso"}
 
 
 @router.get("/search/{name}")
 async def search_publishers(name: str) -> list[Publisher]:
-    """Busca publicadores por nome"""
-    publishers = load_publishers()
-    name_lower = name.lower()
-    return [
-        p for p in publishers 
-        if name_lower in p.name.lower() or any(name_lower in a.lower() for a in p.aliases)
-    ]
+    """Busca publicadores por nome ou apelido (sem distinguir acentos), mais relevantes primeiro"""
+    return await run_io(lambda: get_publisher_search_index().search(name))
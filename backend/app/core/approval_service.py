@@ -4,17 +4,26 @@ Gerencia fluxo de aprovação hierárquica por Anciãos
 Persistência: Supabase (scheduled_assignments)
 """
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, List, Sequence, Tuple, TypeVar, Union
 from dataclasses import dataclass
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
 import uuid
 
+from postgrest import AsyncPostgrestClient
+
 from app.core.assignment_engine import (
     ApprovalStatus,
     GeneratedAssignment,
+    GeneratedWeek,
     EngineConfig,
     DEFAULT_CONFIG,
 )
-from app.core.supabase_client import get_supabase
+from app.core.supabase_client import get_async_supabase, get_supabase, without_resend
 from app.models.schemas import Publisher, Participation, ParticipationType
 
 
@@ -69,6 +78,40 @@ class ApprovalAction:
     reason: Optional[str] = None
 
 
+@dataclass
+class BulkApprovalAction:
+    """A mesma ação aplicada a várias designações"""
+    assignment_ids: List[str]
+    action: str  # 'APPROVE', 'REJECT', or 'COMPLETE'
+    elder_id: str
+    elder_name: str
+    reason: Optional[str] = None
+
+
+@dataclass
+class BulkApprovalOutcome:
+    """Resultado de uma designação na ação em lote"""
+    assignment_id: str
+    outcome: str  # 'updated', 'invalid_status', 'not_found' ou 'error'
+    status: Optional[str] = None  # status atual (após a ação, se atualizada)
+    error: Optional[str] = None  # falha da requisição do bloco ('error')
+
+
+# Status de origem aceitos por ação (transições válidas)
+ALLOWED_TRANSITIONS = {
+    'APPROVE': (ApprovalStatus.DRAFT.value, ApprovalStatus.PENDING_APPROVAL.value),
+    'REJECT': (ApprovalStatus.DRAFT.value, ApprovalStatus.PENDING_APPROVAL.value),
+    'COMPLETE': (ApprovalStatus.APPROVED.value,),
+}
+
+# Contagem por status numa única consulta agrupada
+# (scripts/create-scheduled-assignments-table.sql)
+STATUS_COUNTS_RPC = 'scheduled_assignments_status_counts'
+
+# IDs por UPDATE em lote (limita o tamanho da URL do filtro in.())
+BULK_UPDATE_CHUNK_SIZE = 200
+
+
 def _row_to_stored(row: dict) -> StoredAssignment:
     """Converte row do Supabase para StoredAssignment"""
     return StoredAssignment(
@@ -100,6 +143,355 @@ def _row_to_stored(row: dict) -> StoredAssignment:
     )
 
 
+# Linhas por requisição na inserção em lote (limita o tamanho do corpo enviado)
+INSERT_CHUNK_SIZE = 500
+
+DEFAULT_DURATIONS = {
+    "Discurso": 10,
+    "Joias espirituais": 10,
+    "Leitura da Bíblia": 4,
+    "Iniciando conversas": 3,
+    "Cultivando o interesse": 4,
+    "Fazendo discípulos": 5,
+    "Necessidades locais": 10,
+}
+
+
+class BulkInsertError(RuntimeError):
+    """Falha parcial na inserção em lote: blocos anteriores já foram gravados"""
+    
+    def __init__(self, stored: List[StoredAssignment], failed_ids: List[str], cause: Exception):
+        self.stored = stored
+        self.failed_ids = failed_ids
+        self.cause = cause
+        super().__init__(
+            f"{len(stored)} designações gravadas, {len(failed_ids)} não gravadas: {cause}"
+        )
+
+
+def _part_duration(part_title: str, duration_map: Optional[dict]) -> int:
+    """Duração da parte (mapa informado ou duração padrão pelo título)"""
+    if duration_map and part_title in duration_map:
+        return duration_map[part_title]
+    for key, dur in DEFAULT_DURATIONS.items():
+        if key.lower() in part_title.lower():
+            return dur
+    return 0
+
+
+def _assignment_row(
+    week_id: str,
+    date: str,
+    a: GeneratedAssignment,
+    duration_map: Optional[dict],
+    now: str
+) -> dict:
+    """Linha de scheduled_assignments para uma designação gerada"""
+    return {
+        'id': str(uuid.uuid4()),
+        'week_id': week_id,
+        'part_id': f"{week_id}-{a.part_title.replace(' ', '-').lower()}",
+        'part_title': a.part_title,
+        'part_type': a.part_type.value if hasattr(a.part_type, 'value') else str(a.part_type),
+        'teaching_category': a.category.value if hasattr(a.category, 'value') else str(a.category),
+        'principal_publisher_id': a.principal_id or None,
+        'principal_publisher_name': a.principal_name,
+        'secondary_publisher_id': a.secondary_id or None,
+        'secondary_publisher_name': a.secondary_name,
+        'date': date,
+        'duration_min': _part_duration(a.part_title, duration_map),
+        'status': a.status.value if hasattr(a.status, 'value') else str(a.status),
+        'selection_reason': a.reason,
+        'score': a.score,
+        'pairing_reason': a.pairing_reason,
+        'created_at': now,
+    }
+
+
+def _approval_updates(action: Union[ApprovalAction, BulkApprovalAction]) -> dict:
+    """Campos alterados por uma ação de aprovação, rejeição ou conclusão"""
+    now = datetime.now().isoformat()
+    updates = {'updated_at': now}
+    
+    if action.action == 'APPROVE':
+        updates['status'] = ApprovalStatus.APPROVED.value
+        updates['approved_by_elder_id'] = action.elder_id
+        updates['approved_by_elder_name'] = action.elder_name
+        updates['approval_date'] = now
+        
+    elif action.action == 'REJECT':
+        updates['status'] = ApprovalStatus.REJECTED.value
+        updates['rejection_reason'] = action.reason
+        
+    elif action.action == 'COMPLETE':
+        updates['status'] = ApprovalStatus.COMPLETED.value
+        
+    else:
+        raise ValueError(f"Ação inválida: {action.action}")
+    
+    return updates
+
+
+def _bulk_plan(action: BulkApprovalAction) -> Tuple[List[str], Tuple[str, ...], dict]:
+    """IDs sem repetição, status de origem aceitos e campos alterados; ValueError se inválida"""
+    if action.action not in ALLOWED_TRANSITIONS:
+        raise ValueError(f"Ação inválida: {action.action}")
+    if action.action == 'REJECT' and not action.reason:
+        raise ValueError("Motivo é obrigatório para rejeição")
+    ids = list(dict.fromkeys(action.assignment_ids))
+    return ids, ALLOWED_TRANSITIONS[action.action], _approval_updates(action)
+
+
+def _chunks(ids: List[str]) -> List[List[str]]:
+    """IDs em blocos de BULK_UPDATE_CHUNK_SIZE"""
+    return [ids[start:start + BULK_UPDATE_CHUNK_SIZE] for start in range(0, len(ids), BULK_UPDATE_CHUNK_SIZE)]
+
+
+def _bulk_outcomes(
+    ids: List[str],
+    updated_rows: List[dict],
+    current_statuses: Dict[str, str],
+    errors: Optional[Dict[str, str]] = None
+) -> List[BulkApprovalOutcome]:
+    """Resultado por id, na ordem pedida"""
+    updated = {row['id']: row['status'] for row in updated_rows}
+    errors = errors or {}
+    outcomes = []
+    for assignment_id in ids:
+        if assignment_id in updated:
+            outcomes.append(BulkApprovalOutcome(assignment_id, 'updated', updated[assignment_id]))
+        elif assignment_id in errors:
+            outcomes.append(BulkApprovalOutcome(assignment_id, 'error', error=errors[assignment_id]))
+        elif assignment_id in current_statuses:
+            outcomes.append(BulkApprovalOutcome(assignment_id, 'invalid_status', current_statuses[assignment_id]))
+        else:
+            outcomes.append(BulkApprovalOutcome(assignment_id, 'not_found'))
+    return outcomes
+
+
+def _stats_summary(statuses: Iterable[str]) -> dict:
+    """Totais por status no formato de get_stats"""
+    by_status: dict = {}
+    for status in statuses:
+        by_status[status] = by_status.get(status, 0) + 1
+    return _stats_from_counts(sum(by_status.values()), by_status)
+
+
+def _stats_from_count_rows(rows: Iterable[dict]) -> dict:
+    """Estatísticas a partir das linhas (status, count) da contagem agrupada"""
+    by_status = {row['status']: int(row['count']) for row in rows}
+    return _stats_from_counts(sum(by_status.values()), by_status)
+
+
+def _stats_from_counts(total: int, by_status: Dict[str, int]) -> dict:
+    """Formato de get_stats a partir das contagens (status sem linhas omitidos)"""
+    by_status = {status: count for status, count in by_status.items() if count}
+    return {
+        "total": total,
+        "by_status": by_status,
+        "pending_count": by_status.get('PENDING_APPROVAL', 0),
+        "approved_count": by_status.get('APPROVED', 0),
+        "rejected_count": by_status.get('REJECTED', 0),
+        "completed_count": by_status.get('COMPLETED', 0),
+    }
+
+
+# ============================================================================
+# Cache de consultas
+# ============================================================================
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+STATUS_KEYS = [status.value for status in ApprovalStatus]
+
+
+# O cache só vê as escritas feitas por este processo. scheduled_assignments
+# também pode ser alterada direto no Supabase (clientes com a chave anônima,
+# SQL, triggers), e essas alterações aparecem nas leituras em cache só depois
+# do TTL: até 30 s por padrão. Use um TTL menor, ou 0, se isso importar.
+def cache_ttl() -> float:
+    """Validade das consultas em cache (RVM_APPROVAL_CACHE_TTL em s; 0 desativa)"""
+    value = os.getenv("RVM_APPROVAL_CACHE_TTL")
+    return max(0.0, float(value)) if value else 30.0
+
+
+class ApprovalQueryCache:
+    """
+    Cache das leituras de scheduled_assignments, por semana, por status e das
+    estatísticas. As entradas expiram após o TTL (alterações feitas fora deste
+    processo) e são invalidadas explicitamente pelas escritas do serviço.
+    Os objetos retornados são compartilhados e não devem ser alterados.
+    """
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, object]] = {}
+        # Incrementada a cada invalidação: uma leitura iniciada antes dela não
+        # grava o resultado (poderia ser anterior à escrita)
+        self._generation = 0
+    
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            return entry[1]
+    
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+    
+    def put(self, key: Hashable, value: object, generation: int) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+    
+    def invalidate(self, weeks: Iterable[str] = (), statuses: Optional[Iterable[str]] = None) -> None:
+        """
+        Descarta as semanas e os status afetados por uma escrita (todos os
+        status se `statuses` for None) e as estatísticas
+        """
+        weeks = set(weeks)
+        statuses = set(STATUS_KEYS if statuses is None else statuses)
+        with self._lock:
+            self._generation += 1
+            # Chaves começam por ("week", id) ou ("status", valor); páginas
+            # acrescentam colunas/cursor/limite depois disso
+            stale = [
+                key for key in self._entries
+                if key[0] == "stats"
+                or (key[0] == "week" and key[1] in weeks)
+                or (key[0] == "status" and key[1] in statuses)
+            ]
+            for key in stale:
+                del self._entries[key]
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+def _status_value(status) -> str:
+    return status.value if hasattr(status, 'value') else str(status)
+
+
+# ============================================================================
+# Projeção e paginação
+# ============================================================================
+
+# Colunas das listagens (a API não mostra as demais)
+PENDING_COLUMNS = (
+    'id', 'week_id', 'part_title', 'principal_publisher_name',
+    'secondary_publisher_name', 'status', 'selection_reason', 'created_at',
+)
+WEEK_COLUMNS = (
+    'id', 'part_title', 'part_type', 'principal_publisher_name', 'secondary_publisher_name',
+    'status', 'score', 'selection_reason', 'approved_by_elder_name', 'rejection_reason',
+)
+
+# Ordem estável das páginas: (week_id, created_at) e id para desempate
+# (designações de uma mesma geração têm o mesmo created_at). created_at aceita
+# NULL: essas linhas vêm primeiro em cada semana (NULLS FIRST)
+KEYSET_COLUMNS = ('week_id', 'created_at', 'id')
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+@dataclass
+class AssignmentPage:
+    """Página de linhas projetadas (dicts só com as colunas pedidas)"""
+    rows: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Cursor opaco com a chave da última linha da página"""
+    key = [row[column] for column in KEYSET_COLUMNS]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Optional[str], str]:
+    """Chave (week_id, created_at, id) de um cursor; ValueError se inválido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not isinstance(key, list) or len(key) != len(KEYSET_COLUMNS):
+        raise ValueError("Cursor inválido")
+    week_id, created_at, row_id = key
+    if not isinstance(week_id, str) or not isinstance(row_id, str) or not isinstance(created_at, (str, type(None))):
+        raise ValueError("Cursor inválido")
+    return week_id, created_at, row_id
+
+
+def _keyset_sort_key(week_id: str, created_at: Optional[str], row_id: str) -> tuple:
+    """Chave de ordenação equivalente a (week_id, created_at NULLS FIRST, id)"""
+    return week_id, created_at is not None, created_at or "", row_id
+
+
+def _quote(value: str) -> str:
+    # Valores entre aspas nos filtros or=(): datas têm ':' e '.'
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _keyset_filter(key: Tuple[str, Optional[str], str], fixed_week: bool) -> str:
+    """Filtro PostgREST para as linhas depois de `key` na ordem KEYSET_COLUMNS"""
+    week_id, created_at, row_id = key
+    row_id = _quote(row_id)
+    if created_at is None:
+        # Depois de uma linha sem created_at: as outras sem created_at (por id)
+        # e todas as que têm created_at
+        after_in_week = [("created_at.is.null", f"id.gt.{row_id}"), ("created_at.not.is.null",)]
+    else:
+        created_at = _quote(created_at)
+        after_in_week = [(f"created_at.gt.{created_at}",), (f"created_at.eq.{created_at}", f"id.gt.{row_id}")]
+    
+    conditions = []
+    if not fixed_week:
+        week_id = _quote(week_id)
+        conditions.append(f"week_id.gt.{week_id}")
+        after_in_week = [(f"week_id.eq.{week_id}", *terms) for terms in after_in_week]
+    conditions.extend(terms[0] if len(terms) == 1 else f"and({','.join(terms)})" for terms in after_in_week)
+    return ",".join(conditions)
+
+
+def _projection(columns: Sequence[str]) -> List[str]:
+    """Colunas pedidas mais as da chave de paginação"""
+    return list(dict.fromkeys([*columns, *KEYSET_COLUMNS]))
+
+
+def _scope_filter(scope: Tuple[str, str]) -> Tuple[str, str]:
+    """Filtro de igualdade de um escopo de cache ("week" -> week_id, "status" -> status)"""
+    field, value = scope
+    return ('week_id' if field == 'week' else field), value
+
+
+def _page_from_rows(rows: List[dict], columns: Sequence[str], limit: Optional[int]) -> AssignmentPage:
+    """Recorta as linhas (buscadas com limit + 1) e calcula o próximo cursor"""
+    if limit is None:
+        limit = len(rows)
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return AssignmentPage(
+        rows=[{column: row.get(column) for column in columns} for row in rows[:limit]],
+        next_cursor=next_cursor,
+    )
+
+
+# ============================================================================
+# Serviço
+# ============================================================================
+
 class ApprovalService:
     """Serviço para gerenciar aprovações de designações"""
     
@@ -110,11 +502,37 @@ class ApprovalService:
         """
         self._use_supabase = use_supabase
         self._memory_storage: dict = {}  # Fallback para testes
+        self.cache = ApprovalQueryCache(cache_ttl())
     
     def _get_supabase(self):
         """Retorna cliente Supabase"""
         return get_supabase()
     
+    def _cached(self, key: Hashable, load: Callable[[], T]) -> T:
+        """Leitura através do cache"""
+        value = self.cache.get(key)
+        if value is _MISSING:
+            generation = self.cache.generation()
+            value = load()
+            self.cache.put(key, value, generation)
+        return value
+    
+    async def _cached_async(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Leitura através do cache (carga assíncrona)"""
+        value = self.cache.get(key)
+        if value is _MISSING:
+            generation = self.cache.generation()
+            value = await load()
+            self.cache.put(key, value, generation)
+        return value
+    
+    def _invalidate_rows(self, rows: Iterable[dict], statuses: Optional[Iterable[str]] = ()) -> None:
+        """Invalida as semanas (e status) das linhas escritas"""
+        rows = list(rows)
+        if statuses is not None:
+            statuses = set(statuses) | {row['status'] for row in rows if row.get('status')}
+        self.cache.invalidate({row['week_id'] for row in rows}, statuses)
+    
     def get_assignment(self, assignment_id: str) -> Optional[StoredAssignment]:
         """Busca uma designação pelo ID"""
         if not self._use_supabase:
@@ -130,25 +548,58 @@ class ApprovalService:
         if not self._use_supabase:
             return [a for a in self._memory_storage.values() if a.week_id == week_id]
         
-        result = self._get_supabase().table('scheduled_assignments').select('*').eq('week_id', week_id).order('created_at').execute()
-        return [_row_to_stored(row) for row in (result.data or [])]
+        def load():
+            result = self._get_supabase().table('scheduled_assignments').select('*').eq('week_id', week_id).order('created_at').execute()
+            return [_row_to_stored(row) for row in (result.data or [])]
+        
+        return self._cached(("week", week_id), load)
     
     def get_pending_approvals(self) -> List[StoredAssignment]:
         """Lista todas as designações pendentes de aprovação"""
         if not self._use_supabase:
             return [a for a in self._memory_storage.values() if a.status == ApprovalStatus.PENDING_APPROVAL]
         
-        result = self._get_supabase().table('scheduled_assignments').select('*').eq('status', 'PENDING_APPROVAL').execute()
-        return [_row_to_stored(row) for row in (result.data or [])]
+        return self._cached(("status", 'PENDING_APPROVAL'), lambda: self._load_status('PENDING_APPROVAL'))
     
     def get_approved(self) -> List[StoredAssignment]:
         """Lista todas as designações aprovadas"""
         if not self._use_supabase:
             return [a for a in self._memory_storage.values() if a.status == ApprovalStatus.APPROVED]
         
-        result = self._get_supabase().table('scheduled_assignments').select('*').eq('status', 'APPROVED').execute()
+        return self._cached(("status", 'APPROVED'), lambda: self._load_status('APPROVED'))
+    
+    def _load_status(self, status: str) -> List[StoredAssignment]:
+        result = self._get_supabase().table('scheduled_assignments').select('*').eq('status', status).execute()
         return [_row_to_stored(row) for row in (result.data or [])]
     
+    # ------------------------------------------------------------------
+    # Listagens paginadas (só as colunas exibidas)
+    # ------------------------------------------------------------------
+    
+    def _page_query(self, client, scope, week_id, limit, key, columns):
+        query = client.table('scheduled_assignments').select(",".join(_projection(columns))).eq(*_scope_filter(scope))
+        if key is not None:
+            query = query.or_(_keyset_filter(key, fixed_week=week_id is not None))
+        for column in KEYSET_COLUMNS:
+            query = query.order(column, nullsfirst=column == 'created_at')
+        if limit is None:
+            return query
+        # Uma linha a mais indica se há próxima página
+        return query.limit(limit + 1)
+    
+    def _memory_page(self, scope, limit, key, columns) -> AssignmentPage:
+        rows = [
+            {**a.__dict__, 'status': _status_value(a.status)}
+            for a in self._memory_storage.values()
+        ]
+        column, value = _scope_filter(scope)
+        rows = [row for row in rows if row[column] == value]
+        sort_key = lambda row: _keyset_sort_key(*(row[column] for column in KEYSET_COLUMNS))
+        rows.sort(key=sort_key)
+        if key is not None:
+            rows = [row for row in rows if sort_key(row) > _keyset_sort_key(*key)]
+        return _page_from_rows(rows if limit is None else rows[:limit + 1], columns, limit)
+    
     def process_approval(
         self,
         action: ApprovalAction,
@@ -164,27 +615,11 @@ class ApprovalService:
         if not assignment:
             raise ValueError(f"Designação não encontrada: {action.assignment_id}")
         
-        now = datetime.now().isoformat()
-        updates = {'updated_at': now}
-        
-        if action.action == 'APPROVE':
-            updates['status'] = ApprovalStatus.APPROVED.value
-            updates['approved_by_elder_id'] = action.elder_id
-            updates['approved_by_elder_name'] = action.elder_name
-            updates['approval_date'] = now
-            
-        elif action.action == 'REJECT':
-            updates['status'] = ApprovalStatus.REJECTED.value
-            updates['rejection_reason'] = action.reason
-            
-        elif action.action == 'COMPLETE':
-            updates['status'] = ApprovalStatus.COMPLETED.value
-            
-        else:
-            raise ValueError(f"Ação inválida: {action.action}")
+        updates = _approval_updates(action)
         
         if self._use_supabase:
             result = self._get_supabase().table('scheduled_assignments').update(updates).eq('id', action.assignment_id).execute()
+            self.cache.invalidate([assignment.week_id], [_status_value(assignment.status), updates['status']])
             if result.data:
                 return _row_to_stored(result.data[0])
         else:
@@ -211,8 +646,62 @@ class ApprovalService:
         }).in_('id', assignment_ids).execute()
         
         result = self._get_supabase().table('scheduled_assignments').select('*').in_('id', assignment_ids).execute()
+        # Status anteriores desconhecidos: todas as listas por status são descartadas
+        self._invalidate_rows(result.data or [], statuses=None)
         return [_row_to_stored(row) for row in (result.data or [])]
     
+    def process_bulk_approval(self, action: BulkApprovalAction) -> List[BulkApprovalOutcome]:
+        """
+        Aplica uma ação a várias designações com um UPDATE condicional
+        (id in (...) e status de origem válido) por bloco de ids, que devolve
+        as linhas alteradas. Só quando alguma não muda é feita uma leitura
+        (id, status) para diferenciar status inválido de id inexistente.
+        Se a requisição de um bloco falhar, os ids dele ficam como 'error' e
+        os demais blocos seguem.
+        """
+        ids, allowed, updates = _bulk_plan(action)
+        if not self._use_supabase:
+            return self._memory_bulk_approval(ids, allowed, updates)
+        
+        table = self._get_supabase().table('scheduled_assignments')
+        updated_rows: List[dict] = []
+        errors: Dict[str, str] = {}
+        for chunk in _chunks(ids):
+            try:
+                result = table.update(updates).in_('id', chunk).in_('status', list(allowed)).execute()
+            except Exception as e:
+                errors.update(dict.fromkeys(chunk, str(e)))
+                continue
+            updated_rows.extend(result.data or [])
+        self._invalidate_rows(updated_rows, statuses=[*allowed, updates['status']])
+        
+        current: Dict[str, str] = {}
+        updated_ids = {row['id'] for row in updated_rows}
+        for chunk in _chunks([i for i in ids if i not in updated_ids and i not in errors]):
+            try:
+                result = table.select('id,status').in_('id', chunk).execute()
+            except Exception as e:
+                errors.update(dict.fromkeys(chunk, str(e)))
+                continue
+            current.update((row['id'], row['status']) for row in (result.data or []))
+        
+        return _bulk_outcomes(ids, updated_rows, current, errors)
+    
+    def _memory_bulk_approval(self, ids, allowed, updates) -> List[BulkApprovalOutcome]:
+        updated_rows = []
+        current = {}
+        for assignment_id in ids:
+            assignment = self._memory_storage.get(assignment_id)
+            if assignment is None:
+                continue
+            current[assignment_id] = _status_value(assignment.status)
+            if current[assignment_id] in allowed:
+                for key, value in updates.items():
+                    setattr(assignment, key, value)
+                assignment.status = ApprovalStatus(updates['status'])
+                updated_rows.append({'id': assignment_id, 'status': updates['status']})
+        return _bulk_outcomes(ids, updated_rows, current)
+    
     def promote_to_history(self, assignment_ids: List[str]) -> List[str]:
         """
         DESATIVADO (2026-06-01): a tabela history_records foi removida (fóssil sem
@@ -292,115 +781,235 @@ class ApprovalService:
         duration_map: dict = None
     ) -> List[StoredAssignment]:
         """
-        Armazena designações geradas pelo motor.
+        Armazena designações geradas pelo motor (uma única inserção em lote).
         """
         now = datetime.now().isoformat()
-        
-        default_durations = {
-            "Discurso": 10,
-            "Joias espirituais": 10,
-            "Leitura da Bíblia": 4,
-            "Iniciando conversas": 3,
-            "Cultivando o interesse": 4,
-            "Fazendo discípulos": 5,
-            "Necessidades locais": 10,
-        }
+        rows = [_assignment_row(week_id, date, a, duration_map, now) for a in assignments]
+        return self._insert_rows(rows)
+    
+    def _insert_rows(self, rows: List[dict]) -> List[StoredAssignment]:
+        """
+        Insere as linhas em blocos de INSERT_CHUNK_SIZE (uma requisição por
+        bloco; cada bloco é gravado por inteiro ou não é gravado). Os registros
+        devolvidos vêm da resposta do servidor. Se um bloco falhar, os seguintes
+        não são enviados e BulkInsertError informa o que já foi gravado.
+        """
+        if not self._use_supabase:
+            stored_list = [_row_to_stored(row) for row in rows]
+            for stored in stored_list:
+                self._memory_storage[stored.id] = stored
+            return stored_list
         
         stored_list = []
+        table = self._get_supabase().table('scheduled_assignments')
+        try:
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + INSERT_CHUNK_SIZE]
+                try:
+                    result = table.insert(chunk).execute()
+                except Exception as e:
+                    raise BulkInsertError(stored_list, [row['id'] for row in rows[start:]], e) from e
+                stored_list.extend(_row_to_stored(row) for row in (result.data or []))
+        finally:
+            # Também em falha parcial: blocos anteriores já foram gravados
+            self._invalidate_rows(rows)
         
-        for a in assignments:
-            # Determinar duração
-            duration = 0
-            if duration_map and a.part_title in duration_map:
-                duration = duration_map[a.part_title]
+        return stored_list
+    
+    def _memory_statuses(self) -> List[str]:
+        return [
+            a.status.value if hasattr(a.status, 'value') else str(a.status)
+            for a in self._memory_storage.values()
+        ]
+    
+    def get_stats(self) -> dict:
+        """Retorna estatísticas das designações"""
+        if not self._use_supabase:
+            return _stats_summary(self._memory_statuses())
+        
+        return self._cached(("stats",), self._count_by_status)
+    
+    def _count_by_status(self) -> dict:
+        # Uma consulta agrupada (GET: função STABLE, pode ser repetida): as
+        # contagens e o total vêm do mesmo snapshot
+        result = self._get_supabase().rpc(STATUS_COUNTS_RPC, {}, get=True).execute()
+        return _stats_from_count_rows(result.data or [])
+    
+    # ========================================================================
+    # Variantes assíncronas (rotas async: cliente PostgREST com pool de conexões)
+    # ========================================================================
+    
+    def _get_async_supabase(self) -> AsyncPostgrestClient:
+        """Retorna o cliente PostgREST assíncrono do event loop atual"""
+        return get_async_supabase()
+    
+    async def get_assignment_async(self, assignment_id: str) -> Optional[StoredAssignment]:
+        """Busca uma designação pelo ID"""
+        if not self._use_supabase:
+            return self.get_assignment(assignment_id)
+        
+        result = await self._get_async_supabase().table('scheduled_assignments').select('*').eq('id', assignment_id).execute()
+        if result.data:
+            return _row_to_stored(result.data[0])
+        return None
+    
+    async def list_pending_page_async(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: Sequence[str] = PENDING_COLUMNS
+    ) -> AssignmentPage:
+        """
+        Página de designações pendentes, em ordem de semana; ValueError se o
+        cursor for inválido. Sem limit e sem cursor, todas numa só página.
+        """
+        return await self._page_async(('status', 'PENDING_APPROVAL'), None, limit, cursor, columns)
+    
+    async def list_week_page_async(
+        self,
+        week_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        columns: Sequence[str] = WEEK_COLUMNS
+    ) -> AssignmentPage:
+        """Página das designações de uma semana, em ordem de criação"""
+        return await self._page_async(('week', week_id), week_id, limit, cursor, columns)
+    
+    async def _page_async(self, scope: Tuple[str, str], week_id, limit, cursor, columns) -> AssignmentPage:
+        key = decode_cursor(cursor) if cursor else None
+        if limit is None and key is not None:
+            limit = DEFAULT_PAGE_SIZE  # quem segue um cursor está paginando
+        if limit is not None:
+            limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if not self._use_supabase:
+            return self._memory_page(scope, limit, key, columns)
+        
+        async def load():
+            query = self._page_query(self._get_async_supabase(), scope, week_id, limit, key, columns)
+            return _page_from_rows((await query.execute()).data or [], columns, limit)
+        
+        return await self._cached_async((*scope, "page", tuple(columns), cursor, limit), load)
+    
+    async def process_approval_async(self, action: ApprovalAction) -> StoredAssignment:
+        """Processa uma ação de aprovação, rejeição ou conclusão"""
+        if not self._use_supabase:
+            return self.process_approval(action, [], [], [])
+        
+        assignment = await self.get_assignment_async(action.assignment_id)
+        if not assignment:
+            raise ValueError(f"Designação não encontrada: {action.assignment_id}")
+        
+        updates = _approval_updates(action)
+        result = await self._get_async_supabase().table('scheduled_assignments').update(updates).eq('id', action.assignment_id).execute()
+        self.cache.invalidate([assignment.week_id], [_status_value(assignment.status), updates['status']])
+        if result.data:
+            return _row_to_stored(result.data[0])
+        return assignment
+    
+    async def process_bulk_approval_async(self, action: BulkApprovalAction) -> List[BulkApprovalOutcome]:
+        """Mesma semântica de process_bulk_approval (blocos enviados em paralelo)"""
+        ids, allowed, updates = _bulk_plan(action)
+        if not self._use_supabase:
+            return self._memory_bulk_approval(ids, allowed, updates)
+        
+        client = self._get_async_supabase()
+        chunks = _chunks(ids)
+        # UPDATE condicional não é repetido depois de enviado: se a resposta
+        # se perder, a nova tentativa não acharia mais as linhas no status de
+        # origem e elas apareceriam como 'invalid_status' em vez de 'error'
+        results = await asyncio.gather(
+            *(
+                without_resend(
+                    client.table('scheduled_assignments').update(updates).in_('id', chunk).in_('status', list(allowed))
+                ).execute()
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        updated_rows: List[dict] = []
+        errors: Dict[str, str] = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                errors.update(dict.fromkeys(chunk, str(result)))
+            elif isinstance(result, BaseException):
+                raise result
             else:
-                for key, dur in default_durations.items():
-                    if key.lower() in a.part_title.lower():
-                        duration = dur
-                        break
-            
-            assignment_id = str(uuid.uuid4())
-            part_id = f"{week_id}-{a.part_title.replace(' ', '-').lower()}"
-            
-            row = {
-                'id': assignment_id,
-                'week_id': week_id,
-                'part_id': part_id,
-                'part_title': a.part_title,
-                'part_type': a.part_type.value if hasattr(a.part_type, 'value') else str(a.part_type),
-                'teaching_category': a.category.value if hasattr(a.category, 'value') else str(a.category),
-                'principal_publisher_id': a.principal_id or None,
-                'principal_publisher_name': a.principal_name,
-                'secondary_publisher_id': a.secondary_id or None,
-                'secondary_publisher_name': a.secondary_name,
-                'date': date,
-                'duration_min': duration,
-                'status': a.status.value if hasattr(a.status, 'value') else str(a.status),
-                'selection_reason': a.reason,
-                'score': a.score,
-                'pairing_reason': a.pairing_reason,
-                'created_at': now,
-            }
-            
-            if self._use_supabase:
-                self._get_supabase().table('scheduled_assignments').insert(row).execute()
-            
-            stored = StoredAssignment(
-                id=assignment_id,
-                week_id=week_id,
-                part_id=part_id,
-                part_title=a.part_title,
-                part_type=row['part_type'],
-                teaching_category=row['teaching_category'],
-                principal_publisher_id=a.principal_id or '',
-                principal_publisher_name=a.principal_name,
-                secondary_publisher_id=a.secondary_id,
-                secondary_publisher_name=a.secondary_name,
-                date=date,
-                duration_min=duration,
-                room=None,
-                status=a.status,
-                approved_by_elder_id=None,
-                approved_by_elder_name=None,
-                approval_date=None,
-                rejection_reason=None,
-                selection_reason=a.reason,
-                score=a.score,
-                pairing_reason=a.pairing_reason,
-                created_at=now,
-                updated_at=None
-            )
-            
-            if not self._use_supabase:
-                self._memory_storage[stored.id] = stored
-            
-            stored_list.append(stored)
+                updated_rows.extend(result.data or [])
+        self._invalidate_rows(updated_rows, statuses=[*allowed, updates['status']])
+        
+        current: Dict[str, str] = {}
+        updated_ids = {row['id'] for row in updated_rows}
+        chunks = _chunks([i for i in ids if i not in updated_ids and i not in errors])
+        lookups = await asyncio.gather(
+            *(client.table('scheduled_assignments').select('id,status').in_('id', chunk).execute() for chunk in chunks),
+            return_exceptions=True,
+        )
+        for chunk, result in zip(chunks, lookups):
+            if isinstance(result, Exception):
+                errors.update(dict.fromkeys(chunk, str(result)))
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                current.update((row['id'], row['status']) for row in (result.data or []))
+        
+        return _bulk_outcomes(ids, updated_rows, current, errors)
+    
+    async def store_generated_assignments_async(
+        self,
+        week_id: str,
+        date: str,
+        assignments: List[GeneratedAssignment],
+        duration_map: dict = None
+    ) -> List[StoredAssignment]:
+        """Armazena designações geradas pelo motor (uma única inserção em lote)"""
+        now = datetime.now().isoformat()
+        rows = [_assignment_row(week_id, date, a, duration_map, now) for a in assignments]
+        return await self._insert_rows_async(rows)
+    
+    async def store_generated_weeks_async(
+        self,
+        weeks: List[GeneratedWeek],
+        duration_map: dict = None
+    ) -> List[StoredAssignment]:
+        """Armazena as designações de várias semanas numa inserção em lote"""
+        now = datetime.now().isoformat()
+        rows = [
+            _assignment_row(w.week, w.date, a, duration_map, now)
+            for w in weeks
+            for a in w.assignments
+        ]
+        return await self._insert_rows_async(rows)
+    
+    async def _insert_rows_async(self, rows: List[dict]) -> List[StoredAssignment]:
+        """Mesma semântica de _insert_rows (blocos, BulkInsertError)"""
+        if not self._use_supabase:
+            return self._insert_rows(rows)
+        
+        stored_list = []
+        table = self._get_async_supabase().table('scheduled_assignments')
+        try:
+            for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + INSERT_CHUNK_SIZE]
+                try:
+                    result = await table.insert(chunk).execute()
+                except Exception as e:
+                    raise BulkInsertError(stored_list, [row['id'] for row in rows[start:]], e) from e
+                stored_list.extend(_row_to_stored(row) for row in (result.data or []))
+        finally:
+            self._invalidate_rows(rows)
         
         return stored_list
     
-    def get_stats(self) -> dict:
+    async def get_stats_async(self) -> dict:
         """Retorna estatísticas das designações"""
         if not self._use_supabase:
-            total = len(self._memory_storage)
-            by_status = {}
-            for a in self._memory_storage.values():
-                status = a.status.value if hasattr(a.status, 'value') else str(a.status)
-                by_status[status] = by_status.get(status, 0) + 1
-        else:
-            result = self._get_supabase().table('scheduled_assignments').select('status').execute()
-            by_status = {}
-            for row in (result.data or []):
-                by_status[row['status']] = by_status.get(row['status'], 0) + 1
-            total = len(result.data or [])
-        
-        return {
-            "total": total,
-            "by_status": by_status,
-            "pending_count": by_status.get('PENDING_APPROVAL', 0),
-            "approved_count": by_status.get('APPROVED', 0),
-            "rejected_count": by_status.get('REJECTED', 0),
-            "completed_count": by_status.get('COMPLETED', 0),
-        }
+            return self.get_stats()
+        
+        return await self._cached_async(("stats",), self._count_by_status_async)
+    
+    async def _count_by_status_async(self) -> dict:
+        result = await self._get_async_supabase().rpc(STATUS_COUNTS_RPC, {}, get=True).execute()
+        return _stats_from_count_rows(result.data or [])
 
 
 # Instância global do serviço
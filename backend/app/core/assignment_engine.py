@@ -2,16 +2,25 @@
 Motor de Designações Baseado em Regras
 Sistema determinístico para alocação de partes na reunião RV&M
 """
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, List, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
-from app.models.schemas import (
-    Publisher,
-    Participation,
-    ParticipationType,
+import numpy as np
+
+from app.models.schemas import ParticipationType
+from app.core.participation_index import ParticipationIndex, parse_date_ordinal
+from app.core import engine_models as em
+from app.core.engine_models import (
+    EnginePublisher,
+    PublisherLike,
+    ParticipationLike,
+    to_engine_publishers,
+    to_engine_participations,
 )
+from app.core.assignment_solver import solve_max_weight_assignment
+from app.core.eligibility import EligibilityMatrix
 
 
 # ============================================================================
@@ -32,6 +41,11 @@ class TeachingCategory(str, Enum):
     HELPER = "HELPER"       # Peso 0.1 - Ajudante em demonstrações
 
 
+class SolverMode(str, Enum):
+    GREEDY = "greedy"       # Preenche parte a parte, na ordem da lista
+    OPTIMAL = "optimal"     # Emparelhamento ótimo da semana inteira
+
+
 @dataclass
 class EngineConfig:
     """Configuração do Motor de Designações"""
@@ -51,6 +65,9 @@ class EngineConfig:
     # Pareamento
     prefer_same_gender: bool = True
     prefer_family: bool = True
+    
+    # Estratégia de seleção dos titulares
+    solver: SolverMode = SolverMode.GREEDY
 
 
 DEFAULT_CONFIG = EngineConfig()
@@ -108,22 +125,17 @@ def get_weight_for_category(category: TeachingCategory, config: EngineConfig) ->
 @dataclass
 class FilterResult:
     """Resultado da filtragem"""
-    eligible: List[Publisher]
-    rejected: List[Tuple[Publisher, str]]  # (publisher, motivo)
+    eligible: List[EnginePublisher]
+    rejected: List[Tuple[EnginePublisher, str]]  # (publisher, motivo)
 
 
-def is_publisher_available(publisher: Publisher, date: str) -> bool:
+def is_publisher_available(publisher: EnginePublisher, date: str) -> bool:
     """Verifica se o publicador está disponível na data"""
-    availability = publisher.availability
-    
-    if availability.mode == "always":
-        return date not in availability.exception_dates
-    else:
-        return date in availability.exception_dates
+    return publisher.is_available(parse_date_ordinal(date))
 
 
 def apply_rigid_filters(
-    publishers: List[Publisher],
+    publishers: List[PublisherLike],
     part_type: ParticipationType,
     part_title: str,
     date: str,
@@ -133,27 +145,30 @@ def apply_rigid_filters(
     """
     Aplica filtros rígidos que eliminam candidatos.
     Retorna lista de elegíveis e lista de rejeitados com motivos.
+    
+    O motor usa a versão vetorizada (`EligibilityMatrix`); esta função é a
+    referência das regras e a fonte dos motivos de rejeição.
     """
     eligible = []
     rejected = []
     
-    for publisher in publishers:
+    for publisher in to_engine_publishers(publishers):
         # Regra 1: Já designado nesta reunião
         if publisher.id in already_assigned or publisher.name in already_assigned:
             rejected.append((publisher, "Já tem designação nesta reunião"))
             continue
         
         # Regra 2: Status de serviço
-        if not publisher.is_serving:
+        if not publisher.has(em.SERVING):
             rejected.append((publisher, "Não está servindo atualmente"))
             continue
         
         # Regra 3: Exclusões especiais
-        if getattr(publisher, 'is_not_qualified', False):
+        if publisher.has(em.NOT_QUALIFIED):
             rejected.append((publisher, "Não está apto"))
             continue
             
-        if getattr(publisher, 'requested_no_participation', False):
+        if publisher.has(em.REQUESTED_NO_PARTICIPATION):
             rejected.append((publisher, "Pediu para não participar"))
             continue
         
@@ -175,7 +190,7 @@ def apply_rigid_filters(
             continue
         
         # Regra 7: Apenas ajudante
-        if publisher.is_helper_only and part_type != ParticipationType.AJUDANTE:
+        if publisher.has(em.HELPER_ONLY) and part_type != ParticipationType.AJUDANTE:
             rejected.append((publisher, "Participa apenas como ajudante"))
             continue
         
@@ -185,75 +200,73 @@ def apply_rigid_filters(
 
 
 def check_part_eligibility(
-    publisher: Publisher,
+    publisher: EnginePublisher,
     part_type: ParticipationType,
     part_title: str
 ) -> Tuple[bool, str]:
     """Verifica privilégios específicos para o tipo de parte"""
-    privileges = publisher.privileges
+    is_brother = publisher.has(em.BROTHER)
     
     # Tesouros - Discursos e Joias
     if part_type == ParticipationType.TESOUROS:
         if "Discurso" in part_title or "Joias" in part_title:
-            if publisher.gender != "brother":
+            if not is_brother:
                 return False, "Apenas irmãos podem dar discursos"
-            if not privileges.can_give_talks:
+            if not publisher.has(em.CAN_GIVE_TALKS):
                 return False, "Não tem privilégio de dar discursos"
         
         if "Leitura" in part_title:
-            if publisher.gender != "brother":
+            if not is_brother:
                 return False, "Apenas irmãos podem fazer leitura da Bíblia"
     
     # Presidente
     if part_type == ParticipationType.PRESIDENTE:
-        if publisher.gender != "brother":
+        if not is_brother:
             return False, "Apenas irmãos podem presidir"
-        if not privileges.can_preside:
+        if not publisher.has(em.CAN_PRESIDE):
             return False, "Não tem privilégio de presidir"
     
     # Orações
     if part_type in [ParticipationType.ORACAO_INICIAL, ParticipationType.ORACAO_FINAL]:
-        if publisher.gender != "brother":
+        if not is_brother:
             return False, "Apenas irmãos batizados podem fazer oração"
-        if not publisher.is_baptized:
+        if not publisher.has(em.BAPTIZED):
             return False, "Precisa ser batizado para fazer oração"
-        if not privileges.can_pray:
+        if not publisher.has(em.CAN_PRAY):
             return False, "Não tem privilégio de oração"
     
     # Dirigente EBC
     if part_type == ParticipationType.DIRIGENTE:
-        if publisher.gender != "brother":
+        if not is_brother:
             return False, "Apenas irmãos podem dirigir o Estudo"
-        if not privileges.can_conduct_cbs:
+        if not publisher.has(em.CAN_CONDUCT_CBS):
             return False, "Não tem privilégio de dirigir o Estudo"
     
     # Leitor EBC
     if part_type == ParticipationType.LEITOR:
-        if publisher.gender != "brother":
+        if not is_brother:
             return False, "Apenas irmãos podem ler no Estudo"
-        if not privileges.can_read_cbs:
+        if not publisher.has(em.CAN_READ_CBS):
             return False, "Não tem privilégio de ler no Estudo"
     
     return True, "Elegível"
 
 
 def check_section_privileges(
-    publisher: Publisher,
+    publisher: EnginePublisher,
     part_type: ParticipationType
 ) -> Tuple[bool, str]:
     """Verifica privilégios por seção da reunião"""
-    section_privileges = publisher.privileges_by_section
-    
     if part_type == ParticipationType.TESOUROS:
-        if not section_privileges.can_participate_in_treasures:
+        if not publisher.has(em.IN_TREASURES):
             return False, "Não participa na seção Tesouros"
     
     if part_type == ParticipationType.MINISTERIO:
-        if not section_privileges.can_participate_in_ministry:
+        if not publisher.has(em.IN_MINISTRY):
             return False, "Não participa na seção Ministério"
     
     if part_type == ParticipationType.VIDA_CRISTA:
-        if not section_privileges.can_participate_in_life:
+        if not publisher.has(em.IN_LIFE):
             return False, "Não participa na seção Nossa Vida"
     
     return True, "Elegível"
@@ -266,7 +279,7 @@ def check_section_privileges(
 @dataclass
 class RankedCandidate:
     """Candidato com pontuação calculada"""
-    publisher: Publisher
+    publisher: EnginePublisher
     score: float
     days_since_last: int
     category_weight: float
@@ -275,86 +288,94 @@ class RankedCandidate:
     reason: str
 
 
+def parse_reference_date(date: str) -> datetime:
+    """
+    Data de referência do motor, derivada da data da reunião.
+    Usar a data da reunião (e não o relógio) torna as gerações reproduzíveis.
+    """
+    try:
+        return datetime.fromisoformat(date)
+    except (TypeError, ValueError):
+        raise ValueError(f"Data da reunião inválida: {date}")
+
+
+def _reference_ordinal(reference_date: Optional[datetime]) -> int:
+    """Ordinal da data de referência (hoje, se não informada)"""
+    return (reference_date or datetime.now()).toordinal()
+
+
 def calculate_days_since_last(
     publisher_name: str,
-    participations: List[Participation],
-    reference_date: Optional[datetime] = None
+    participations: List[ParticipationLike],
+    reference_date: Optional[datetime] = None,
+    index: Optional[ParticipationIndex] = None
 ) -> int:
     """Calcula dias desde a última participação do publicador"""
-    if reference_date is None:
-        reference_date = datetime.now()
-    
-    publisher_participations = [
-        p for p in participations
-        if p.publisher_name.lower() == publisher_name.lower()
-    ]
+    if index is None:
+        index = ParticipationIndex(participations)
     
-    if not publisher_participations:
+    last_date = index.last_date(publisher_name)
+    if last_date is None:
         return 9999  # Nunca participou
     
-    # Encontrar a data mais recente
-    last_date = max(
-        datetime.fromisoformat(p.date) 
-        for p in publisher_participations
-    )
-    
-    return (reference_date - last_date).days
+    return _reference_ordinal(reference_date) - last_date
 
 
 def calculate_cooldown_penalty(
     publisher_name: str,
     part_title: str,
-    participations: List[Participation],
-    config: EngineConfig
+    participations: List[ParticipationLike],
+    config: EngineConfig,
+    index: Optional[ParticipationIndex] = None,
+    reference_date: Optional[datetime] = None
 ) -> float:
     """Calcula penalidade se fez a mesma parte recentemente"""
     weeks_limit = config.cooldown_same_part_weeks
-    cutoff_date = datetime.now() - timedelta(weeks=weeks_limit)
+    cutoff_date = _reference_ordinal(reference_date) - weeks_limit * 7
     
-    for p in participations:
-        if p.publisher_name.lower() != publisher_name.lower():
-            continue
-        
-        try:
-            part_date = datetime.fromisoformat(p.date)
-        except:
-            continue
-        
-        if part_date < cutoff_date:
-            continue
-        
-        # Verificar se é a mesma parte
-        if p.part_title.lower() == part_title.lower():
-            return config.cooldown_penalty_points
+    if index is None:
+        index = ParticipationIndex(participations)
+    
+    last_same_part = index.last_part_date(publisher_name, part_title)
+    if last_same_part is not None and last_same_part >= cutoff_date:
+        return config.cooldown_penalty_points
     
     return 0
 
 
-def rank_candidates(
-    candidates: List[Publisher],
-    participations: List[Participation],
-    part_title: str,
-    category: TeachingCategory,
-    config: EngineConfig = DEFAULT_CONFIG
-) -> List[RankedCandidate]:
-    """
-    Rankeia candidatos por prioridade ponderada.
-    Fórmula: Score = (Dias × Peso) - Penalidade + Bônus
-    """
-    ranked = []
-    weight = get_weight_for_category(category, config)
-    
-    for publisher in candidates:
-        days = calculate_days_since_last(publisher.name, participations)
-        cooldown = calculate_cooldown_penalty(
-            publisher.name, part_title, participations, config
-        )
-        bonus = config.bonus_never_participated if days >= 9999 else 0
+@dataclass
+class ScoredCandidates:
+    """Pontuações vetorizadas de um conjunto de candidatos"""
+    candidates: List[EnginePublisher]
+    days: np.ndarray        # dias desde a última participação (9999 = nunca)
+    cooldown: np.ndarray    # penalidade por repetição
+    bonus: np.ndarray       # bônus por nunca ter participado
+    scores: np.ndarray
+    weight: float
+    
+    def top_k(self, k: Optional[int] = None) -> np.ndarray:
+        """
+        Índices dos k melhores candidatos em ordem decrescente de score.
+        Empates preservam a ordem original (equivalente a um sort estável).
+        """
+        n = len(self.scores)
+        if k is None or k >= n:
+            return np.argsort(-self.scores, kind="stable")
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
         
-        # Fórmula de pontuação
-        score = (days * weight) - cooldown + bonus
+        # Limiar do k-ésimo maior score; completar com os empatados mais antigos
+        threshold = np.partition(self.scores, n - k)[n - k]
+        above = np.flatnonzero(self.scores > threshold)
+        tied = np.flatnonzero(self.scores == threshold)[:k - len(above)]
+        selected = np.concatenate((above, tied))
+        return selected[np.argsort(-self.scores[selected], kind="stable")]
+    
+    def candidate(self, i: int) -> RankedCandidate:
+        """Materializa o RankedCandidate do i-ésimo candidato"""
+        days = int(self.days[i])
+        cooldown = int(self.cooldown[i])
         
-        # Construir razão
         if days >= 9999:
             reason = "Nunca participou"
         elif cooldown > 0:
@@ -362,20 +383,89 @@ def rank_candidates(
         else:
             reason = f"{days} dias sem participar"
         
-        ranked.append(RankedCandidate(
-            publisher=publisher,
-            score=score,
+        return RankedCandidate(
+            publisher=self.candidates[i],
+            score=float(self.scores[i]),
             days_since_last=days if days < 9999 else -1,
-            category_weight=weight,
+            category_weight=self.weight,
             cooldown_penalty=cooldown,
-            never_participated_bonus=bonus,
+            never_participated_bonus=int(self.bonus[i]),
             reason=reason
-        ))
+        )
+
+
+def score_candidates(
+    candidates: List[EnginePublisher],
+    part_title: str,
+    category: TeachingCategory,
+    index: ParticipationIndex,
+    config: EngineConfig = DEFAULT_CONFIG,
+    reference_date: Optional[datetime] = None
+) -> ScoredCandidates:
+    """
+    Calcula o score de todos os candidatos de uma vez.
+    Fórmula: Score = (Dias × Peso) - Penalidade + Bônus
+    
+    As datas são ordinais inteiros; `reference_date` é normalmente a data da
+    reunião (hoje, se não informada).
+    """
+    weight = get_weight_for_category(category, config)
+    reference = _reference_ordinal(reference_date)
+    cutoff = reference - config.cooldown_same_part_weeks * 7
+    size = len(candidates)
+    
+    # -1 = nunca participou (ordinais válidos são sempre positivos)
+    last = np.fromiter(
+        (-1 if d is None else d for d in (index.last_date(p.name) for p in candidates)),
+        dtype=np.int64,
+        count=size,
+    )
+    last_same_part = np.fromiter(
+        (-1 if d is None else d for d in (index.last_part_date(p.name, part_title) for p in candidates)),
+        dtype=np.int64,
+        count=size,
+    )
+    
+    days = np.where(last < 0, 9999, reference - last)
+    recent = (last_same_part >= 0) & (last_same_part >= cutoff)
+    cooldown = np.where(recent, config.cooldown_penalty_points, 0)
+    bonus = np.where(days >= 9999, config.bonus_never_participated, 0)
     
-    # Ordenar por score decrescente
-    ranked.sort(key=lambda x: x.score, reverse=True)
+    scores = (days * weight) - cooldown + bonus
+    
+    return ScoredCandidates(
+        candidates=candidates,
+        days=days,
+        cooldown=cooldown,
+        bonus=bonus,
+        scores=scores.astype(np.float64),
+        weight=weight,
+    )
+
+
+def rank_candidates(
+    candidates: List[PublisherLike],
+    participations: List[ParticipationLike],
+    part_title: str,
+    category: TeachingCategory,
+    config: EngineConfig = DEFAULT_CONFIG,
+    index: Optional[ParticipationIndex] = None,
+    top_k: Optional[int] = None,
+    reference_date: Optional[datetime] = None
+) -> List[RankedCandidate]:
+    """
+    Rankeia candidatos por prioridade ponderada.
+    Fórmula: Score = (Dias × Peso) - Penalidade + Bônus
+    
+    Se `index` não for informado, o histórico é indexado uma única vez aqui.
+    Com `top_k`, apenas os k melhores candidatos são materializados.
+    """
+    if index is None:
+        index = ParticipationIndex(participations)
     
-    return ranked
+    candidates = to_engine_publishers(candidates)
+    scored = score_candidates(candidates, part_title, category, index, config, reference_date)
+    return [scored.candidate(i) for i in scored.top_k(top_k)]
 
 
 # ============================================================================
@@ -385,16 +475,18 @@ def rank_candidates(
 @dataclass
 class PairingResult:
     """Resultado do pareamento estudante/ajudante"""
-    student: Publisher
-    helper: Optional[Publisher]
+    student: EnginePublisher
+    helper: Optional[EnginePublisher]
     pairing_reason: str
 
 
 def find_helper(
-    student: Publisher,
-    eligible_helpers: List[Publisher],
-    participations: List[Participation],
-    config: EngineConfig = DEFAULT_CONFIG
+    student: EnginePublisher,
+    eligible_helpers: List[EnginePublisher],
+    participations: List[ParticipationLike],
+    config: EngineConfig = DEFAULT_CONFIG,
+    index: Optional[ParticipationIndex] = None,
+    reference_date: Optional[datetime] = None
 ) -> PairingResult:
     """Encontra o melhor ajudante para o estudante"""
     if not eligible_helpers:
@@ -420,7 +512,9 @@ def find_helper(
         participations,
         "Ajudante",
         TeachingCategory.HELPER,
-        config
+        config,
+        index=index,
+        reference_date=reference_date
     )
     
     # Aplicar preferências de pareamento
@@ -461,7 +555,7 @@ def find_helper(
 # ============================================================================
 
 def check_approval_required(
-    publisher: Publisher,
+    publisher: EnginePublisher,
     part_type: ParticipationType,
     part_title: str
 ) -> ApprovalStatus:
@@ -483,7 +577,7 @@ def check_approval_required(
         return ApprovalStatus.PENDING_APPROVAL
     
     # Publicador em revisão
-    if getattr(publisher, 'approval_needed', False):
+    if publisher.has(em.APPROVAL_NEEDED):
         return ApprovalStatus.PENDING_APPROVAL
     
     return ApprovalStatus.DRAFT
@@ -509,12 +603,12 @@ class GeneratedAssignment:
     pairing_reason: Optional[str]
 
 
-async def generate_assignments(
+def generate_assignments_sync(
     week: str,
     date: str,
     parts_to_fill: List[Tuple[str, ParticipationType, bool]],  # (título, tipo, requer_ajudante)
-    publishers: List[Publisher],
-    participations: List[Participation],
+    publishers: List[PublisherLike],
+    participations: List[ParticipationLike],
     config: EngineConfig = DEFAULT_CONFIG
 ) -> List[GeneratedAssignment]:
     """
@@ -522,7 +616,8 @@ async def generate_assignments(
     
     Args:
         week: Identificador da semana (ex: "2024-W01")
-        date: Data da reunião (ISO format)
+        date: Data da reunião (ISO format), também usada como data de referência
+            para dias sem participar e cooldown
         parts_to_fill: Lista de (título, tipo, requer_ajudante)
         publishers: Lista de todos os publicadores
         participations: Histórico de participações
@@ -531,51 +626,71 @@ async def generate_assignments(
     Returns:
         Lista de designações geradas
     """
+    # Histórico e elegibilidade pré-calculados uma única vez para toda a semana
+    # (modelos da API convertidos para a representação compacta do motor)
+    participations = to_engine_participations(participations)
+    index = ParticipationIndex(participations)
+    eligibility = EligibilityMatrix(publishers)
+    
+    return _fill_week(date, parts_to_fill, eligibility, participations, index, config)
+
+
+async def generate_assignments(
+    week: str,
+    date: str,
+    parts_to_fill: List[Tuple[str, ParticipationType, bool]],
+    publishers: List[PublisherLike],
+    participations: List[ParticipationLike],
+    config: EngineConfig = DEFAULT_CONFIG
+) -> List[GeneratedAssignment]:
+    """Versão async de `generate_assignments_sync` (executa no chamador)"""
+    return generate_assignments_sync(week, date, parts_to_fill, publishers, participations, config)
+
+
+def _fill_week(
+    date: str,
+    parts_to_fill: List[Tuple[str, ParticipationType, bool]],
+    eligibility: EligibilityMatrix,
+    participations: List[ParticipationLike],
+    index: ParticipationIndex,
+    config: EngineConfig
+) -> List[GeneratedAssignment]:
+    """Preenche as partes de uma reunião usando histórico e elegibilidade pré-calculados"""
+    reference_date = parse_reference_date(date)
+    
+    if config.solver == SolverMode.OPTIMAL:
+        return _fill_week_optimal(
+            date, parts_to_fill, eligibility, participations, index, config, reference_date
+        )
+    
     results = []
-    assigned_this_week = set()
+    assigned_this_week = eligibility.empty_mask()
     
     for part_title, part_type, needs_helper in parts_to_fill:
         category = get_category_for_part(part_title)
         
-        # Passo 1: Filtro Rígido
-        filter_result = apply_rigid_filters(
-            publishers=publishers,
-            part_type=part_type,
-            part_title=part_title,
-            date=date,
-            already_assigned=list(assigned_this_week),
-            config=config
-        )
+        # Passo 1: Filtro Rígido (máscaras pré-compiladas)
+        eligible = eligibility.eligible(part_type, part_title, date, assigned_this_week)
         
-        if not filter_result.eligible:
-            results.append(GeneratedAssignment(
-                part_title=part_title,
-                part_type=part_type,
-                category=category,
-                principal_name="[Sem candidato elegível]",
-                principal_id="",
-                secondary_name=None,
-                secondary_id=None,
-                status=ApprovalStatus.DRAFT,
-                score=0,
-                reason="Nenhum publicador disponível/elegível",
-                pairing_reason=None
-            ))
+        if not eligible:
+            results.append(_unfilled_assignment(part_title, part_type, category))
             continue
         
         # Passo 2: Ranqueamento
         ranked = rank_candidates(
-            candidates=filter_result.eligible,
+            candidates=eligible,
             participations=participations,
             part_title=part_title,
             category=category,
-            config=config
+            config=config,
+            index=index,
+            top_k=1,
+            reference_date=reference_date
         )
         
         # Passo 3: Seleção do melhor candidato
         best = ranked[0]
-        assigned_this_week.add(best.publisher.id)
-        assigned_this_week.add(best.publisher.name)
+        eligibility.mark(assigned_this_week, best.publisher)
         
         # Passo 4: Pareamento de ajudante (se necessário)
         helper_name = None
@@ -584,13 +699,146 @@ async def generate_assignments(
         
         if needs_helper:
             # Filtrar elegíveis para ajudante (remover o titular)
-            helper_eligible = [p for p in filter_result.eligible if p.id != best.publisher.id]
+            helper_eligible = [p for p in eligible if p.id != best.publisher.id]
+            
+            pairing = find_helper(
+                student=best.publisher,
+                eligible_helpers=helper_eligible,
+                participations=participations,
+                config=config,
+                index=index,
+                reference_date=reference_date
+            )
+            
+            if pairing.helper:
+                helper_name = pairing.helper.name
+                helper_id = pairing.helper.id
+                eligibility.mark(assigned_this_week, pairing.helper)
+            
+            pairing_reason = pairing.pairing_reason
+        
+        # Passo 5: Verificação de aprovação
+        status = check_approval_required(
+            publisher=best.publisher,
+            part_type=part_type,
+            part_title=part_title
+        )
+        
+        results.append(GeneratedAssignment(
+            part_title=part_title,
+            part_type=part_type,
+            category=category,
+            principal_name=best.publisher.name,
+            principal_id=best.publisher.id,
+            secondary_name=helper_name,
+            secondary_id=helper_id,
+            status=status,
+            score=best.score,
+            reason=best.reason,
+            pairing_reason=pairing_reason
+        ))
+    
+    return results
+
+
+def _unfilled_assignment(
+    part_title: str,
+    part_type: ParticipationType,
+    category: TeachingCategory
+) -> GeneratedAssignment:
+    """Designação vazia para parte sem candidato elegível"""
+    return GeneratedAssignment(
+        part_title=part_title,
+        part_type=part_type,
+        category=category,
+        principal_name="[Sem candidato elegível]",
+        principal_id="",
+        secondary_name=None,
+        secondary_id=None,
+        status=ApprovalStatus.DRAFT,
+        score=0,
+        reason="Nenhum publicador disponível/elegível",
+        pairing_reason=None
+    )
+
+
+def _fill_week_optimal(
+    date: str,
+    parts_to_fill: List[Tuple[str, ParticipationType, bool]],
+    eligibility: EligibilityMatrix,
+    participations: List[ParticipationLike],
+    index: ParticipationIndex,
+    config: EngineConfig,
+    reference_date: datetime
+) -> List[GeneratedAssignment]:
+    """
+    Preenche a reunião como um emparelhamento bipartido ponderado.
+    
+    Os titulares de todas as partes são escolhidos de uma vez, maximizando a
+    soma das pontuações do ranqueamento, de modo que uma parte anterior não
+    "roube" o único candidato elegível de uma parte posterior. Os ajudantes
+    são pareados depois, na ordem das partes, entre os que sobraram.
+    """
+    publishers = eligibility.publishers
+    
+    eligible_by_part = []
+    scored_by_part = []
+    weights = []
+    
+    # Passos 1 e 2: filtro rígido e pontuação de cada parte
+    for part_title, part_type, _ in parts_to_fill:
+        category = get_category_for_part(part_title)
+        columns = np.flatnonzero(eligibility.eligible_mask(part_type, part_title, date))
+        eligible = [publishers[j] for j in columns]
+        scored = score_candidates(eligible, part_title, category, index, config, reference_date)
+        
+        row: List[Optional[float]] = [None] * len(publishers)
+        for local, j in enumerate(columns):
+            row[j] = float(scored.scores[local])
+        
+        eligible_by_part.append(eligible)
+        scored_by_part.append((scored, {int(j): local for local, j in enumerate(columns)}))
+        weights.append(row)
+    
+    # Passo 3: seleção ótima dos titulares
+    choices = solve_max_weight_assignment(weights)
+    
+    assigned_this_week = set()
+    for i, j in enumerate(choices):
+        if j is not None:
+            assigned_this_week.add(publishers[j].id)
+            assigned_this_week.add(publishers[j].name)
+    
+    results = []
+    for i, (part_title, part_type, needs_helper) in enumerate(parts_to_fill):
+        category = get_category_for_part(part_title)
+        j = choices[i]
+        
+        if j is None:
+            results.append(_unfilled_assignment(part_title, part_type, category))
+            continue
+        
+        scored, local_of = scored_by_part[i]
+        best = scored.candidate(local_of[j])
+        
+        # Passo 4: Pareamento de ajudante (se necessário)
+        helper_name = None
+        helper_id = None
+        pairing_reason = None
+        
+        if needs_helper:
+            helper_eligible = [
+                p for p in eligible_by_part[i]
+                if p.id not in assigned_this_week and p.name not in assigned_this_week
+            ]
             
             pairing = find_helper(
                 student=best.publisher,
                 eligible_helpers=helper_eligible,
                 participations=participations,
-                config=config
+                config=config,
+                index=index,
+                reference_date=reference_date
             )
             
             if pairing.helper:
@@ -623,3 +871,71 @@ async def generate_assignments(
         ))
     
     return results
+
+
+@dataclass
+class WeekToSchedule:
+    """Semana a ser preenchida em uma geração em lote"""
+    week: str
+    date: str
+    parts_to_fill: List[Tuple[str, ParticipationType, bool]]
+
+
+@dataclass
+class GeneratedWeek:
+    """Resultado de uma semana gerada em lote"""
+    week: str
+    date: str
+    assignments: List[GeneratedAssignment]
+
+
+def record_generated_week(
+    index: ParticipationIndex,
+    date: str,
+    assignments: List[GeneratedAssignment]
+) -> None:
+    """Alimenta o índice com as designações geradas para a rotação seguinte"""
+    for a in assignments:
+        if a.principal_id:
+            index.add(a.principal_name, a.part_title, date)
+        if a.secondary_id and a.secondary_name:
+            index.add(a.secondary_name, "Ajudante", date)
+
+
+def generate_assignments_range_sync(
+    weeks: List[WeekToSchedule],
+    publishers: List[PublisherLike],
+    participations: List[ParticipationLike],
+    config: EngineConfig = DEFAULT_CONFIG
+) -> List[GeneratedWeek]:
+    """
+    Gera designações para várias semanas em uma única chamada.
+    
+    As semanas são processadas em ordem cronológica. O histórico é indexado
+    uma única vez e as designações de cada semana são incorporadas ao índice
+    antes da semana seguinte, para que a rotação considere as escolhas já feitas.
+    
+    Returns:
+        Lista de semanas geradas, em ordem cronológica
+    """
+    participations = to_engine_participations(participations)
+    index = ParticipationIndex(participations)
+    eligibility = EligibilityMatrix(publishers)
+    generated = []
+    
+    for w in sorted(weeks, key=lambda w: w.date):
+        assignments = _fill_week(w.date, w.parts_to_fill, eligibility, participations, index, config)
+        record_generated_week(index, w.date, assignments)
+        generated.append(GeneratedWeek(week=w.week, date=w.date, assignments=assignments))
+    
+    return generated
+
+
+async def generate_assignments_range(
+    weeks: List[WeekToSchedule],
+    publishers: List[PublisherLike],
+    participations: List[ParticipationLike],
+    config: EngineConfig = DEFAULT_CONFIG
+) -> List[GeneratedWeek]:
+    """Versão async de `generate_assignments_range_sync` (executa no chamador)"""
+    return generate_assignments_range_sync(weeks, publishers, participations, config)
@@ -0,0 +1,95 @@
+"""
+Solver de Atribuição Ótima
+Emparelhamento bipartido ponderado (método húngaro) entre partes e publicadores
+"""
+from typing import List, Optional, Sequence
+
+# Custo de deixar uma parte sem designado. Precisa superar qualquer diferença
+# de pontuação para que o solver sempre preencha o máximo de partes possível.
+UNFILLED_COST = 1e9
+
+# Custo de um par proibido (publicador não elegível para a parte)
+FORBIDDEN_COST = 1e15
+
+
+def solve_max_weight_assignment(weights: Sequence[Sequence[Optional[float]]]) -> List[Optional[int]]:
+    """
+    Resolve o problema de atribuição maximizando a soma dos pesos.
+
+    Args:
+        weights: Matriz linhas (partes) × colunas (publicadores). `None` indica
+            par proibido. Cada coluna pode ser usada por no máximo uma linha.
+
+    Returns:
+        Para cada linha, o índice da coluna escolhida ou None se a linha ficou
+        sem candidato.
+    """
+    n = len(weights)
+    if n == 0:
+        return []
+    m = len(weights[0])
+
+    # Colunas fictícias (uma por linha) representam "sem designado", garantindo
+    # que sempre existe solução com n <= colunas.
+    total_cols = m + n
+
+    def cost(i: int, j: int) -> float:
+        if j >= m:
+            return UNFILLED_COST
+        w = weights[i][j]
+        return FORBIDDEN_COST if w is None else -w
+
+    # Algoritmo húngaro com potenciais (caminhos aumentantes mínimos), O(n² · colunas).
+    # Índices 1-based; a coluna 0 é auxiliar.
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (total_cols + 1)
+    match_col = [0] * (total_cols + 1)  # coluna -> linha (0 = livre)
+    way = [0] * (total_cols + 1)
+
+    for i in range(1, n + 1):
+        match_col[0] = i
+        j0 = 0
+        min_v = [inf] * (total_cols + 1)
+        used = [False] * (total_cols + 1)
+
+        while True:
+            used[j0] = True
+            i0 = match_col[j0]
+            delta = inf
+            j1 = 0
+            ui0 = u[i0]
+            for j in range(1, total_cols + 1):
+                if used[j]:
+                    continue
+                cur = cost(i0 - 1, j - 1) - ui0 - v[j]
+                if cur < min_v[j]:
+                    min_v[j] = cur
+                    way[j] = j0
+                if min_v[j] < delta:
+                    delta = min_v[j]
+                    j1 = j
+            for j in range(total_cols + 1):
+                if used[j]:
+                    u[match_col[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_v[j] -= delta
+            j0 = j1
+            if match_col[j0] == 0:
+                break
+
+        while True:
+            j1 = way[j0]
+            match_col[j0] = match_col[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    result: List[Optional[int]] = [None] * n
+    for j in range(1, m + 1):
+        row = match_col[j]
+        if row and weights[row - 1][j - 1] is not None:
+            result[row - 1] = j - 1
+
+    return result
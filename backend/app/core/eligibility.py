@@ -0,0 +1,189 @@
+"""
+Matriz de Elegibilidade Pré-compilada
+Avalia os filtros rígidos do motor com máscaras booleanas NumPy por publicador
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import ParticipationType
+from app.core import engine_models as em
+from app.core.engine_models import EnginePublisher, PublisherLike, to_engine_publishers
+from app.core.participation_index import parse_date_ordinal
+
+
+# Chave normalizada de parte: (tipo, é discurso/joias, é leitura).
+# Os indicadores de título só importam para a seção Tesouros.
+PartKey = Tuple[ParticipationType, bool, bool]
+
+
+def get_part_key(part_type: ParticipationType, part_title: str) -> PartKey:
+    """Normaliza (tipo, título) para a chave usada nas linhas da matriz"""
+    if part_type == ParticipationType.TESOUROS:
+        is_talk = "Discurso" in part_title or "Joias" in part_title
+        is_reading = "Leitura" in part_title
+        return (part_type, is_talk, is_reading)
+    return (part_type, False, False)
+
+
+class EligibilityMatrix:
+    """
+    Elegibilidade estática de cada publicador por chave de parte.
+
+    Construída uma vez a partir dos publicadores (convertidos para
+    EnginePublisher; as colunas saem da máscara de bits). Cada linha (chave de
+    parte) é calculada sob demanda com operações vetorizadas e reaproveitada;
+    a filtragem de uma parte é o AND da linha com a máscara de disponibilidade
+    da data e com a máscara dos já designados na reunião.
+
+    As regras espelham `apply_rigid_filters`, que continua sendo a fonte dos
+    motivos de rejeição (ex.: endpoint /filter-test).
+    """
+
+    def __init__(self, publishers: Iterable[PublisherLike]):
+        self.publishers: List[EnginePublisher] = to_engine_publishers(publishers)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Recalcula os atributos e descarta linhas em cache (após alterar publicadores)"""
+        pubs = self.publishers
+        flags = np.fromiter((p.flags for p in pubs), dtype=np.int64, count=len(pubs))
+
+        def column(bit: int) -> np.ndarray:
+            return (flags & bit) != 0
+
+        self._base = (
+            column(em.SERVING)
+            & ~column(em.NOT_QUALIFIED)
+            & ~column(em.REQUESTED_NO_PARTICIPATION)
+        )
+        self._brother = column(em.BROTHER)
+        self._baptized = column(em.BAPTIZED)
+        self._helper_only = column(em.HELPER_ONLY)
+
+        self._can_give_talks = column(em.CAN_GIVE_TALKS)
+        self._can_preside = column(em.CAN_PRESIDE)
+        self._can_pray = column(em.CAN_PRAY)
+        self._can_conduct_cbs = column(em.CAN_CONDUCT_CBS)
+        self._can_read_cbs = column(em.CAN_READ_CBS)
+
+        self._treasures = column(em.IN_TREASURES)
+        self._ministry = column(em.IN_MINISTRY)
+        self._life = column(em.IN_LIFE)
+
+        self._positions: Dict[str, List[int]] = {}
+        for i, p in enumerate(pubs):
+            self._positions.setdefault(p.id, []).append(i)
+            if p.name != p.id:
+                self._positions.setdefault(p.name, []).append(i)
+
+        self._rows: Dict[PartKey, np.ndarray] = {}
+        self._availability: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.publishers)
+
+    # ------------------------------------------------------------------
+    # Máscaras
+    # ------------------------------------------------------------------
+
+    def part_mask(self, part_type: ParticipationType, part_title: str) -> np.ndarray:
+        """Máscara estática (gênero, privilégios, seção, status) para a parte"""
+        key = get_part_key(part_type, part_title)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._compute_row(key)
+            self._rows[key] = row
+        return row
+
+    def _compute_row(self, key: PartKey) -> np.ndarray:
+        part_type, is_talk, is_reading = key
+        row = self._base.copy()
+
+        if part_type == ParticipationType.TESOUROS:
+            if is_talk:
+                row &= self._brother & self._can_give_talks
+            if is_reading:
+                row &= self._brother
+            row &= self._treasures
+        elif part_type == ParticipationType.PRESIDENTE:
+            row &= self._brother & self._can_preside
+        elif part_type in (ParticipationType.ORACAO_INICIAL, ParticipationType.ORACAO_FINAL):
+            row &= self._brother & self._baptized & self._can_pray
+        elif part_type == ParticipationType.DIRIGENTE:
+            row &= self._brother & self._can_conduct_cbs
+        elif part_type == ParticipationType.LEITOR:
+            row &= self._brother & self._can_read_cbs
+        elif part_type == ParticipationType.MINISTERIO:
+            row &= self._ministry
+        elif part_type == ParticipationType.VIDA_CRISTA:
+            row &= self._life
+
+        if part_type != ParticipationType.AJUDANTE:
+            row &= ~self._helper_only
+
+        return row
+
+    def availability_mask(self, date: str) -> np.ndarray:
+        """Máscara de disponibilidade dos publicadores na data"""
+        mask = self._availability.get(date)
+        if mask is None:
+            ordinal = parse_date_ordinal(date)
+            mask = np.fromiter(
+                (p.is_available(ordinal) for p in self.publishers),
+                dtype=bool,
+                count=len(self.publishers),
+            )
+            self._availability[date] = mask
+        return mask
+
+    def empty_mask(self) -> np.ndarray:
+        """Máscara vazia de já designados"""
+        return np.zeros(len(self.publishers), dtype=bool)
+
+    def assigned_mask(self, already_assigned: Iterable[str]) -> np.ndarray:
+        """Máscara de publicadores já designados (por id ou nome)"""
+        mask = self.empty_mask()
+        for identifier in already_assigned:
+            self.mark_identifier(mask, identifier)
+        return mask
+
+    def mark_identifier(self, mask: np.ndarray, identifier: str) -> None:
+        """Marca na máscara todos os publicadores com o id ou nome informado"""
+        positions = self._positions.get(identifier)
+        if positions:
+            mask[positions] = True
+
+    def mark(self, mask: np.ndarray, publisher: EnginePublisher) -> None:
+        """Marca o publicador (por id e nome) como já designado"""
+        self.mark_identifier(mask, publisher.id)
+        self.mark_identifier(mask, publisher.name)
+
+    # ------------------------------------------------------------------
+    # Filtragem
+    # ------------------------------------------------------------------
+
+    def eligible_mask(
+        self,
+        part_type: ParticipationType,
+        part_title: str,
+        date: str,
+        assigned: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """AND da linha da parte com disponibilidade e já designados"""
+        mask = self.part_mask(part_type, part_title) & self.availability_mask(date)
+        if assigned is not None:
+            mask &= ~assigned
+        return mask
+
+    def eligible(
+        self,
+        part_type: ParticipationType,
+        part_title: str,
+        date: str,
+        assigned: Optional[np.ndarray] = None
+    ) -> List[EnginePublisher]:
+        """Publicadores elegíveis, na ordem original da lista"""
+        mask = self.eligible_mask(part_type, part_title, date, assigned)
+        pubs = self.publishers
+        return [pubs[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,154 @@
+"""
+Representação Compacta do Motor
+Publicadores e participações como dataclasses com __slots__, construídas uma
+vez a partir dos modelos da API
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional, Union
+
+from app.models.schemas import Publisher, Participation
+from app.core.participation_index import parse_date_ordinal
+
+
+# ============================================================================
+# BITS DE PRIVILÉGIOS E SITUAÇÃO
+# ============================================================================
+
+# Privilégios específicos
+CAN_GIVE_TALKS = 1 << 0
+CAN_CONDUCT_CBS = 1 << 1
+CAN_READ_CBS = 1 << 2
+CAN_PRAY = 1 << 3
+CAN_PRESIDE = 1 << 4
+
+# Privilégios por seção
+IN_TREASURES = 1 << 5
+IN_MINISTRY = 1 << 6
+IN_LIFE = 1 << 7
+
+# Situação do publicador
+BROTHER = 1 << 8
+BAPTIZED = 1 << 9
+SERVING = 1 << 10
+HELPER_ONLY = 1 << 11
+NOT_QUALIFIED = 1 << 12
+REQUESTED_NO_PARTICIPATION = 1 << 13
+APPROVAL_NEEDED = 1 << 14
+
+# Atributos opcionais (não fazem parte do schema Publisher; só existem em
+# subclasses ou objetos equivalentes)
+_OPTIONAL_FLAGS = (
+    ('is_not_qualified', NOT_QUALIFIED),
+    ('requested_no_participation', REQUESTED_NO_PARTICIPATION),
+    ('approval_needed', APPROVAL_NEEDED),
+)
+
+
+def publisher_flags(publisher: Publisher) -> int:
+    """Privilégios, seções e situação do publicador num único inteiro"""
+    privileges = publisher.privileges
+    sections = publisher.privileges_by_section
+    flags = 0
+
+    for enabled, bit in (
+        (privileges.can_give_talks, CAN_GIVE_TALKS),
+        (privileges.can_conduct_cbs, CAN_CONDUCT_CBS),
+        (privileges.can_read_cbs, CAN_READ_CBS),
+        (privileges.can_pray, CAN_PRAY),
+        (privileges.can_preside, CAN_PRESIDE),
+        (sections.can_participate_in_treasures, IN_TREASURES),
+        (sections.can_participate_in_ministry, IN_MINISTRY),
+        (sections.can_participate_in_life, IN_LIFE),
+        (publisher.gender == "brother", BROTHER),
+        (publisher.is_baptized, BAPTIZED),
+        (publisher.is_serving, SERVING),
+        (publisher.is_helper_only, HELPER_ONLY),
+    ):
+        if enabled:
+            flags |= bit
+
+    # getattr com padrão: vale para subclasses, propriedades e objetos sem
+    # __dict__ (ex.: com __slots__), não só para campos guardados na instância
+    for attribute, bit in _OPTIONAL_FLAGS:
+        if getattr(publisher, attribute, False):
+            flags |= bit
+
+    return flags
+
+
+# ============================================================================
+# MODELOS DO MOTOR
+# ============================================================================
+
+@dataclass(slots=True)
+class EnginePublisher:
+    """
+    Publicador como o motor o enxerga.
+
+    A disponibilidade vira um frozenset de ordinais: no modo "always" são as
+    datas de ausência, nos outros modos as únicas datas disponíveis.
+    """
+    id: str
+    name: str
+    gender: str
+    flags: int
+    parent_ids: FrozenSet[str]
+    available_by_default: bool
+    exception_ordinals: FrozenSet[int]
+
+    def has(self, bit: int) -> bool:
+        return bool(self.flags & bit)
+
+    def is_available(self, ordinal: Optional[int]) -> bool:
+        """Disponível na data (ordinal); datas ilegíveis não constam nas exceções"""
+        return (ordinal in self.exception_ordinals) != self.available_by_default
+
+    @classmethod
+    def from_model(cls, publisher: Publisher) -> "EnginePublisher":
+        availability = publisher.availability
+        ordinals = (parse_date_ordinal(d) for d in availability.exception_dates)
+        return cls(
+            id=publisher.id,
+            name=publisher.name,
+            gender=publisher.gender.value if hasattr(publisher.gender, 'value') else str(publisher.gender),
+            flags=publisher_flags(publisher),
+            parent_ids=frozenset(publisher.parent_ids),
+            available_by_default=availability.mode == "always",
+            exception_ordinals=frozenset(o for o in ordinals if o is not None),
+        )
+
+
+@dataclass(slots=True)
+class EngineParticipation:
+    """Participação reduzida ao que o índice de histórico usa"""
+    publisher_name: str
+    part_title: str
+    ordinal: int
+
+
+PublisherLike = Union[Publisher, EnginePublisher]
+ParticipationLike = Union[Participation, EngineParticipation]
+
+
+def to_engine_publishers(publishers: Iterable[PublisherLike]) -> List[EnginePublisher]:
+    """Converte os modelos da API (os já convertidos passam direto)"""
+    return [
+        p if isinstance(p, EnginePublisher) else EnginePublisher.from_model(p)
+        for p in publishers
+    ]
+
+
+def to_engine_participations(participations: Iterable[ParticipationLike]) -> List[EngineParticipation]:
+    """
+    Converte o histórico da API. Registros com data ilegível são descartados,
+    como o índice de histórico já fazia.
+    """
+    result = []
+    for p in participations:
+        if isinstance(p, EngineParticipation):
+            result.append(p)
+            continue
+        ordinal = parse_date_ordinal(p.date)
+        if ordinal is not None:
+            result.append(EngineParticipation(p.publisher_name, p.part_title, ordinal))
+    return result
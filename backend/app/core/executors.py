@@ -0,0 +1,142 @@
+"""
+Executores para Trabalho Bloqueante
+Pool de threads para E/S bloqueante (armazenamento, arquivos, Supabase) e
+pool de processos para trabalho de CPU, usados pelas rotas async para não
+bloquear o event loop
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Marca os processos do pool: rotinas que também distribuem trabalho entre
+# processos (app.pdf.pages) rodam sequencialmente dentro deles
+WORKER_ENV = "RVM_WORKER_PROCESS"
+
+
+def io_workers() -> int:
+    """Threads de E/S (RVM_IO_WORKERS; padrão: mesmo do ThreadPoolExecutor)"""
+    value = os.getenv("RVM_IO_WORKERS")
+    if value:
+        return max(1, int(value))
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def cpu_workers() -> int:
+    """Processos de CPU (RVM_CPU_WORKERS; padrão: número de CPUs)"""
+    value = os.getenv("RVM_CPU_WORKERS")
+    if value:
+        return max(1, int(value))
+    return os.cpu_count() or 1
+
+
+def offload_enabled() -> bool:
+    """RVM_OFFLOAD=0 executa tudo no event loop (comparação em benchmarks)"""
+    return os.getenv("RVM_OFFLOAD", "1") != "0"
+
+
+def in_worker_process() -> bool:
+    """True dentro de um processo do pool de CPU"""
+    return os.getenv(WORKER_ENV) == "1"
+
+
+def _init_worker() -> None:
+    os.environ[WORKER_ENV] = "1"
+
+
+class WorkerCrashed(RuntimeError):
+    """Um processo do pool morreu durante a chamada (ex.: falta de memória)"""
+
+
+# ============================================================================
+# Pools
+# ============================================================================
+
+_lock = threading.Lock()
+_io_executor: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Pool de threads compartilhado para E/S bloqueante"""
+    global _io_executor
+    with _lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(max_workers=io_workers(), thread_name_prefix="rvm-io")
+        return _io_executor
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Pool de processos persistente (spawn: seguro com as threads do servidor)"""
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=cpu_workers(),
+                mp_context=get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _process_pool
+
+
+def replace_process_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Troca um pool quebrado (worker morto) por um novo. Chamadas concorrentes
+    que recebem o mesmo pool quebrado trocam uma única vez.
+    """
+    global _process_pool
+    with _lock:
+        if _process_pool is pool:
+            _process_pool = None
+    pool.shutdown(wait=False)
+    get_process_pool()
+
+
+def shutdown_executors() -> None:
+    """Encerra os pools (desligamento da aplicação)"""
+    global _io_executor, _process_pool
+    with _lock:
+        io_executor, process_pool = _io_executor, _process_pool
+        _io_executor = None
+        _process_pool = None
+    if io_executor is not None:
+        io_executor.shutdown()
+    if process_pool is not None:
+        process_pool.shutdown()
+
+
+# ============================================================================
+# Execução a partir de rotas async
+# ============================================================================
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Executa uma chamada bloqueante de E/S no pool de threads"""
+    call = functools.partial(func, *args, **kwargs)
+    if not offload_enabled():
+        return call()
+    return await asyncio.get_running_loop().run_in_executor(get_io_executor(), call)
+
+
+async def run_cpu(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa trabalho de CPU no pool de processos. A função e os argumentos
+    precisam ser serializáveis (funções de módulo, modelos, dicts). Se o pool
+    quebrar, ele é recriado e a chamada falha com WorkerCrashed: a entrada que
+    derrubou o worker não é refeita no processo do servidor.
+    """
+    call = functools.partial(func, *args, **kwargs)
+    if not offload_enabled():
+        return call()
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    try:
+        return await loop.run_in_executor(pool, call)
+    except BrokenProcessPool as e:
+        replace_process_pool(pool)
+        raise WorkerCrashed("Processo de cálculo encerrado inesperadamente; tente novamente") from e
@@ -0,0 +1,168 @@
+"""
+Cache de Extrações de PDF
+Resultados indexados pelo SHA-256 do PDF e pela versão do extrator,
+gravados em disco com limite de tamanho (remoção LRU)
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.core.storage import DATA_DIR
+
+DEFAULT_CACHE_DIR = DATA_DIR / "extraction_cache"
+DEFAULT_MAX_MB = 256
+
+
+class ExtractionCache:
+    """
+    Cache endereçado por conteúdo: a chave é (tipo de extração, versão do
+    extrator, SHA-256 dos bytes do PDF). Cada entrada é um arquivo JSON; a
+    leitura atualiza o mtime do arquivo e, ao passar de `max_bytes`, as
+    entradas menos usadas recentemente são removidas. O estado fica todo no
+    diretório, então vários processos do servidor podem compartilhá-lo.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """SHA-256 do conteúdo"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, kind: str, version: str, digest: str) -> Path:
+        return self.directory / f"{kind}-v{version}-{digest}.json"
+
+    def _count(self, counters: Dict[str, int], kind: str) -> None:
+        with self._lock:
+            counters[kind] = counters.get(kind, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Leitura / escrita
+    # ------------------------------------------------------------------
+
+    def get(self, kind: str, version: str, digest: str) -> Optional[Any]:
+        """Valor em cache ou None (conta acerto/falha)"""
+        path = self._path(kind, version, digest)
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError):
+            self._count(self._misses, kind)
+            return None
+        self._count(self._hits, kind)
+        return value
+
+    def put(self, kind: str, version: str, digest: str, value: Any) -> None:
+        """Grava o valor (JSON) e aplica o limite de tamanho"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(kind, version, digest)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(value, ensure_ascii=False), encoding="utf-8")
+        tmp_path.replace(path)
+        self._evict()
+
+    def get_or_compute(
+        self,
+        kind: str,
+        version: str,
+        data: bytes,
+        compute: Callable[[], Any],
+        should_store: Callable[[Any], bool] = lambda value: True
+    ) -> Any:
+        """Retorna o valor em cache para os bytes ou calcula, grava e retorna"""
+        digest = self.digest(data)
+        cached = self.get(kind, version, digest)
+        if cached is not None:
+            return cached
+        value = compute()
+        if should_store(value):
+            self.put(kind, version, digest, value)
+        return value
+
+    def _entries(self) -> list:
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # ------------------------------------------------------------------
+    # Manutenção
+    # ------------------------------------------------------------------
+
+    def clear(self) -> int:
+        """Remove todas as entradas; retorna quantas foram removidas"""
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        """Acertos/falhas por tipo (neste processo) e ocupação do diretório"""
+        entries = self._entries()
+        with self._lock:
+            kinds = sorted(set(self._hits) | set(self._misses))
+            by_kind = {
+                kind: {"hits": self._hits.get(kind, 0), "misses": self._misses.get(kind, 0)}
+                for kind in kinds
+            }
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "by_kind": by_kind,
+        }
+
+
+# Instância global do cache
+_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Cache configurado por ambiente:
+        RVM_EXTRACTION_CACHE_DIR: diretório (padrão: data/extraction_cache)
+        RVM_EXTRACTION_CACHE_MB: tamanho máximo em MB (padrão: 256)
+    """
+    global _cache
+    if _cache is None:
+        directory = Path(os.getenv("RVM_EXTRACTION_CACHE_DIR", str(DEFAULT_CACHE_DIR)))
+        max_mb = float(os.getenv("RVM_EXTRACTION_CACHE_MB", str(DEFAULT_MAX_MB)))
+        _cache = ExtractionCache(directory, int(max_mb * 1024 * 1024))
+    return _cache
@@ -0,0 +1,522 @@
+"""
+Fila de Tarefas em Segundo Plano
+Executa operações longas (extração de PDFs, S-89 em lote, geração de várias
+semanas) fora das requisições, num pool limitado de threads, com estado,
+progresso e resultado persistidos em disco
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from app.core.storage import DATA_DIR
+
+DEFAULT_JOBS_DIR = DATA_DIR / "jobs"
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_LIMIT = 100
+DEFAULT_RETENTION_HOURS = 24
+
+# Máximo de tarefas por listagem (cada uma é lida do disco)
+MAX_LIST_LIMIT = 200
+
+# Intervalo mínimo entre gravações do progresso em disco
+PROGRESS_WRITE_INTERVAL = 0.5
+
+# Lease de cada processo dono de tarefas: arquivo em <dir>/.owners renovado a
+# cada LEASE_INTERVAL; sem renovação por LEASE_TIMEOUT o dono é considerado morto
+LEASE_DIR = ".owners"
+LEASE_INTERVAL = 15.0
+LEASE_TIMEOUT = 60.0
+
+JOB_FILE = "job.json"
+PARAMS_FILE = "params.json"
+RESULT_JSON_FILE = "result.json"
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+FINISHED_STATUSES = {JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+class JobQueueFull(Exception):
+    """A fila atingiu o limite de tarefas pendentes"""
+
+
+class JobCancelled(BaseException):
+    """
+    Cancelamento pedido durante a execução. Deriva de BaseException (como
+    asyncio.CancelledError) para atravessar os `except Exception` das rotinas
+    de extração, que convertem erros em resultados com success=False.
+    """
+
+
+@dataclass
+class JobFile:
+    """Resultado em arquivo (PDF, ZIP...) devolvido por um handler"""
+    content: bytes
+    media_type: str
+    filename: str
+
+
+@dataclass
+class Job:
+    """Estado de uma tarefa (serializado em job.json)"""
+    id: str
+    kind: str
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: int = 0
+    total: Optional[int] = None
+    message: str = ""
+    error: Optional[str] = None
+    result_file: Optional[str] = None       # nome do arquivo de resultado no diretório da tarefa
+    result_media_type: Optional[str] = None
+    result_filename: Optional[str] = None   # nome sugerido no download
+    owner: Optional[str] = None             # lease do processo que executa a tarefa
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Fração concluída (0–1), se o total for conhecido"""
+        if self.status == JobStatus.SUCCEEDED:
+            return 1.0
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        data = dict(data)
+        data["status"] = JobStatus(data["status"])
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+class JobContext:
+    """Acesso do handler à sua tarefa: arquivos de entrada e progresso"""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self._job = job
+        self.directory = manager.job_dir(job.id)
+        self._last_write = 0.0
+
+    @property
+    def job_id(self) -> str:
+        return self._job.id
+
+    def path(self, name: str) -> Path:
+        """Arquivo de entrada gravado junto com a tarefa"""
+        return self.directory / name
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        """
+        Atualiza o progresso. Também é o ponto de cancelamento: se o
+        cancelamento foi pedido, levanta JobCancelled.
+        """
+        if self._manager.cancel_requested(self._job.id):
+            raise JobCancelled()
+
+        job = self._job
+        job.done = done
+        if total is not None:
+            job.total = total
+        if message is not None:
+            job.message = message
+
+        now = time.monotonic()
+        if now - self._last_write >= PROGRESS_WRITE_INTERVAL or (job.total and done >= job.total):
+            self._last_write = now
+            self._manager.save(job)
+
+
+Handler = Callable[[JobContext, dict], Union[dict, list, JobFile]]
+
+
+class JobManager:
+    """
+    Fila de tarefas com pool limitado de threads.
+
+    Cada tarefa tem um diretório próprio com job.json (estado e progresso),
+    params.json e arquivos de entrada, e o resultado (result.json ou um
+    arquivo). O estado sobrevive a reinícios do servidor. Cada processo
+    mantém um lease (arquivo renovado periodicamente) e grava seu id nas
+    tarefas que envia; só as tarefas não concluídas cujo dono parou de
+    renovar o lease são marcadas como falhas, então vários processos (workers,
+    reload) podem compartilhar o diretório.
+
+    As etapas pesadas de CPU (leitura de páginas de PDF) já são distribuídas
+    entre processos pelos próprios handlers (app.pdf.pages).
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        workers: int = DEFAULT_WORKERS,
+        queue_limit: int = DEFAULT_QUEUE_LIMIT,
+        retention_hours: float = DEFAULT_RETENTION_HOURS,
+        lease_interval: float = LEASE_INTERVAL,
+        lease_timeout: float = LEASE_TIMEOUT
+    ):
+        self.directory = directory
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.retention_seconds = retention_hours * 3600
+        self.lease_interval = lease_interval
+        self.lease_timeout = lease_timeout
+        self.owner = uuid.uuid4().hex
+        self._handlers: Dict[str, Handler] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._futures: Dict[str, Future] = {}
+        self._cancel: set = set()
+        self._lock = threading.RLock()
+        self._stopping = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rvm-job")
+        self._renew_lease()
+        self._recover()
+        self._maintenance = threading.Thread(target=self._maintain, name="rvm-job-lease", daemon=True)
+        self._maintenance.start()
+
+    # ------------------------------------------------------------------
+    # Registro e envio
+    # ------------------------------------------------------------------
+
+    def register(self, kind: str, handler: Handler) -> None:
+        """Associa um tipo de tarefa à função que a executa"""
+        self._handlers[kind] = handler
+
+    def submit(
+        self,
+        kind: str,
+        params: Optional[dict] = None,
+        files: Optional[Dict[str, Union[bytes, Path]]] = None
+    ) -> Job:
+        """
+        Enfileira uma tarefa. `files` são gravados (ou movidos, se forem
+        caminhos) no diretório da tarefa. Levanta JobQueueFull acima do limite.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Tipo de tarefa desconhecido: {kind}")
+
+        self.cleanup()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.queue_limit:
+                raise JobQueueFull(f"Fila cheia ({pending} tarefas pendentes)")
+
+            job = Job(id=str(uuid.uuid4()), kind=kind, owner=self.owner)
+            directory = self.job_dir(job.id)
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / PARAMS_FILE).write_text(json.dumps(params or {}, ensure_ascii=False), encoding="utf-8")
+            for name, content in (files or {}).items():
+                if isinstance(content, Path):
+                    shutil.move(str(content), directory / name)
+                else:
+                    (directory / name).write_bytes(content)
+
+            self._jobs[job.id] = job
+            self.save(job)
+            self._futures[job.id] = self._executor.submit(self._run, job)
+            return job
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            if job.id in self._cancel:
+                self._finish(job, JobStatus.CANCELLED)
+                return
+            job.status = JobStatus.RUNNING
+            job.started_at = time.time()
+            self.save(job)
+
+        try:
+            params = json.loads((self.job_dir(job.id) / PARAMS_FILE).read_text(encoding="utf-8"))
+            result = self._handlers[job.kind](JobContext(self, job), params)
+            self._store_result(job, result)
+            self._finish(job, JobStatus.SUCCEEDED)
+        except JobCancelled:
+            if self._stopping.is_set():
+                job.error = "Interrompida: o servidor foi encerrado"
+                self._finish(job, JobStatus.FAILED)
+            else:
+                self._finish(job, JobStatus.CANCELLED)
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            self._finish(job, JobStatus.FAILED)
+
+    def _store_result(self, job: Job, result: Union[dict, list, JobFile]) -> None:
+        directory = self.job_dir(job.id)
+        if isinstance(result, JobFile):
+            name = "result" + Path(result.filename).suffix
+            _write_atomic(directory / name, result.content)
+            job.result_file = name
+            job.result_media_type = result.media_type
+            job.result_filename = result.filename
+        else:
+            data = json.dumps(result, ensure_ascii=False).encode("utf-8")
+            _write_atomic(directory / RESULT_JSON_FILE, data)
+            job.result_file = RESULT_JSON_FILE
+            job.result_media_type = "application/json"
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        with self._lock:
+            job.status = status
+            job.finished_at = time.time()
+            self._futures.pop(job.id, None)
+            self._cancel.discard(job.id)
+            self.save(job)
+
+    # ------------------------------------------------------------------
+    # Consulta e controle
+    # ------------------------------------------------------------------
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.directory / job_id
+
+    def save(self, job: Job) -> None:
+        """Grava o estado da tarefa (escrita atômica)"""
+        data = json.dumps(job.to_dict(), ensure_ascii=False).encode("utf-8")
+        _write_atomic(self.job_dir(job.id) / JOB_FILE, data)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Tarefa deste processo ou, se não houver, a gravada em disco"""
+        if not _is_job_id(job_id):
+            return None
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        return self._load(job_id)
+
+    def list(self, limit: int = 50) -> List[Job]:
+        """Tarefas mais recentes primeiro (no máximo MAX_LIST_LIMIT)"""
+        limit = max(1, min(limit, MAX_LIST_LIMIT))
+        jobs = {job.id: job for job in self._load_all()}
+        with self._lock:
+            jobs.update(self._jobs)
+        return sorted(jobs.values(), key=lambda job: job.created_at, reverse=True)[:limit]
+
+    def result_path(self, job: Job) -> Optional[Path]:
+        """Arquivo de resultado de uma tarefa concluída"""
+        if job.status != JobStatus.SUCCEEDED or not job.result_file:
+            return None
+        path = self.job_dir(job.id) / job.result_file
+        return path if path.exists() else None
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return job_id in self._cancel
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancela a tarefa: na fila, é descartada imediatamente; em execução,
+        para no próximo ponto de progresso do handler
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            self._cancel.add(job_id)
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self._finish(job, JobStatus.CANCELLED)
+            return job
+
+    def delete(self, job_id: str) -> bool:
+        """Remove uma tarefa concluída e seus arquivos"""
+        job = self.get(job_id)
+        if job is None or not job.finished:
+            return False
+        with self._lock:
+            self._jobs.pop(job_id, None)
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        return True
+
+    def cleanup(self) -> int:
+        """Remove tarefas concluídas há mais tempo que a retenção configurada"""
+        limit = time.time() - self.retention_seconds
+        removed = 0
+        for job in self._load_all():
+            if job.finished and (job.finished_at or job.created_at) < limit:
+                if self.delete(job.id):
+                    removed += 1
+        return removed
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Encerra o pool: tarefas na fila são descartadas e as em execução param
+        no próximo ponto de progresso; ambas ficam como falhas. O lease é
+        removido, então outros processos não esperam o timeout para saber
+        que este parou.
+        """
+        self._stopping.set()
+        with self._lock:
+            self._cancel.update(self._futures)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+        with self._lock:
+            for job_id, future in list(self._futures.items()):
+                job = self._jobs.get(job_id)
+                if future.cancelled() and job is not None and not job.finished:
+                    job.error = "Interrompida: o servidor foi encerrado"
+                    self._finish(job, JobStatus.FAILED)
+        try:
+            self._lease_path(self.owner).unlink()
+        except FileNotFoundError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Disco
+    # ------------------------------------------------------------------
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        try:
+            data = json.loads((self.job_dir(job_id) / JOB_FILE).read_text(encoding="utf-8"))
+            return Job.from_dict(data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _load_all(self) -> List[Job]:
+        jobs = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        job = self._load(entry.name)
+                        if job is not None:
+                            jobs.append(job)
+        except FileNotFoundError:
+            pass
+        return jobs
+
+    # ------------------------------------------------------------------
+    # Lease e recuperação
+    # ------------------------------------------------------------------
+
+    def _lease_path(self, owner: str) -> Path:
+        return self.directory / LEASE_DIR / owner
+
+    def _renew_lease(self) -> None:
+        path = self._lease_path(self.owner)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(str(os.getpid()), encoding="utf-8")
+
+    def _lease_age(self, owner: str) -> Optional[float]:
+        """Segundos desde a última renovação do lease (None se não existir)"""
+        try:
+            return time.time() - self._lease_path(owner).stat().st_mtime
+        except OSError:
+            return None
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        if owner == self.owner:
+            return True
+        if owner is None:
+            return False  # tarefa gravada antes dos leases
+        age = self._lease_age(owner)
+        return age is not None and age < self.lease_timeout
+
+    def _maintain(self) -> None:
+        while not self._stopping.wait(self.lease_interval):
+            try:
+                self._renew_lease()
+                self._recover()
+            except OSError:
+                pass
+
+    def _recover(self) -> None:
+        # Tarefas não concluídas de um processo que parou não serão retomadas
+        for job in self._load_all():
+            if not job.finished and not self._owner_alive(job.owner):
+                job.status = JobStatus.FAILED
+                job.error = "Interrompida: o processo que a executava parou"
+                job.finished_at = time.time()
+                self.save(job)
+
+        # Leases vencidos não servem mais para nada
+        try:
+            with os.scandir(self.directory / LEASE_DIR) as it:
+                for entry in it:
+                    if entry.name != self.owner and not self._owner_alive(entry.name):
+                        os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _is_job_id(value: str) -> bool:
+    # Ids vêm da URL e viram nomes de diretório: só UUIDs são aceitos
+    try:
+        return str(uuid.UUID(value)) == value
+    except ValueError:
+        return False
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+
+
+# Instância global da fila (criada no startup da aplicação)
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def start_job_manager(handlers: Dict[str, Handler]) -> JobManager:
+    """
+    Cria a fila, configurada por ambiente, e registra os handlers:
+        RVM_JOBS_DIR: diretório das tarefas (padrão: data/jobs)
+        RVM_JOB_WORKERS: tarefas executadas ao mesmo tempo (padrão: 2)
+        RVM_JOB_QUEUE_LIMIT: máximo de tarefas pendentes (padrão: 100)
+        RVM_JOB_RETENTION_HOURS: por quanto tempo tarefas concluídas são mantidas (padrão: 24)
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                Path(os.getenv("RVM_JOBS_DIR", str(DEFAULT_JOBS_DIR))),
+                workers=max(1, int(os.getenv("RVM_JOB_WORKERS", str(DEFAULT_WORKERS)))),
+                queue_limit=int(os.getenv("RVM_JOB_QUEUE_LIMIT", str(DEFAULT_QUEUE_LIMIT))),
+                retention_hours=float(os.getenv("RVM_JOB_RETENTION_HOURS", str(DEFAULT_RETENTION_HOURS))),
+            )
+        for kind, handler in handlers.items():
+            _manager.register(kind, handler)
+        return _manager
+
+
+def get_job_manager() -> Optional[JobManager]:
+    """Fila iniciada por start_job_manager (None antes do startup)"""
+    return _manager
+
+
+def stop_job_manager(wait: bool = True) -> None:
+    """Encerra a fila (desligamento da aplicação)"""
+    global _manager
+    with _manager_lock:
+        manager, _manager = _manager, None
+    if manager is not None:
+        manager.shutdown(wait=wait)
@@ -0,0 +1,183 @@
+"""
+Resolução de Nomes em Lote
+Associa nomes brutos (PDFs/planilhas de histórico) aos publicadores cadastrados
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from app.core.publisher_search import (
+    PublisherSearchIndex,
+    fold_text,
+    get_publisher_search_index,
+)
+
+# Confiança (0–100) por etapa da resolução
+CONFIDENCE_EXACT = 100
+CONFIDENCE_NORMALIZED = 95
+
+# Abaixo disto o melhor candidato aproximado não é aceito
+DEFAULT_MIN_CONFIDENCE = 60
+
+# Quantos candidatos do bloco são pontuados por nome
+DEFAULT_CANDIDATES = 10
+
+
+@dataclass
+class NameResolution:
+    """Resultado da resolução de um nome bruto"""
+    raw_name: str
+    publisher_id: Optional[str]
+    publisher_name: Optional[str]
+    confidence: int             # 0–100
+    method: str                 # exact | alias | normalized | fuzzy | unresolved
+
+    @property
+    def resolved(self) -> bool:
+        return self.publisher_id is not None
+
+    @property
+    def status(self) -> str:
+        """HIGH (>= 85), MEDIUM (>= 60) ou LOW, mesma escala dos scripts de importação"""
+        if self.confidence >= 85:
+            return "HIGH"
+        if self.confidence >= 60:
+            return "MEDIUM"
+        return "LOW"
+
+
+def _get(item, name: str):
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+class NameResolver:
+    """
+    Resolve nomes brutos contra o cadastro, em etapas cada vez mais caras:
+
+    1. nome ou apelido idêntico (após remover espaços das pontas);
+    2. chave normalizada (sem acentos, maiúsculas e pontuação);
+    3. bloco de candidatos por trigramas em comum (ou pela inicial, para
+       nomes curtos demais para trigramas), pontuado por similaridade.
+
+    Os resultados ficam em cache por nome bruto; `resolve_many` remove
+    duplicatas antes de resolver, então um ano de histórico custa uma
+    resolução por nome distinto.
+    """
+
+    def __init__(
+        self,
+        index: PublisherSearchIndex,
+        min_confidence: int = DEFAULT_MIN_CONFIDENCE,
+        candidates: int = DEFAULT_CANDIDATES
+    ):
+        self.index = index
+        self.min_confidence = min_confidence
+        self.candidates = candidates
+        self._cache: Dict[str, NameResolution] = {}
+        self._lock = threading.Lock()
+
+        self._exact: Dict[str, object] = {}
+        self._alias: Dict[str, object] = {}
+        self._by_initial: Dict[str, List[int]] = {}
+        for publisher in index.publishers:
+            name = (_get(publisher, "name") or "").strip()
+            if name:
+                self._exact.setdefault(name, publisher)
+            for alias in _get(publisher, "aliases") or []:
+                alias = alias.strip()
+                if alias:
+                    self._alias.setdefault(alias, publisher)
+        for key_index, text in enumerate(index.key_texts()):
+            self._by_initial.setdefault(text[0], []).append(key_index)
+
+    @classmethod
+    def from_publishers(cls, publishers: Iterable, **kwargs) -> "NameResolver":
+        """Cria o resolvedor a partir de modelos Publisher ou dicts com name/aliases"""
+        return cls(PublisherSearchIndex(publishers), **kwargs)
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def resolve(self, raw_name: str) -> NameResolution:
+        """Resolve um nome (com cache)"""
+        with self._lock:
+            cached = self._cache.get(raw_name)
+        if cached is not None:
+            return cached
+
+        result = self._resolve(raw_name)
+        with self._lock:
+            self._cache[raw_name] = result
+        return result
+
+    def resolve_many(self, raw_names: Iterable[Optional[str]]) -> Dict[str, NameResolution]:
+        """Resolve vários nomes de uma vez; vazios/None são ignorados e repetidos resolvidos uma vez"""
+        unique = dict.fromkeys(name for name in raw_names if name and name.strip())
+        return {name: self.resolve(name) for name in unique}
+
+    # ------------------------------------------------------------------
+    # Etapas
+    # ------------------------------------------------------------------
+
+    def _resolve(self, raw_name: str) -> NameResolution:
+        stripped = raw_name.strip()
+
+        publisher = self._exact.get(stripped)
+        if publisher is not None:
+            return self._result(raw_name, publisher, CONFIDENCE_EXACT, "exact")
+        publisher = self._alias.get(stripped)
+        if publisher is not None:
+            return self._result(raw_name, publisher, CONFIDENCE_EXACT, "alias")
+
+        folded = fold_text(stripped)
+        if not folded:
+            return NameResolution(raw_name, None, None, 0, "unresolved")
+
+        key_index = self.index.exact_key(folded)
+        if key_index is not None:
+            return self._result(
+                raw_name, self.index.publisher_for_key(key_index), CONFIDENCE_NORMALIZED, "normalized"
+            )
+
+        ranked = self.index.ranked_keys(folded, self.candidates)
+        if not ranked:
+            ranked = self.index.score_keys(folded, self._by_initial.get(folded[0], []))
+        if not ranked:
+            return NameResolution(raw_name, None, None, 0, "unresolved")
+
+        key_index, ratio = ranked[0]
+        confidence = round(ratio * 100)
+        if confidence < self.min_confidence:
+            return NameResolution(raw_name, None, None, confidence, "unresolved")
+        return self._result(raw_name, self.index.publisher_for_key(key_index), confidence, "fuzzy")
+
+    @staticmethod
+    def _result(raw_name: str, publisher, confidence: int, method: str) -> NameResolution:
+        return NameResolution(
+            raw_name=raw_name,
+            publisher_id=_get(publisher, "id"),
+            publisher_name=_get(publisher, "name"),
+            confidence=confidence,
+            method=method,
+        )
+
+
+# ============================================================================
+# Resolvedor global (acompanha o índice de busca de publicadores)
+# ============================================================================
+
+_resolver_lock = threading.Lock()
+_resolver: Optional[NameResolver] = None
+
+
+def get_name_resolver() -> NameResolver:
+    """Resolvedor sobre os publicadores cadastrados; refeito quando o cadastro muda"""
+    global _resolver
+    index = get_publisher_search_index()
+    with _resolver_lock:
+        if _resolver is None or _resolver.index is not index:
+            _resolver = NameResolver(index)
+        return _resolver
@@ -0,0 +1,93 @@
+"""
+Índice de Histórico de Participações
+Pré-indexa o histórico por publicador para consultas rápidas no motor de designações
+"""
+from bisect import insort
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.schemas import Participation
+
+
+def normalize_name(name: str) -> str:
+    """Chave normalizada usada para publicadores e títulos de parte"""
+    return name.lower()
+
+
+@lru_cache(maxsize=8192)
+def parse_date_ordinal(value: str) -> Optional[int]:
+    """
+    Converte uma data ISO em ordinal (dias desde 0001-01-01).
+    Memoizado: o histórico repete as mesmas poucas datas de reunião milhares de vezes.
+    Retorna None se a data não puder ser interpretada.
+    """
+    try:
+        return datetime.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class ParticipationIndex:
+    """
+    Índice do histórico de participações, construído uma vez por geração.
+
+    Mantém, por publicador (nome normalizado), a lista ordenada das datas em
+    ordinais inteiros e, por (publicador, título da parte), o ordinal mais
+    recente. As datas são convertidas uma única vez na ingestão; a última
+    participação é O(1) e a inserção incremental é O(log n).
+    """
+
+    def __init__(self, participations: Iterable = ()):
+        self._dates_by_publisher: Dict[str, List[int]] = {}
+        self._last_by_part: Dict[Tuple[str, str], int] = {}
+
+        for p in participations:
+            # Participation traz a data ISO; EngineParticipation já traz o ordinal
+            if isinstance(p, Participation):
+                self.add(p.publisher_name, p.part_title, p.date)
+            else:
+                self.add_ordinal(p.publisher_name, p.part_title, p.ordinal)
+
+    def add(self, publisher_name: str, part_title: str, date: str) -> bool:
+        """
+        Adiciona uma participação ao índice.
+        Retorna False se a data não puder ser interpretada (registro ignorado).
+        """
+        ordinal = parse_date_ordinal(date)
+        if ordinal is None:
+            return False
+
+        self.add_ordinal(publisher_name, part_title, ordinal)
+        return True
+
+    def add_ordinal(self, publisher_name: str, part_title: str, ordinal: int) -> None:
+        """Adiciona uma participação cuja data já está em ordinal"""
+        name_key = normalize_name(publisher_name)
+        dates = self._dates_by_publisher.setdefault(name_key, [])
+        insort(dates, ordinal)
+
+        part_key = (name_key, normalize_name(part_title))
+        current = self._last_by_part.get(part_key)
+        if current is None or ordinal > current:
+            self._last_by_part[part_key] = ordinal
+
+    def add_participation(self, participation: Participation) -> bool:
+        """Adiciona um modelo Participation ao índice"""
+        return self.add(participation.publisher_name, participation.part_title, participation.date)
+
+    def dates_for(self, publisher_name: str) -> List[int]:
+        """Ordinais das participações do publicador, em ordem crescente"""
+        return self._dates_by_publisher.get(normalize_name(publisher_name), [])
+
+    def last_date(self, publisher_name: str) -> Optional[int]:
+        """Ordinal da participação mais recente do publicador"""
+        dates = self._dates_by_publisher.get(normalize_name(publisher_name))
+        return dates[-1] if dates else None
+
+    def last_part_date(self, publisher_name: str, part_title: str) -> Optional[int]:
+        """Ordinal mais recente em que o publicador fez a parte informada"""
+        return self._last_by_part.get((normalize_name(publisher_name), normalize_name(part_title)))
+
+    def __len__(self) -> int:
+        return sum(len(dates) for dates in self._dates_by_publisher.values())
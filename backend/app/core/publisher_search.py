@@ -0,0 +1,223 @@
+"""
+Índice de Busca de Publicadores
+Busca por nome e apelidos sem acentos/maiúsculas, com índice de trigramas
+e resultados ordenados por relevância
+"""
+import re
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from app.models.schemas import Publisher
+from app.core.repository import publishers_repository
+
+T = TypeVar("T")
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Relevância (menor é melhor)
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_WORD_PREFIX = 2
+RANK_SUBSTRING = 3
+
+
+def fold_text(text: str) -> str:
+    """Minúsculas, sem acentos e com pontuação/espaços colapsados ("Antônio" -> "antonio")"""
+    normalized = unicodedata.normalize("NFKD", text or "")
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", normalized.lower()).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigramas de um texto já normalizado"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _padded(text: str) -> str:
+    # Bordas marcadas: trigramas de início/fim de palavra pesam na busca aproximada
+    return f"  {text} "
+
+
+def _names_of(item) -> List[str]:
+    if isinstance(item, dict):
+        return [item.get("name") or "", *(item.get("aliases") or [])]
+    return [item.name, *getattr(item, "aliases", [])]
+
+
+class PublisherSearchIndex(Generic[T]):
+    """
+    Índice imutável sobre nomes e apelidos dos publicadores.
+
+    Cada nome é normalizado uma única vez (NFKD, sem acentos, minúsculas).
+    Buscas por trecho usam a interseção das listas de trigramas e só então
+    conferem o trecho; `closest` usa a contagem de trigramas em comum para
+    escolher poucos candidatos antes de calcular a similaridade.
+    Aceita modelos Publisher ou dicts com "name"/"aliases".
+    """
+
+    def __init__(self, publishers: Iterable[T]):
+        self.publishers: List[T] = list(publishers)
+        # (posição do publicador, é apelido, texto normalizado)
+        self._keys: List[Tuple[int, bool, str]] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._exact: Dict[str, List[int]] = {}
+
+        for position, publisher in enumerate(self.publishers):
+            for n, name in enumerate(_names_of(publisher)):
+                folded = fold_text(name)
+                if not folded:
+                    continue
+                key_index = len(self._keys)
+                self._keys.append((position, n > 0, folded))
+                self._exact.setdefault(folded, []).append(key_index)
+                for gram in trigrams(_padded(folded)):
+                    self._postings.setdefault(gram, set()).add(key_index)
+
+    def __len__(self) -> int:
+        return len(self.publishers)
+
+    # ------------------------------------------------------------------
+    # Busca por trecho
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[T]:
+        """
+        Publicadores cujo nome ou apelido contém o trecho (ignorando acentos).
+        Ordem: igual, começa com, alguma palavra começa com, contém; nome antes
+        de apelido; empates na ordem do cadastro.
+        """
+        folded = fold_text(query)
+        if not folded:
+            return []
+
+        best: Dict[int, Tuple[int, bool]] = {}
+        for key_index in self._candidates(folded):
+            position, is_alias, text = self._keys[key_index]
+            rank = _match_rank(text, folded)
+            if rank is None:
+                continue
+            score = (rank, is_alias)
+            if position not in best or score < best[position]:
+                best[position] = score
+
+        ordered = sorted(best, key=lambda pos: (best[pos], pos))
+        if limit is not None:
+            ordered = ordered[:limit]
+        return [self.publishers[pos] for pos in ordered]
+
+    def _candidates(self, folded: str) -> Iterable[int]:
+        grams = trigrams(folded)
+        if not grams:
+            # Trechos com menos de 3 caracteres: conferência direta (textos já normalizados)
+            return range(len(self._keys))
+
+        postings = sorted((self._postings.get(g, set()) for g in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    # ------------------------------------------------------------------
+    # Busca aproximada
+    # ------------------------------------------------------------------
+
+    def closest(
+        self,
+        name: str,
+        min_ratio: float = 0.0,
+        candidates: int = 10
+    ) -> Optional[Tuple[T, float]]:
+        """
+        Publicador mais parecido com o nome informado e a similaridade (0–1).
+        Igualdade após normalização vale 1.0 sem cálculo adicional; caso
+        contrário, só os `candidates` nomes com mais trigramas em comum são
+        comparados com SequenceMatcher. Retorna None abaixo de `min_ratio`.
+        """
+        folded = fold_text(name)
+        if not folded:
+            return None
+
+        key_index = self.exact_key(folded)
+        if key_index is not None:
+            return self.publisher_for_key(key_index), 1.0
+
+        ranked = self.ranked_keys(folded, candidates)
+        if not ranked or ranked[0][1] < min_ratio:
+            return None
+        key_index, ratio = ranked[0]
+        return self.publisher_for_key(key_index), ratio
+
+    def ranked_keys(self, folded: str, candidates: int = 10) -> List[Tuple[int, float]]:
+        """
+        Chaves (nome/apelido) mais parecidas com um texto já normalizado,
+        em ordem decrescente de similaridade: [(índice da chave, similaridade)]
+        """
+        shared: Dict[int, int] = {}
+        for gram in trigrams(_padded(folded)):
+            for key_index in self._postings.get(gram, ()):
+                shared[key_index] = shared.get(key_index, 0) + 1
+        if not shared:
+            return []
+
+        shortlist = sorted(shared, key=lambda k: (-shared[k], k))[:candidates]
+        return self.score_keys(folded, shortlist)
+
+    def score_keys(self, folded: str, key_indices: Iterable[int]) -> List[Tuple[int, float]]:
+        """Similaridade (SequenceMatcher) entre o texto e as chaves informadas, maior primeiro"""
+        matcher = SequenceMatcher(None, "", folded)
+        scored = []
+        for key_index in key_indices:
+            matcher.set_seq1(self._keys[key_index][2])
+            scored.append((key_index, matcher.ratio()))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored
+
+    def exact_key(self, folded: str) -> Optional[int]:
+        """Primeira chave cujo texto normalizado é igual ao informado"""
+        keys = self._exact.get(folded)
+        return keys[0] if keys else None
+
+    def key_texts(self) -> List[str]:
+        """Textos normalizados das chaves, na ordem dos índices"""
+        return [text for _, _, text in self._keys]
+
+    def publisher_for_key(self, key_index: int) -> T:
+        """Publicador dono da chave"""
+        return self.publishers[self._keys[key_index][0]]
+
+
+def _match_rank(text: str, query: str) -> Optional[int]:
+    if text == query:
+        return RANK_EXACT
+    if text.startswith(query):
+        return RANK_PREFIX
+    position = text.find(query)
+    if position < 0:
+        return None
+    if text[position - 1] == " ":
+        return RANK_WORD_PREFIX
+    return RANK_SUBSTRING
+
+
+# ============================================================================
+# Índice global (reconstruído quando os publicadores mudam)
+# ============================================================================
+
+_index_lock = threading.Lock()
+_index: Optional[PublisherSearchIndex[Publisher]] = None
+_index_generation: Optional[int] = None
+
+
+def get_publisher_search_index() -> PublisherSearchIndex[Publisher]:
+    """Índice sobre os publicadores cadastrados, reconstruído só após alterações"""
+    global _index, _index_generation
+    generation, publishers = publishers_repository.snapshot()
+    with _index_lock:
+        if _index is None or generation != _index_generation:
+            _index = PublisherSearchIndex(publishers)
+            _index_generation = generation
+        return _index
@@ -0,0 +1,137 @@
+"""
+Repositório em Cache
+Mantém em memória os modelos já validados de cada coleção do armazenamento,
+com índices por id e por semana, invalidados quando a coleção muda
+"""
+import threading
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+from app.models.schemas import Publisher, Participation
+from app.core.storage import StorageBackend, get_storage
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class CachedRepository(Generic[T]):
+    """
+    Cache dos registros de uma coleção convertidos em modelos.
+
+    A cada leitura compara o token de versão do armazenamento (escritas
+    locais + mtime/tamanho dos arquivos); só recarrega e revalida a coleção
+    quando ele muda. Os modelos retornados são compartilhados entre
+    requisições e não devem ser alterados.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        parse: Callable[[dict], T],
+        storage: Callable[[], StorageBackend] = get_storage
+    ):
+        self.collection = collection
+        self._parse = parse
+        self._storage = storage
+        self._lock = threading.RLock()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Descarta o cache; a próxima leitura recarrega a coleção"""
+        with self._lock:
+            self._backend: Optional[StorageBackend] = None
+            self._version: Hashable = _MISSING
+            self._generation = getattr(self, "_generation", 0) + 1
+            self._items: List[T] = []
+            self._by_id: Dict[str, T] = {}
+            self._by_week: Dict[str, List[T]] = {}
+
+    def _refresh(self) -> None:
+        backend = self._storage()
+        # O token é lido antes dos dados: uma escrita concorrente causa no
+        # máximo uma recarga extra, nunca um cache desatualizado
+        version = backend.version(self.collection)
+        if backend is self._backend and version == self._version:
+            return
+
+        items = [self._parse(record) for record in backend.list_all(self.collection)]
+        by_id: Dict[str, T] = {}
+        by_week: Dict[str, List[T]] = {}
+        for item in items:
+            item_id = _field(item, "id")
+            if item_id is not None:
+                by_id.setdefault(item_id, item)
+            week = _field(item, "week")
+            if week is not None:
+                by_week.setdefault(week, []).append(item)
+
+        self._backend = backend
+        self._version = version
+        self._generation += 1
+        self._items = items
+        self._by_id = by_id
+        self._by_week = by_week
+
+    # ------------------------------------------------------------------
+    # Leituras
+    # ------------------------------------------------------------------
+
+    def all(self) -> List[T]:
+        """Todos os registros, na ordem de inserção"""
+        with self._lock:
+            self._refresh()
+            return list(self._items)
+
+    def snapshot(self) -> Tuple[int, List[T]]:
+        """
+        (geração, registros): a geração muda a cada recarga, permitindo que
+        estruturas derivadas (ex.: índice de busca) sejam refeitas só quando preciso
+        """
+        with self._lock:
+            self._refresh()
+            return self._generation, list(self._items)
+
+    def get(self, record_id: str) -> Optional[T]:
+        """Primeiro registro com o id (mesma regra do armazenamento)"""
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(record_id)
+
+    def by_id(self) -> Dict[str, T]:
+        """Índice id -> registro"""
+        with self._lock:
+            self._refresh()
+            return self._by_id
+
+    def by_week(self, week: str) -> List[T]:
+        """Registros da semana informada"""
+        with self._lock:
+            self._refresh()
+            return list(self._by_week.get(week, []))
+
+    def weeks(self) -> Dict[str, List[T]]:
+        """Índice semana -> registros"""
+        with self._lock:
+            self._refresh()
+            return self._by_week
+
+
+def _field(item, name: str):
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+# ============================================================================
+# Repositórios globais
+# ============================================================================
+
+publishers_repository: CachedRepository[Publisher] = CachedRepository(
+    "publishers", Publisher.model_validate
+)
+meetings_repository: CachedRepository[dict] = CachedRepository(
+    "meetings", dict
+)
+participations_repository: CachedRepository[Participation] = CachedRepository(
+    "participations", Participation.model_validate
+)
@@ -0,0 +1,199 @@
+"""
+Estatísticas de Publicadores
+Totais, última participação e intervalo médio por publicador, mantidos em
+memória e atualizados a cada participação criada ou removida (leitura O(1))
+"""
+import threading
+from typing import Dict, Hashable, List, Optional
+
+from app.models.schemas import PublisherStats
+from app.core.participation_index import parse_date_ordinal
+from app.core.storage import StorageBackend, get_storage
+
+PARTICIPATIONS = "participations"
+
+
+def publisher_stats_id(publisher_name: str) -> str:
+    """Identificador usado nas estatísticas (mesma regra de calculate_stats)"""
+    return publisher_name.lower().replace(" ", "-")
+
+
+def _to_stats(item: dict) -> PublisherStats:
+    """
+    Converte um item de `participation_summary`. O intervalo médio entre
+    participações é (última - primeira) / (n - 1), igual à média dos
+    intervalos consecutivos.
+    """
+    last = item["last"]
+    total = item["total"]
+
+    avg_days = None
+    if total > 1:
+        first_ordinal = parse_date_ordinal(item["first_date"])
+        last_ordinal = parse_date_ordinal(last.get("date"))
+        if first_ordinal is not None and last_ordinal is not None:
+            avg_days = (last_ordinal - first_ordinal) / (total - 1)
+
+    name = item["publisher_name"]
+    return PublisherStats(
+        publisher_id=publisher_stats_id(name),
+        publisher_name=name,
+        total_assignments=total,
+        last_assignment_date=last.get("date"),
+        last_assignment_week=last.get("week"),
+        last_assignment_title=last.get("part_title"),
+        last_assignment_type=last.get("type"),
+        avg_days_between_assignments=avg_days,
+    )
+
+
+def compute_publisher_stats(storage: StorageBackend) -> List[PublisherStats]:
+    """Estatísticas de todos os publicadores, menos participações primeiro (cálculo completo)"""
+    stats = [_to_stats(item) for item in storage.participation_summary()]
+    # Ordenação estável: empates ficam na ordem de aparição no histórico
+    stats.sort(key=lambda s: s.total_assignments)
+    return stats
+
+
+class PublisherStatsStore:
+    """
+    Estatísticas por publicador em memória, atualizadas incrementalmente.
+
+    Carregadas com uma consulta agrupada (`participation_summary`) na primeira
+    leitura. As escritas de participações passam por `insert`/`delete`, que
+    recalculam só o publicador afetado (consulta pelo índice de nome). Escritas
+    feitas por fora (outro processo, importação) mudam o token de versão da
+    coleção e provocam uma reconstrução completa na leitura seguinte;
+    `rebuild` força essa reconstrução.
+    """
+
+    def __init__(self, storage: StorageBackend):
+        self.storage = storage
+        self._lock = threading.RLock()
+        self._version: Optional[Hashable] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._stats: Dict[str, PublisherStats] = {}          # publicador -> resumo
+        self._first_seq: Dict[str, int] = {}                 # publicador -> 1ª aparição
+        self._names_by_stats_id: Dict[str, List[str]] = {}   # nomes que colidem no mesmo id
+        self._listing: Optional[List[PublisherStats]] = None
+
+    # ------------------------------------------------------------------
+    # Reconstrução
+    # ------------------------------------------------------------------
+
+    def rebuild(self) -> int:
+        """Reconstrói todas as estatísticas a partir do histórico. Retorna o nº de publicadores."""
+        with self._lock:
+            # Token lido antes da consulta: uma escrita concorrente causa no
+            # máximo uma reconstrução extra, nunca um resultado desatualizado
+            version = self.storage.version(PARTICIPATIONS)
+            self._reset()
+            for item in self.storage.participation_summary():
+                self._put(item)
+            self._version = version
+            return len(self._stats)
+
+    def _sync(self) -> None:
+        """Reconstrói se o histórico mudou por fora deste store"""
+        if self._version is None or self._version != self.storage.version(PARTICIPATIONS):
+            self.rebuild()
+
+    # ------------------------------------------------------------------
+    # Escritas
+    # ------------------------------------------------------------------
+
+    def insert(self, record: dict) -> None:
+        """Grava a participação no armazenamento e atualiza o publicador"""
+        with self._lock:
+            self._sync()
+            self.storage.insert(PARTICIPATIONS, record)
+            self._refresh(record["publisher_name"])
+            self._version = self.storage.version(PARTICIPATIONS)
+
+    def delete(self, participation_id: str) -> bool:
+        """Remove a participação (a primeira com o id) e atualiza o publicador"""
+        with self._lock:
+            self._sync()
+            record = self.storage.get(PARTICIPATIONS, participation_id)
+            if record is None or not self.storage.delete(PARTICIPATIONS, participation_id):
+                return False
+
+            if self.storage.stable_sequence:
+                self._refresh(record["publisher_name"])
+                self._version = self.storage.version(PARTICIPATIONS)
+            else:
+                # Sem seq estável (JSON legado) as posições de aparição mudam:
+                # reconstrução na próxima leitura
+                self._version = None
+            return True
+
+    def _refresh(self, name: str) -> None:
+        """Recalcula o resumo de um publicador"""
+        self._drop(name)
+        for item in self.storage.participation_summary(publisher_name=name):
+            self._put(item)
+
+    def _put(self, item: dict) -> None:
+        name = item["publisher_name"]
+        stats = _to_stats(item)
+        self._stats[name] = stats
+        self._first_seq[name] = item["first_seq"]
+        self._names_by_stats_id.setdefault(stats.publisher_id, []).append(name)
+        self._listing = None
+
+    def _drop(self, name: str) -> None:
+        stats = self._stats.pop(name, None)
+        if stats is None:
+            return
+        del self._first_seq[name]
+        names = self._names_by_stats_id[stats.publisher_id]
+        names.remove(name)
+        if not names:
+            del self._names_by_stats_id[stats.publisher_id]
+        self._listing = None
+
+    # ------------------------------------------------------------------
+    # Leituras
+    # ------------------------------------------------------------------
+
+    def get(self, publisher_id: str) -> Optional[PublisherStats]:
+        """
+        Estatísticas de um publicador (O(1)).
+        Se nomes diferentes colidem no mesmo id, vale o de menos participações,
+        como na listagem ordenada.
+        """
+        with self._lock:
+            self._sync()
+            names = self._names_by_stats_id.get(publisher_id)
+            if not names:
+                return None
+            return self._stats[min(names, key=self._order_key)]
+
+    def all(self) -> List[PublisherStats]:
+        """Estatísticas de todos os publicadores, menos participações primeiro"""
+        with self._lock:
+            self._sync()
+            if self._listing is None:
+                self._listing = [self._stats[name] for name in sorted(self._stats, key=self._order_key)]
+            return self._listing
+
+    def _order_key(self, name: str) -> tuple:
+        """Menos participações primeiro; empates pela ordem de aparição no histórico"""
+        return (self._stats[name].total_assignments, self._first_seq[name])
+
+
+# Instância global do store (ligada ao backend de armazenamento atual)
+_stats_store: Optional[PublisherStatsStore] = None
+_store_lock = threading.Lock()
+
+
+def get_stats_store(storage: Optional[StorageBackend] = None) -> PublisherStatsStore:
+    """Retorna o store de estatísticas do backend (padrão: o global)"""
+    global _stats_store
+    backend = storage or get_storage()
+    with _store_lock:
+        if _stats_store is None or _stats_store.storage is not backend:
+            _stats_store = PublisherStatsStore(backend)
+        return _stats_store
@@ -0,0 +1,575 @@
+"""
+Camada de Armazenamento
+Abstração dos stores locais (publicadores, reuniões, participações) com
+implementação em arquivos JSON (legado) e em SQLite embarcado (WAL, indexado)
+"""
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Optional
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# Colunas indexadas por coleção (coluna -> chave do registro)
+COLLECTIONS: Dict[str, Dict[str, str]] = {
+    "publishers": {"id": "id", "name": "name"},
+    "meetings": {"id": "id", "week": "week", "date": "date"},
+    "participations": {"id": "id", "week": "week", "publisher_name": "publisher_name", "date": "date"},
+}
+
+# Coleções em que o id é único (os demais stores aceitam repetições, como o JSON legado)
+UNIQUE_ID_COLLECTIONS = {"publishers"}
+
+# Marcador (tabela meta) da importação única dos JSON legados
+LEGACY_IMPORT_KEY = "legacy_json_imported"
+LEGACY_SUFFIX = ".imported"
+
+# Marcador (tabela meta) da migração para id único; os registros repetidos de
+# bancos antigos vão para <coleção>_duplicates
+UNIQUE_ID_MIGRATION_KEY = "unique_id_migrated:{collection}"
+
+
+class DuplicateIdError(ValueError):
+    """Inserção de um id que já existe numa coleção de ids únicos"""
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    """(mtime, tamanho) do arquivo, ou None se não existir"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _check_collection(collection: str) -> Dict[str, str]:
+    columns = COLLECTIONS.get(collection)
+    if columns is None:
+        raise ValueError(f"Coleção desconhecida: {collection}")
+    return columns
+
+
+class StorageBackend(ABC):
+    """
+    Interface dos stores locais.
+
+    Os registros são dicts (já serializáveis em JSON). Ids só são únicos nas
+    coleções de UNIQUE_ID_COLLECTIONS (`insert` levanta DuplicateIdError); nas
+    demais o store JSON legado aceitava repetições e `get`, `update` e
+    `delete` atuam sobre o primeiro registro com o id, na ordem de inserção.
+    """
+
+    def __init__(self):
+        self._changes_lock = threading.Lock()
+        self._changes: Dict[str, int] = {}
+
+    def _touch(self, collection: str) -> None:
+        """Conta uma escrita local na coleção (invalida caches em memória)"""
+        with self._changes_lock:
+            self._changes[collection] = self._changes.get(collection, 0) + 1
+
+    def local_changes(self, collection: str) -> int:
+        """Número de escritas feitas por este processo na coleção"""
+        return self._changes.get(collection, 0)
+
+    @abstractmethod
+    def version(self, collection: str) -> Hashable:
+        """
+        Token de versão da coleção: muda a cada escrita local e quando os
+        arquivos subjacentes mudam (mtime/tamanho), inclusive por outro processo.
+        """
+
+    @abstractmethod
+    def list_all(self, collection: str) -> List[dict]:
+        """Todos os registros, na ordem de inserção"""
+
+    @abstractmethod
+    def get(self, collection: str, record_id: str) -> Optional[dict]:
+        """Primeiro registro com o id informado"""
+
+    @abstractmethod
+    def find(self, collection: str, field: str, value: str) -> List[dict]:
+        """Registros cujo campo indexado é igual ao valor"""
+
+    @abstractmethod
+    def insert(self, collection: str, record: dict) -> None:
+        """Adiciona um registro (DuplicateIdError se o id já existir numa coleção de ids únicos)"""
+
+    @abstractmethod
+    def update(self, collection: str, record_id: str, record: dict) -> bool:
+        """Substitui o primeiro registro com o id. Retorna False se não existir."""
+
+    @abstractmethod
+    def delete(self, collection: str, record_id: str) -> bool:
+        """Remove o primeiro registro com o id. Retorna False se não existir."""
+
+    @abstractmethod
+    def replace_all(self, collection: str, records: Iterable[dict]) -> int:
+        """Substitui todo o conteúdo da coleção (importação)"""
+
+    # True se a posição de inserção de um registro (first_seq no resumo) não
+    # muda quando outros registros são removidos
+    stable_sequence = False
+
+    def participation_summary(self, publisher_name: Optional[str] = None) -> List[dict]:
+        """
+        Resumo do histórico por publicador (ou só do publicador informado), na
+        ordem de primeira aparição: {"publisher_name", "total", "first_date",
+        "first_seq", "last"}, onde `last` é o registro mais recente (em datas
+        iguais, o inserido primeiro) e `first_seq` a posição da primeira aparição
+        """
+        summary: Dict[str, dict] = {}
+        for position, record in enumerate(self.list_all("participations")):
+            name = record.get("publisher_name")
+            if publisher_name is not None and name != publisher_name:
+                continue
+            date = record.get("date")
+            item = summary.get(name)
+            if item is None:
+                summary[name] = {
+                    "publisher_name": name, "total": 1, "first_date": date,
+                    "first_seq": position, "last": record,
+                }
+                continue
+            item["total"] += 1
+            if date < item["first_date"]:
+                item["first_date"] = date
+            if date > item["last"].get("date"):
+                item["last"] = record
+        return list(summary.values())
+
+
+# ============================================================================
+# JSON (legado)
+# ============================================================================
+
+class JsonFileBackend(StorageBackend):
+    """Um arquivo JSON por coleção, lido e regravado por inteiro a cada operação"""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        super().__init__()
+        self.data_dir = data_dir
+        self._lock = threading.RLock()
+
+    def file_for(self, collection: str) -> Path:
+        _check_collection(collection)
+        return self.data_dir / f"{collection}.json"
+
+    def _ensure_file(self, collection: str) -> Path:
+        """Caminho do arquivo da coleção, criado vazio se ainda não existir"""
+        path = self.file_for(collection)
+        if not path.exists():
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text("[]", encoding="utf-8")
+        return path
+
+    def _read(self, collection: str) -> List[dict]:
+        return json.loads(self._ensure_file(collection).read_text(encoding="utf-8"))
+
+    def _write(self, collection: str, records: List[dict]) -> None:
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.file_for(collection).write_text(
+            json.dumps(records, indent=2, ensure_ascii=False), encoding="utf-8"
+        )
+        self._touch(collection)
+
+    def version(self, collection: str) -> Hashable:
+        # Arquivo criado antes da assinatura: a criação na primeira leitura não
+        # pode mudar o token logo depois de lido
+        with self._lock:
+            path = self._ensure_file(collection)
+        return (self.local_changes(collection), _file_signature(path))
+
+    def list_all(self, collection: str) -> List[dict]:
+        with self._lock:
+            return self._read(collection)
+
+    def get(self, collection: str, record_id: str) -> Optional[dict]:
+        with self._lock:
+            for record in self._read(collection):
+                if record.get("id") == record_id:
+                    return record
+            return None
+
+    def find(self, collection: str, field: str, value: str) -> List[dict]:
+        with self._lock:
+            key = _check_collection(collection).get(field, field)
+            return [r for r in self._read(collection) if r.get(key) == value]
+
+    def insert(self, collection: str, record: dict) -> None:
+        with self._lock:
+            records = self._read(collection)
+            if collection in UNIQUE_ID_COLLECTIONS and any(r.get("id") == record.get("id") for r in records):
+                raise DuplicateIdError(f"Id já existe em {collection}: {record.get('id')}")
+            records.append(record)
+            self._write(collection, records)
+
+    def update(self, collection: str, record_id: str, record: dict) -> bool:
+        with self._lock:
+            records = self._read(collection)
+            for i, r in enumerate(records):
+                if r.get("id") == record_id:
+                    records[i] = record
+                    self._write(collection, records)
+                    return True
+            return False
+
+    def delete(self, collection: str, record_id: str) -> bool:
+        with self._lock:
+            records = self._read(collection)
+            for i, r in enumerate(records):
+                if r.get("id") == record_id:
+                    records.pop(i)
+                    self._write(collection, records)
+                    return True
+            return False
+
+    def replace_all(self, collection: str, records: Iterable[dict]) -> int:
+        with self._lock:
+            records = list(records)
+            if collection in UNIQUE_ID_COLLECTIONS:
+                # Ids repetidos: fica o primeiro, como no SQLite
+                unique: Dict[str, dict] = {}
+                for r in records:
+                    unique.setdefault(r.get("id"), r)
+                records = list(unique.values())
+            self._write(collection, records)
+            return len(records)
+
+
+# ============================================================================
+# SQLite
+# ============================================================================
+
+class SqliteBackend(StorageBackend):
+    """
+    SQLite embarcado em modo WAL.
+
+    Cada coleção é uma tabela com o registro completo em `data` (JSON) e
+    colunas indexadas (id, semana, nome do publicador, data). Consultas por
+    id/semana/nome/data são O(log n) e cada escrita é uma transação.
+    Nas coleções de ids únicos o índice de id é UNIQUE (migração única
+    registrada na tabela meta). Uma conexão por thread.
+    """
+
+    def __init__(self, db_path: Path):
+        super().__init__()
+        self.db_path = db_path
+        self._local = threading.local()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            for collection, columns in COLLECTIONS.items():
+                column_defs = ", ".join(f"{c} TEXT" for c in columns)
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {collection} ("
+                    f"seq INTEGER PRIMARY KEY AUTOINCREMENT, {column_defs}, data TEXT NOT NULL)"
+                )
+                for column in columns:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{collection}_{column} "
+                        f"ON {collection}({column})"
+                    )
+        for collection in UNIQUE_ID_COLLECTIONS:
+            self._migrate_unique_id(collection)
+
+    def _migrate_unique_id(self, collection: str) -> None:
+        """
+        Migração única para o índice UNIQUE de id. Bancos anteriores a ele podem
+        ter ids repetidos: fica o primeiro (o único visível por get/update/delete)
+        e os demais são movidos para <coleção>_duplicates, nunca apagados.
+        """
+        key = UNIQUE_ID_MIGRATION_KEY.format(collection=collection)
+        if self.get_meta(key) is not None:
+            return
+
+        conn = self._connection()
+        with self._immediate(conn):
+            if self.get_meta(key) is not None:
+                return  # outro processo migrou enquanto esperávamos o lock
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {collection}_duplicates AS "
+                f"SELECT * FROM {collection} WHERE 0"
+            )
+            moved = conn.execute(
+                f"INSERT INTO {collection}_duplicates SELECT * FROM {collection} "
+                f"WHERE seq NOT IN (SELECT MIN(seq) FROM {collection} GROUP BY id)"
+            ).rowcount
+            conn.execute(f"DELETE FROM {collection} WHERE seq IN (SELECT seq FROM {collection}_duplicates)")
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{collection}_id ON {collection}(id)")
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps({"at": datetime.now().isoformat(), "moved_duplicates": moved})),
+            )
+
+    @staticmethod
+    def _immediate(conn: sqlite3.Connection):
+        """Transação com lock de escrita desde o início (BEGIN IMMEDIATE)"""
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def _values(self, collection: str, record: dict) -> list:
+        columns = _check_collection(collection)
+        values = []
+        for key in columns.values():
+            value = record.get(key)
+            values.append(None if value is None else str(value))
+        values.append(json.dumps(record, ensure_ascii=False))
+        return values
+
+    def version(self, collection: str) -> Hashable:
+        # Escritas de outro processo alteram o -wal (ou o banco, após checkpoint)
+        _check_collection(collection)
+        return (
+            self.local_changes(collection),
+            _file_signature(self.db_path),
+            _file_signature(self.db_path.with_name(self.db_path.name + "-wal")),
+        )
+
+    def list_all(self, collection: str) -> List[dict]:
+        _check_collection(collection)
+        rows = self._connection().execute(f"SELECT data FROM {collection} ORDER BY seq")
+        return [json.loads(data) for (data,) in rows]
+
+    def get(self, collection: str, record_id: str) -> Optional[dict]:
+        _check_collection(collection)
+        row = self._connection().execute(
+            f"SELECT data FROM {collection} WHERE id = ? ORDER BY seq LIMIT 1", (record_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, collection: str, field: str, value: str) -> List[dict]:
+        if field not in _check_collection(collection):
+            raise ValueError(f"Campo não indexado em {collection}: {field}")
+        rows = self._connection().execute(
+            f"SELECT data FROM {collection} WHERE {field} = ? ORDER BY seq", (value,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def insert(self, collection: str, record: dict) -> None:
+        columns = _check_collection(collection)
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO {collection} ({', '.join(columns)}, data) VALUES ({placeholders})",
+                    self._values(collection, record),
+                )
+        except sqlite3.IntegrityError:
+            raise DuplicateIdError(f"Id já existe em {collection}: {record.get('id')}")
+        self._touch(collection)
+
+    def update(self, collection: str, record_id: str, record: dict) -> bool:
+        columns = _check_collection(collection)
+        assignments = ", ".join(f"{c} = ?" for c in columns)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                f"UPDATE {collection} SET {assignments}, data = ? WHERE seq = "
+                f"(SELECT seq FROM {collection} WHERE id = ? ORDER BY seq LIMIT 1)",
+                self._values(collection, record) + [record_id],
+            )
+        self._touch(collection)
+        return cursor.rowcount > 0
+
+    def delete(self, collection: str, record_id: str) -> bool:
+        _check_collection(collection)
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                f"DELETE FROM {collection} WHERE seq = "
+                f"(SELECT seq FROM {collection} WHERE id = ? ORDER BY seq LIMIT 1)",
+                (record_id,),
+            )
+        self._touch(collection)
+        return cursor.rowcount > 0
+
+    def replace_all(self, collection: str, records: Iterable[dict]) -> int:
+        conn = self._connection()
+        with conn:
+            count = self._replace_rows(conn, collection, records)
+        self._touch(collection)
+        return count
+
+    def _replace_rows(self, conn: sqlite3.Connection, collection: str, records: Iterable[dict]) -> int:
+        """Substitui o conteúdo da coleção dentro da transação corrente"""
+        columns = _check_collection(collection)
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        rows = [self._values(collection, r) for r in records]
+        # Ids repetidos numa coleção de ids únicos: fica o primeiro
+        verb = "INSERT OR IGNORE" if collection in UNIQUE_ID_COLLECTIONS else "INSERT"
+        conn.execute(f"DELETE FROM {collection}")
+        cursor = conn.executemany(
+            f"{verb} INTO {collection} ({', '.join(columns)}, data) VALUES ({placeholders})",
+            rows,
+        )
+        return cursor.rowcount if rows else 0
+
+    stable_sequence = True  # seq (AUTOINCREMENT) nunca é reaproveitado
+
+    def participation_summary(self, publisher_name: Optional[str] = None) -> List[dict]:
+        # Uma consulta agrupada (funções de janela) em vez de ler o histórico inteiro
+        where, params = ("WHERE publisher_name = ?", (publisher_name,)) if publisher_name is not None else ("", ())
+        rows = self._connection().execute(
+            "SELECT publisher_name, total, first_date, first_seq, data FROM ("
+            "  SELECT publisher_name, data,"
+            "    COUNT(*) OVER w AS total,"
+            "    MIN(date) OVER w AS first_date,"
+            "    MIN(seq) OVER w AS first_seq,"
+            "    ROW_NUMBER() OVER (PARTITION BY publisher_name ORDER BY date DESC, seq) AS position"
+            f"  FROM participations {where} WINDOW w AS (PARTITION BY publisher_name)"
+            ") WHERE position = 1 ORDER BY first_seq",
+            params,
+        )
+        return [
+            {
+                "publisher_name": name, "total": total, "first_date": first_date,
+                "first_seq": first_seq, "last": json.loads(data),
+            }
+            for name, total, first_date, first_seq, data in rows
+        ]
+
+    def is_empty(self) -> bool:
+        """True se nenhuma coleção tiver registros"""
+        conn = self._connection()
+        return all(
+            conn.execute(f"SELECT 1 FROM {collection} LIMIT 1").fetchone() is None
+            for collection in COLLECTIONS
+        )
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def import_once(self, key: str, value: str, records: Dict[str, List[dict]]) -> Optional[Dict[str, int]]:
+        """
+        Importa `records` (coleção -> registros) e grava a chave na tabela meta
+        numa única transação. Só importa se o banco estiver vazio; retorna None
+        se a chave já existia (importação feita por outro processo). Se algo
+        falhar, nada é gravado, nem a chave.
+        """
+        conn = self._connection()
+        with self._immediate(conn):
+            if self.get_meta(key) is not None:
+                return None
+            imported = {}
+            if self.is_empty():
+                for collection, collection_records in records.items():
+                    imported[collection] = self._replace_rows(conn, collection, collection_records)
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, value))
+        for collection in imported:
+            self._touch(collection)
+        return imported
+
+
+def import_json_files(target: StorageBackend, data_dir: Path = DATA_DIR) -> Dict[str, int]:
+    """Importa os arquivos JSON legados para o backend informado"""
+    source = JsonFileBackend(data_dir)
+    imported = {}
+    for collection in COLLECTIONS:
+        if source.file_for(collection).exists():
+            imported[collection] = target.replace_all(collection, source.list_all(collection))
+    return imported
+
+
+def archive_json_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    """Renomeia os JSON legados (<coleção>.json.imported) para não serem lidos de novo"""
+    archived = []
+    for collection in COLLECTIONS:
+        path = data_dir / f"{collection}.json"
+        if path.exists():
+            target = path.with_name(path.name + LEGACY_SUFFIX)
+            os.replace(path, target)
+            archived.append(target)
+    return archived
+
+
+def import_legacy_json_once(backend: SqliteBackend, data_dir: Path = DATA_DIR) -> Dict[str, int]:
+    """
+    Importação única dos JSON legados, registrada na tabela meta na mesma
+    transação da importação. Só importa se o banco estiver vazio e só renomeia
+    os arquivos depois de uma importação bem-sucedida; se a leitura ou a
+    gravação falhar, a exceção sobe e a importação é tentada de novo na
+    próxima abertura. Apagar todos os dados depois disso não traz os JSON de volta.
+    """
+    if backend.get_meta(LEGACY_IMPORT_KEY) is not None:
+        return {}
+
+    source = JsonFileBackend(data_dir)
+    records = {
+        collection: source.list_all(collection)
+        for collection in COLLECTIONS
+        if source.file_for(collection).exists()
+    }
+    imported = backend.import_once(LEGACY_IMPORT_KEY, datetime.now().isoformat(), records)
+    if not imported:
+        return {}
+    archive_json_files(data_dir)
+    return imported
+
+
+# Instância global do backend
+_storage: Optional[StorageBackend] = None
+
+
+def create_storage() -> StorageBackend:
+    """
+    Cria o backend configurado por ambiente:
+        RVM_STORAGE: "sqlite" (padrão) ou "json"
+        RVM_DATABASE_PATH: caminho do banco SQLite (padrão: data/rvm.db)
+
+    Na primeira abertura de um banco SQLite, os arquivos JSON legados são
+    importados uma única vez (se o banco estiver vazio) e renomeados.
+    """
+    kind = os.getenv("RVM_STORAGE", "sqlite").lower()
+    if kind == "json":
+        return JsonFileBackend(DATA_DIR)
+    if kind != "sqlite":
+        raise ValueError(f"RVM_STORAGE inválido: {kind}")
+
+    db_path = Path(os.getenv("RVM_DATABASE_PATH", str(DATA_DIR / "rvm.db")))
+    backend = SqliteBackend(db_path)
+    import_legacy_json_once(backend, DATA_DIR)
+    return backend
+
+
+def get_storage() -> StorageBackend:
+    """Retorna a instância do backend de armazenamento"""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+    return _storage
+
+
+if __name__ == "__main__":
+    # Importação manual dos JSON legados (substitui o conteúdo do banco; lê
+    # <coleção>.json, então renomeie de volta os .json.imported se preciso):
+    #   python -m app.core.storage --import-json
+    import sys
+
+    if "--import-json" not in sys.argv:
+        print("Uso: python -m app.core.storage --import-json")
+        sys.exit(1)
+
+    db_path = Path(os.getenv("RVM_DATABASE_PATH", str(DATA_DIR / "rvm.db")))
+    counts = import_json_files(SqliteBackend(db_path), DATA_DIR)
+    for collection, count in counts.items():
+        print(f"{collection}: {count} registros importados")
@@ -1,35 +1,237 @@
 """
 Cliente Supabase para o Backend Python
 Reutiliza credenciais do arquivo .env
+
+Além do cliente síncrono, oferece um cliente PostgREST assíncrono para as
+rotas async: um httpx.AsyncClient compartilhado (keep-alive, HTTP/2 opcional),
+timeouts configuráveis e novas tentativas com backoff exponencial.
 """
+import asyncio
+import email.utils
 import os
+import random
+import threading
+import time
+import weakref
 from functools import lru_cache
-from typing import Optional
+from typing import Optional, Tuple, TypeVar
+
+import httpx
 from dotenv import load_dotenv
+from postgrest import AsyncPostgrestClient
 from supabase import create_client, Client
 
+T = TypeVar("T")
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
 
-@lru_cache()
-def get_supabase_client() -> Client:
-    """
-    Retorna uma instância singleton do cliente Supabase.
-    Usa cache para evitar múltiplas conexões.
-    """
+def _credentials() -> Tuple[str, str]:
+    """URL e chave anônima do projeto"""
     url = os.getenv("VITE_SUPABASE_URL") or os.getenv("SUPABASE_URL")
     key = os.getenv("VITE_SUPABASE_ANON_KEY") or os.getenv("SUPABASE_ANON_KEY")
-    
+
     if not url or not key:
         raise ValueError(
             "Supabase credentials not found. "
             "Please set VITE_SUPABASE_URL and VITE_SUPABASE_ANON_KEY in .env"
         )
-    
-    return create_client(url, key)
+
+    return url, key
+
+
+@lru_cache()
+def get_supabase_client() -> Client:
+    """
+    Retorna uma instância singleton do cliente Supabase.
+    Usa cache para evitar múltiplas conexões.
+    """
+    return create_client(*_credentials())
 
 
 def get_supabase() -> Client:
     """Alias para get_supabase_client()"""
     return get_supabase_client()
+
+
+# ============================================================================
+# Cliente assíncrono (PostgREST)
+# ============================================================================
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+# Respostas que indicam falha temporária do servidor/proxy. O postgrest
+# também repete leituras com 503/520, marcando as novas tentativas com
+# X-Retry-Count: essas não são repetidas aqui de novo, senão as tentativas
+# se multiplicariam
+RETRY_STATUSES = {429, 502, 503, 504}
+POSTGREST_RETRIED = {503, 520}
+
+# Métodos que podem ser repetidos mesmo depois de a requisição chegar ao
+# servidor. Os PATCH do backend gravam valores absolutos (status, datas),
+# então repeti-los não muda o resultado; inserções (POST) só são repetidas
+# com 429 ou se a conexão nem chegou a ser aberta
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PATCH", "PUT", "DELETE"}
+
+# Marca (removida antes do envio) de requisições tratadas como não
+# idempotentes, qualquer que seja o método: um UPDATE condicional grava o
+# mesmo valor, mas uma nova tentativa responde diferente (a linha já saiu do
+# status de origem), então não é repetido depois de enviado
+NO_RETRY_HEADER = "X-RVM-No-Retry"
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Transporte com novas tentativas e backoff exponencial (com jitter).
+    Respeita Retry-After quando o servidor o envia.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retries: int = 3,
+        backoff: float = 0.25,
+        max_backoff: float = 5.0
+    ):
+        self._transport = transport
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None and "Retry-After" in response.headers:
+            retry_after = response.headers["Retry-After"]
+            try:
+                return min(self._max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                moment = email.utils.parsedate_to_datetime(retry_after)
+                if moment is not None:
+                    return min(self._max_backoff, max(0.0, moment.timestamp() - time.time()))
+        delay = min(self._max_backoff, self._backoff * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS
+        if NO_RETRY_HEADER in request.headers:
+            del request.headers[NO_RETRY_HEADER]
+            idempotent = False
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # A requisição não foi enviada: qualquer método pode ser repetido
+                if attempt >= self._retries:
+                    raise
+            except httpx.TransportError:
+                if not idempotent or attempt >= self._retries:
+                    raise
+            else:
+                status = response.status_code
+                if status not in RETRY_STATUSES or attempt >= self._retries:
+                    return response
+                if status in POSTGREST_RETRIED and "X-Retry-Count" in request.headers:
+                    return response
+                if not idempotent and status != 429:
+                    return response
+                await response.aread()
+                await response.aclose()
+                await asyncio.sleep(self._delay(attempt, response))
+                attempt += 1
+                continue
+            await asyncio.sleep(self._delay(attempt))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def without_resend(query: T) -> T:
+    """
+    Marca a requisição de um builder do postgrest com NO_RETRY_HEADER:
+    RetryTransport só a repete se ela não chegou ao servidor (ou com 429)
+    """
+    query.request.headers[NO_RETRY_HEADER] = "1"
+    return query
+
+
+def create_async_http_client(url: str, key: str) -> httpx.AsyncClient:
+    """
+    httpx.AsyncClient configurado pelo ambiente:
+        RVM_SUPABASE_HTTP2              1 ativa HTTP/2 (requer o pacote h2)
+        RVM_SUPABASE_TIMEOUT            timeout de leitura/escrita (s, padrão 10)
+        RVM_SUPABASE_CONNECT_TIMEOUT    timeout de conexão (s, padrão 5)
+        RVM_SUPABASE_MAX_CONNECTIONS    conexões simultâneas (padrão 20)
+        RVM_SUPABASE_KEEPALIVE          conexões ociosas mantidas (padrão 10)
+        RVM_SUPABASE_RETRIES            novas tentativas (padrão 3)
+        RVM_SUPABASE_RETRY_BACKOFF      espera inicial entre tentativas (s, padrão 0.25)
+    """
+    http2 = os.getenv("RVM_SUPABASE_HTTP2", "0") == "1"
+    limits = httpx.Limits(
+        max_connections=_env_int("RVM_SUPABASE_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("RVM_SUPABASE_KEEPALIVE", 10),
+    )
+    transport = RetryTransport(
+        httpx.AsyncHTTPTransport(http2=http2, limits=limits),
+        retries=_env_int("RVM_SUPABASE_RETRIES", 3),
+        backoff=_env_float("RVM_SUPABASE_RETRY_BACKOFF", 0.25),
+    )
+    return httpx.AsyncClient(
+        base_url=f"{url.rstrip('/')}/rest/v1",
+        headers={
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        },
+        timeout=httpx.Timeout(
+            _env_float("RVM_SUPABASE_TIMEOUT", 10.0),
+            connect=_env_float("RVM_SUPABASE_CONNECT_TIMEOUT", 5.0),
+        ),
+        transport=transport,
+    )
+
+
+# As conexões de um AsyncClient pertencem ao event loop em que foram abertas:
+# um cliente por loop (o servidor usa um só; tarefas em threads têm o seu)
+_async_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncPostgrestClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_supabase() -> AsyncPostgrestClient:
+    """
+    Cliente PostgREST assíncrono do event loop atual, com o pool de conexões
+    compartilhado entre as requisições. Uso: await client.table(...)...execute()
+    """
+    loop = asyncio.get_running_loop()
+    with _async_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            url, key = _credentials()
+            http_client = create_async_http_client(url, key)
+            client = AsyncPostgrestClient(
+                str(http_client.base_url),
+                headers=dict(http_client.headers),
+                http_client=http_client,
+            )
+            _async_clients[loop] = client
+        return client
+
+
+async def close_async_supabase() -> None:
+    """Fecha o cliente assíncrono do event loop atual (desligamento da aplicação)"""
+    with _async_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -2,13 +2,34 @@
 RVM Designações - Backend API
 FastAPI server para processamento de PDFs, motor de IA e geração de S-89
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.executors import run_io, shutdown_executors
+from app.core.jobs import start_job_manager, stop_job_manager
+from app.core.supabase_client import close_async_supabase
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fila de tarefas criada no startup: a recuperação de tarefas interrompidas
+    # não roda em simples imports (testes, scripts, workers que não servem)
+    from app.api.jobs import JOB_HANDLERS
+    start_job_manager(JOB_HANDLERS)
+    yield
+    # Fila, pools de threads/processos e conexões do Supabase encerrados com o servidor
+    await run_io(stop_job_manager)
+    await close_async_supabase()
+    shutdown_executors()
+
+
 app = FastAPI(
     title="RVM Designações API",
     description="API para gerenciamento de designações de reuniões",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS para permitir acesso do frontend
@@ -18,6 +39,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor da próxima página nas listagens de designações
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -32,7 +55,7 @@ async def health():
 
 
 # Importar rotas
-from app.api import publishers, meetings, assignments, pdf, pdf_parser, pdf_extractor
+from app.api import publishers, meetings, assignments, pdf, pdf_parser, pdf_extractor, jobs
 
 app.include_router(publishers.router, prefix="/api/publishers", tags=["Publishers"])
 app.include_router(meetings.router, prefix="/api/meetings", tags=["Meetings"])
@@ -40,3 +63,4 @@ app.include_router(assignments.router, prefix="/api/assignments", tags=["Assignm
 app.include_router(pdf.router, prefix="/api/pdf", tags=["PDF"])
 app.include_router(pdf_parser.router, prefix="/api/history", tags=["History Import"])
 app.include_router(pdf_extractor.router, prefix="/api/workbook", tags=["Workbook Extraction"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
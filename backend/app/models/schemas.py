@@ -102,6 +102,7 @@ class Assignment(BaseModel):
 
 class S89Request(BaseModel):
     assignment: Assignment
+    archive: bool = False  # Gravar também uma cópia em OUTPUT_DIR
 
 
 class WorkbookExtractRequest(BaseModel):
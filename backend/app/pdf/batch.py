@@ -0,0 +1,152 @@
+"""
+Geração de S-89 em Lote
+Monta um único PDF com todas as folhas (uma ou quatro por página) sobre o
+template compartilhado, ou um ZIP enviado arquivo a arquivo
+"""
+from __future__ import annotations
+
+import tempfile
+import zipfile
+from typing import Iterator, List, Sequence
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+from reportlab.lib.pagesizes import A4
+
+from app.models.schemas import Assignment
+from app.pdf.generator import (
+    S89Template,
+    assignment_filename,
+    get_s89_template,
+    overlay_content,
+    overlay_fonts,
+    render_s89,
+)
+
+# Tamanho dos pedaços enviados na resposta
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Quatro por página: grade 2x2 centralizada numa folha A4 retrato (sem escala)
+FOUR_UP_PAGE_SIZE = A4
+FOUR_UP_COLUMNS = 2
+FOUR_UP_ROWS = 2
+
+
+# ============================================================================
+# Saída: PDF único
+# ============================================================================
+
+def _four_up_offsets(width: float, height: float) -> List[tuple[float, float]]:
+    page_width, page_height = FOUR_UP_PAGE_SIZE
+    margin_x = (page_width - FOUR_UP_COLUMNS * width) / 2
+    margin_y = (page_height - FOUR_UP_ROWS * height) / 2
+    # Ordem de leitura: esquerda para direita, de cima para baixo
+    return [
+        (margin_x + column * width, margin_y + (FOUR_UP_ROWS - 1 - row) * height)
+        for row in range(FOUR_UP_ROWS)
+        for column in range(FOUR_UP_COLUMNS)
+    ]
+
+
+def _add_four_up_sheets(writer: PdfWriter, template: S89Template, assignments: Sequence[Assignment]) -> None:
+    per_sheet = FOUR_UP_COLUMNS * FOUR_UP_ROWS
+    offsets = _four_up_offsets(*template.page_size)
+    resources = DictionaryObject({
+        NameObject("/XObject"): DictionaryObject({NameObject("/S89"): template.as_form(writer)}),
+        NameObject("/Font"): writer._add_object(overlay_fonts()),
+    })
+    resources = writer._add_object(resources)
+
+    for start in range(0, len(assignments), per_sheet):
+        ops = [
+            b"q 1 0 0 1 %g %g cm /S89 Do %s Q\n" % (x, y, overlay_content(assignment))
+            for (x, y), assignment in zip(offsets, assignments[start:start + per_sheet])
+        ]
+        sheet = writer.add_blank_page(*FOUR_UP_PAGE_SIZE)
+        sheet[NameObject("/Resources")] = resources
+        content = DecodedStreamObject()
+        content.set_data(b"".join(ops))
+        sheet[NameObject("/Contents")] = writer._add_object(content)
+
+
+def build_merged_s89(assignments: Sequence[Assignment], four_up: bool = False) -> PdfWriter:
+    """
+    Junta as folhas num único documento. As páginas reaproveitam o conteúdo e
+    as fontes do template (incluídos uma vez no arquivo); cada folha só
+    acrescenta a sua camada de texto. Com `four_up`, as folhas são dispostas
+    2x2 em páginas A4 (tamanho original, prontas para imprimir e recortar).
+    """
+    template = get_s89_template()
+    writer = PdfWriter()
+    if four_up:
+        _add_four_up_sheets(writer, template, assignments)
+    else:
+        for assignment in assignments:
+            template.add_to(writer, assignment)
+    return writer
+
+
+def stream_merged_s89(assignments: Sequence[Assignment], four_up: bool = False) -> Iterator[bytes]:
+    """PDF único com todas as designações, enviado em pedaços"""
+    writer = build_merged_s89(assignments, four_up)
+    # O documento é gravado em disco (acima de 1 MB) em vez de ficar inteiro na memória
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as output:
+        writer.write(output)
+        output.seek(0)
+        while chunk := output.read(STREAM_CHUNK_SIZE):
+            yield chunk
+
+
+# ============================================================================
+# Saída: ZIP
+# ============================================================================
+
+class _ChunkBuffer:
+    """Destino não posicionável para o zipfile; os bytes são retirados a cada arquivo"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def unique_filenames(assignments: Sequence[Assignment]) -> List[str]:
+    """Nomes de arquivo das designações, com sufixo quando se repetem"""
+    seen: dict[str, int] = {}
+    names = []
+    for assignment in assignments:
+        name = assignment_filename(assignment)
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        if count:
+            stem = name[:-len(".pdf")]
+            name = f"{stem}_{count + 1}.pdf"
+        names.append(name)
+    return names
+
+
+def stream_s89_zip(assignments: Sequence[Assignment]) -> Iterator[bytes]:
+    """ZIP com um PDF por designação; cada arquivo é enviado assim que fica pronto"""
+    buffer = _ChunkBuffer()
+    names = unique_filenames(assignments)
+    # PDFs já são comprimidos: armazenados sem nova compressão
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, assignment in zip(names, assignments):
+            archive.writestr(name, render_s89(assignment))
+            yield buffer.take()
+    yield buffer.take()
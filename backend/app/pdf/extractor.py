@@ -16,6 +16,9 @@ except ImportError:
     PdfReader = None
 
 
+# Versão do extrator (chave do cache de extrações): incrementar ao mudar a extração
+EXTRACTOR_VERSION = "1"
+
 # Fragmentos para identificar semanas
 WEEK_FRAGMENTS = ['DE NOVEMBR', 'DE DEZEMBR', 'DE JANE', 'DE FEVER', 'DE MARÇO', 'DE ABRIL', 'DE MAIO', 'DE JUNHO', 'DE JULHO', 'DE AGOSTO', 'DE SET', 'DE OUT']
 
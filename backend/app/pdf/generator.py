@@ -4,15 +4,15 @@ Baseado em: S-89 RVM Designações/generate_s89_forms.py
 """
 from __future__ import annotations
 
-import copy
 import re
+import threading
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
 from typing import Iterable
 
-from pypdf import PdfReader, PdfWriter
-from reportlab.pdfgen import canvas
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, NameObject
 
 from app.models.schemas import Assignment
 
@@ -63,54 +63,224 @@ def format_date(date_str: str) -> str:
         return date_str
 
 
-def create_overlay(page_size: tuple[float, float], assignment: Assignment) -> PdfReader:
-    """Cria uma camada de texto para sobrepor ao template"""
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=page_size)
-    
-    # Nome do estudante
-    c.setFont(*NAME_FONT)
-    c.drawString(NAME_POS[0], NAME_POS[1], assignment.student)
+def _pdf_string(text: str) -> bytes:
+    """Texto como string literal de PDF (WinAnsiEncoding, parênteses e barras escapados)"""
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text_op(font: str, size: int, position: tuple[float, float]) -> tuple[bytes, bytes]:
+    """Prefixo/sufixo do operador que desenha um texto na posição (como o drawString do reportlab)"""
+    x, y = position
+    return f"BT /{font} {size} Tf 1 0 0 1 {x:g} {y:g} Tm ".encode(), b" Tj ET\n"
+
+
+# Fontes padrão (Type 1, sem incorporação) acrescentadas aos recursos da página.
+# Os nomes não colidem com os /F1../F5 do template.
+OVERLAY_FONTS = {
+    "S89Bold": NAME_FONT[0],
+    "S89Regular": DEFAULT_FONT[0],
+}
+
+# Operadores pré-montados para cada campo
+_NAME_OP = _text_op("S89Bold", NAME_FONT[1], NAME_POS)
+_ASSISTANT_OP = _text_op("S89Regular", DEFAULT_FONT[1], ASSISTANT_POS)
+# Ajuste especial para certos nomes (do código original)
+_ASSISTANT_LOW_OP = _text_op("S89Regular", DEFAULT_FONT[1], (ASSISTANT_POS[0], ASSISTANT_POS[1] - 4))
+_ASSISTANT_LOW_NAMES = {"mara rúbia", "mária rúbia"}
+_DATE_OP = _text_op("S89Regular", DEFAULT_FONT[1], DATE_POS)
+_PART_OP = _text_op("S89Regular", DEFAULT_FONT[1], PART_POS)
+_ROOM_OP = _text_op("S89Regular", DEFAULT_FONT[1], ROOM_POS)
+
+
+def _draw(op: tuple[bytes, bytes], text: str) -> bytes:
+    return op[0] + _pdf_string(text) + op[1]
+
+
+def overlay_content(assignment: Assignment) -> bytes:
+    """Operadores de conteúdo da camada de texto (nome, ajudante, data, parte e sala)"""
+    parts = [_draw(_NAME_OP, assignment.student)]
     
-    # Nome do ajudante
-    c.setFont(*DEFAULT_FONT)
     if assignment.assistant:
-        assistant_y = ASSISTANT_POS[1]
-        # Ajuste especial para certos nomes (do código original)
-        normalized = assignment.assistant.strip().lower()
-        if normalized in {"mara rúbia", "mária rúbia"}:
-            assistant_y -= 4
-        c.drawString(ASSISTANT_POS[0], assistant_y, assignment.assistant)
+        low = assignment.assistant.strip().lower() in _ASSISTANT_LOW_NAMES
+        parts.append(_draw(_ASSISTANT_LOW_OP if low else _ASSISTANT_OP, assignment.assistant))
     
-    # Data
-    c.drawString(DATE_POS[0], DATE_POS[1], format_date(assignment.date))
+    parts.append(_draw(_DATE_OP, format_date(assignment.date)))
+    parts.append(_draw(_PART_OP, str(assignment.part_number)))
     
-    # Número da parte
-    c.drawString(PART_POS[0], PART_POS[1], str(assignment.part_number))
-    
-    # Sala
     if assignment.room:
-        c.drawString(ROOM_POS[0], ROOM_POS[1], assignment.room)
+        parts.append(_draw(_ROOM_OP, assignment.room))
     
-    c.save()
-    buffer.seek(0)
-    return PdfReader(buffer)
+    return b"".join(parts)
 
 
-def render_assignment(template_reader: PdfReader, assignment: Assignment, output_path: Path) -> None:
-    """Renderiza o PDF final mesclando template com overlay"""
-    page_size = template_reader.pages[0].mediabox
-    overlay_reader = create_overlay((float(page_size.width), float(page_size.height)), assignment)
-    overlay_page = overlay_reader.pages[0]
-    
-    page = copy.copy(template_reader.pages[0])
-    page.merge_page(overlay_page)
-    
-    writer = PdfWriter()
-    writer.add_page(page)
-    
-    with output_path.open("wb") as target:
-        writer.write(target)
+def overlay_fonts() -> DictionaryObject:
+    """Dicionário /Font com as fontes padrão (Type 1, sem incorporação) da camada de texto"""
+    return DictionaryObject({
+        NameObject(f"/{name}"): DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject(f"/{base_font}"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        })
+        for name, base_font in OVERLAY_FONTS.items()
+    })
+
+
+def _content_stream(data: bytes) -> DecodedStreamObject:
+    stream = DecodedStreamObject()
+    stream.set_data(data)
+    return stream
+
+
+class S89Template:
+    """
+    Template S-89 lido e interpretado uma única vez por processo.
+
+    A camada de texto de cada designação é gerada diretamente como operadores
+    de conteúdo (sem Canvas do reportlab nem PDF intermediário):
+
+    - `render` parte de um PDF-base já serializado (template + fontes + fluxo
+      de texto vazio) e acrescenta uma atualização incremental que substitui
+      só o fluxo de texto; o template não é copiado nem reserializado;
+    - `add_to` acrescenta uma cópia da página a um PdfWriter (documentos com
+      várias folhas compartilham fontes e conteúdo do template);
+    - `as_form` expõe o template como Form XObject, para impor várias folhas
+      numa mesma página.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.reader = PdfReader(str(path))
+        self.page = self.reader.pages[0]
+        box = self.page.mediabox
+        self.page_size = (float(box.width), float(box.height))
+        self._lock = threading.Lock()
+        self._prepare_base()
+
+    def _prepare_base(self) -> None:
+        writer = PdfWriter()
+        page = self._add_page(writer, b"")
+        overlay = page[NameObject("/Contents")][-1]
+        
+        buffer = BytesIO()
+        writer.write(buffer)
+        base = buffer.getvalue()
+        
+        # Trailer da atualização incremental: o mesmo do PDF-base, apontando para a xref anterior
+        trailer_start = base.rindex(b"trailer")
+        startxref = base.rindex(b"startxref")
+        trailer = base[trailer_start:startxref].rstrip()
+        self._base = base if base.endswith(b"\n") else base + b"\n"
+        self._overlay_id = overlay.idnum
+        self._trailer = trailer.replace(b"<<", b"<<\n/Prev %d" % int(base[startxref + 9:].split()[0]), 1)
+
+    def _add_page(self, writer: PdfWriter, overlay: bytes) -> PageObject:
+        with self._lock:
+            page = writer.add_page(self.page)
+        
+        # Cópias do mesmo template no mesmo writer compartilham os recursos
+        fonts = page[NameObject("/Resources")].get_object()[NameObject("/Font")].get_object()
+        for name, font in overlay_fonts().items():
+            if name not in fonts:
+                fonts[name] = font
+        
+        # Conteúdo original isolado em q/Q, seguido da camada de texto
+        contents = page[NameObject("/Contents")].get_object()
+        original = list(contents) if isinstance(contents, ArrayObject) else [page[NameObject("/Contents")]]
+        page[NameObject("/Contents")] = ArrayObject([
+            writer._add_object(_content_stream(b"q\n")),
+            *original,
+            writer._add_object(_content_stream(b"\nQ\n" + overlay)),
+        ])
+        return page
+
+    def add_to(self, writer: PdfWriter, assignment: Assignment) -> PageObject:
+        """Acrescenta ao writer uma cópia do template preenchida com a designação"""
+        return self._add_page(writer, overlay_content(assignment))
+
+    def as_form(self, writer: PdfWriter) -> IndirectObject:
+        """Template como Form XObject no writer (desenhado com `/Nome Do`)"""
+        with self._lock:
+            resources = self.page[NameObject("/Resources")].clone(writer).get_object()
+            data = self.page.get_contents().get_data()
+            appearances = [
+                (NameObject(f"/S89Annot{n}"), stream.clone(writer).indirect_reference, matrix)
+                for n, (stream, matrix) in enumerate(self._annotation_appearances())
+            ]
+        
+        # Campos do formulário (ex.: a caixa "Salão principal" marcada) não
+        # existem num Form XObject: as aparências são desenhadas no conteúdo
+        if appearances:
+            xobjects = resources.setdefault(NameObject("/XObject"), DictionaryObject()).get_object()
+            ops = []
+            for name, stream, matrix in appearances:
+                xobjects[name] = stream
+                ops.append(b"q %g %g %g %g %g %g cm %s Do Q\n" % (*matrix, name.encode()))
+            data = b"q\n" + data + b"\nQ\n" + b"".join(ops)
+        
+        form = _content_stream(data).flate_encode()
+        form.update({
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Form"),
+            NameObject("/BBox"): ArrayObject(self.page.mediabox),
+            NameObject("/Resources"): resources,
+        })
+        return writer._add_object(form)
+
+    def _annotation_appearances(self) -> list:
+        """(aparência normal, matriz que a leva ao /Rect) das anotações visíveis"""
+        result = []
+        for annot in self.page.get("/Annots", []):
+            annot = annot.get_object()
+            appearance = annot.get("/AP", {}).get("/N")
+            if appearance is None or int(annot.get("/F", 0)) & 2:
+                continue
+            appearance = appearance.get_object()
+            if "/BBox" not in appearance:
+                # Dicionário de estados (caixas de seleção): usa o estado atual
+                appearance = appearance.get(annot.get("/AS", "/Off"))
+                if appearance is None:
+                    continue
+                appearance = appearance.get_object()
+            x0, y0, x1, y1 = (float(v) for v in annot["/Rect"])
+            bx0, by0, bx1, by1 = (float(v) for v in appearance["/BBox"])
+            sx = (x1 - x0) / (bx1 - bx0) if bx1 != bx0 else 1
+            sy = (y1 - y0) / (by1 - by0) if by1 != by0 else 1
+            result.append((appearance, (sx, 0, 0, sy, x0 - bx0 * sx, y0 - by0 * sy)))
+        return result
+
+    def render(self, assignment: Assignment) -> bytes:
+        """Renderiza o S-89 da designação em memória"""
+        data = b"\nQ\n" + overlay_content(assignment)
+        offset = len(self._base)
+        obj = b"%d 0 obj\n<<\n/Length %d\n>>\nstream\n%s\nendstream\nendobj\n" % (
+            self._overlay_id, len(data), data
+        )
+        xref = b"xref\n%d 1\n%010d 00000 n \n" % (self._overlay_id, offset)
+        return b"".join([
+            self._base, obj, xref, self._trailer,
+            b"\nstartxref\n%d\n%%%%EOF\n" % (offset + len(obj)),
+        ])
+
+
+_template: S89Template | None = None
+_template_lock = threading.Lock()
+
+
+def get_s89_template() -> S89Template:
+    """Retorna o template S-89 carregado (uma vez por processo)"""
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = S89Template(get_template_path())
+    return _template
+
+
+def render_s89(assignment: Assignment) -> bytes:
+    """Gera o PDF S-89 de uma designação e retorna os bytes (sem gravar em disco)"""
+    return get_s89_template().render(assignment)
 
 
 def assignment_filename(assignment: Assignment) -> str:
@@ -119,9 +289,17 @@ def assignment_filename(assignment: Assignment) -> str:
     return f"{assignment.date}_parte-{assignment.part_number}_{slug}.pdf"
 
 
+def archive_s89(pdf_bytes: bytes, assignment: Assignment, output_dir: Path) -> Path:
+    """Grava um S-89 já renderizado no diretório de arquivo"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path = output_dir / assignment_filename(assignment)
+    output_path.write_bytes(pdf_bytes)
+    return output_path
+
+
 def generate_s89_pdf(assignment: Assignment, output_dir: Path) -> Path:
     """
-    Gera um PDF S-89 para uma designação
+    Gera um PDF S-89 para uma designação e grava em disco
     
     Args:
         assignment: Dados da designação
@@ -130,20 +308,12 @@ def generate_s89_pdf(assignment: Assignment, output_dir: Path) -> Path:
     Returns:
         Caminho do arquivo gerado
     """
-    template_path = get_template_path()
-    template_reader = PdfReader(str(template_path))
-    
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_dir / assignment_filename(assignment)
-    
-    render_assignment(template_reader, assignment, output_path)
-    
-    return output_path
+    return archive_s89(render_s89(assignment), assignment, output_dir)
 
 
 def generate_s89_batch(assignments: list[Assignment], output_dir: Path) -> list[Path]:
     """
-    Gera múltiplos PDFs S-89
+    Gera múltiplos PDFs S-89 e grava em disco
     
     Args:
         assignments: Lista de designações
@@ -152,15 +322,4 @@ def generate_s89_batch(assignments: list[Assignment], output_dir: Path) -> list[
     Returns:
         Lista de caminhos dos arquivos gerados
     """
-    template_path = get_template_path()
-    template_reader = PdfReader(str(template_path))
-    
-    output_dir.mkdir(parents=True, exist_ok=True)
-    
-    paths = []
-    for assignment in assignments:
-        output_path = output_dir / assignment_filename(assignment)
-        render_assignment(template_reader, assignment, output_path)
-        paths.append(output_path)
-    
-    return paths
+    return [generate_s89_pdf(assignment, output_dir) for assignment in assignments]
@@ -0,0 +1,210 @@
+"""
+Extração de Páginas em Paralelo
+Distribui faixas de páginas de um PDF entre processos e devolve o conteúdo
+de cada página na ordem original, para as máquinas de estado de semanas/partes
+"""
+import math
+import os
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from app.core.executors import (
+    WorkerCrashed,
+    cpu_workers,
+    get_process_pool,
+    in_worker_process,
+    replace_process_pool,
+)
+
+# Abaixo disto por processo, o custo de abrir o documento no worker não compensa
+MIN_PAGES_PER_WORKER = 4
+
+# Faixas por worker: faixas menores liberam as primeiras páginas mais cedo (streaming)
+CHUNKS_PER_WORKER = 2
+
+PdfSource = Union[str, bytes]
+PageLines = Tuple[str, List[dict]]
+
+
+def configured_workers() -> int:
+    """
+    Processos de extração (RVM_PDF_WORKERS; padrão: tamanho do pool de CPU,
+    1 desativa). Dentro de um processo do pool a leitura é sempre sequencial.
+    """
+    if in_worker_process():
+        return 1
+    value = os.getenv("RVM_PDF_WORKERS")
+    if value:
+        return max(1, int(value))
+    return cpu_workers()
+
+
+# ============================================================================
+# Leitura de uma página
+# ============================================================================
+
+def read_mupdf_page(page) -> PageLines:
+    """
+    Lê a página com uma única chamada get_text('dict').
+    Retorna o texto corrido (mesmo encadeamento de linhas de get_text())
+    e as linhas com cor e posição, ordenadas por y.
+    """
+    page_dict = page.get_text('dict')
+    text_lines = []
+    all_lines = []
+    for block in page_dict.get('blocks', []):
+        if 'lines' not in block:
+            continue
+        for line in block['lines']:
+            line_text = ''
+            line_color = None
+            line_y = line['bbox'][1]
+            for span in line['spans']:
+                line_text += span['text']
+                if span.get('color') and span['color'] != 0:
+                    line_color = span['color']
+            text_lines.append(line_text)
+            line_text = line_text.strip()
+            if line_text:
+                all_lines.append({'text': line_text, 'color': line_color, 'y': line_y})
+
+    all_lines.sort(key=lambda x: x['y'])
+    return "\n".join(text_lines), all_lines
+
+
+def read_pypdf_page(page) -> str:
+    """Texto da página no modo layout do pypdf (modo simples se o layout falhar)"""
+    try:
+        return page.extract_text(extraction_mode="layout")
+    except Exception:
+        return page.extract_text()
+
+
+# ============================================================================
+# Faixas de páginas (executadas nos workers)
+# ============================================================================
+
+def _open_mupdf(source: PdfSource):
+    import fitz  # PyMuPDF
+
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def _open_pypdf(source: PdfSource):
+    from io import BytesIO
+    from pypdf import PdfReader
+
+    return PdfReader(BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _mupdf_iter(source: PdfSource, start: int, stop: Optional[int] = None) -> Iterator[PageLines]:
+    doc = _open_mupdf(source)
+    try:
+        for i in range(start, len(doc) if stop is None else stop):
+            yield read_mupdf_page(doc[i])
+    finally:
+        doc.close()
+
+
+def _pypdf_iter(source: PdfSource, start: int, stop: Optional[int] = None) -> Iterator[str]:
+    reader = _open_pypdf(source)
+    for i in range(start, len(reader.pages) if stop is None else stop):
+        yield read_pypdf_page(reader.pages[i])
+
+
+def _mupdf_range(source: PdfSource, start: int, stop: int) -> List[PageLines]:
+    return list(_mupdf_iter(source, start, stop))
+
+
+def _pypdf_range(source: PdfSource, start: int, stop: int) -> List[str]:
+    return list(_pypdf_iter(source, start, stop))
+
+
+def _mupdf_page_count(source: PdfSource) -> int:
+    doc = _open_mupdf(source)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def _pypdf_page_count(source: PdfSource) -> int:
+    return len(_open_pypdf(source).pages)
+
+
+# ============================================================================
+# Distribuição
+# ============================================================================
+
+def page_ranges(page_count: int, workers: int) -> List[Tuple[int, int]]:
+    """Faixas contíguas [início, fim) cobrindo o documento, em ordem"""
+    if page_count <= 0:
+        return []
+    chunks = max(1, min(workers * CHUNKS_PER_WORKER, page_count // MIN_PAGES_PER_WORKER))
+    size = math.ceil(page_count / chunks)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _iter_pages(
+    source: PdfSource,
+    page_count: Callable[[PdfSource], int],
+    iter_range: Callable[..., Iterator],
+    read_range: Callable[[PdfSource, int, int], list],
+    workers: Optional[int]
+) -> Iterator:
+    workers = configured_workers() if workers is None else max(1, workers)
+    if workers == 1:
+        yield from iter_range(source, 0)
+        return
+
+    ranges = page_ranges(page_count(source), workers)
+    if len(ranges) <= 1:
+        # Documento pequeno: lido no próprio processo, página a página
+        yield from iter_range(source, 0)
+        return
+
+    # Os workers abrem o documento a partir de um arquivo (mapeado pelo
+    # cache de páginas do SO) em vez de receber uma cópia dos bytes cada um
+    tmp_path = None
+    if isinstance(source, bytes):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(source)
+            tmp_path = tmp.name
+    path = tmp_path or source
+
+    done = 0
+    try:
+        pool = get_process_pool()
+        starts = [start for start, _ in ranges]
+        stops = [stop for _, stop in ranges]
+        # map devolve as faixas na ordem do documento, à medida que ficam prontas
+        try:
+            for chunk in pool.map(read_range, [path] * len(ranges), starts, stops):
+                done += len(chunk)
+                yield from chunk
+        except BrokenProcessPool as e:
+            # Worker morto (ex.: falta de memória): a faixa que o derrubou não
+            # é relida no processo do servidor
+            replace_process_pool(pool)
+            raise WorkerCrashed(f"Processo de leitura encerrado inesperadamente após {done} páginas") from e
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+def count_pages(source: PdfSource) -> int:
+    """Número de páginas do PDF (via PyMuPDF)"""
+    return _mupdf_page_count(source)
+
+
+def iter_mupdf_pages(source: PdfSource, workers: Optional[int] = None) -> Iterator[PageLines]:
+    """(texto, linhas) de cada página via PyMuPDF, na ordem do documento"""
+    return _iter_pages(source, _mupdf_page_count, _mupdf_iter, _mupdf_range, workers)
+
+
+def iter_pypdf_texts(source: PdfSource, workers: Optional[int] = None) -> Iterator[str]:
+    """Texto (modo layout) de cada página via pypdf, na ordem do documento"""
+    return _iter_pages(source, _pypdf_page_count, _pypdf_iter, _pypdf_range, workers)
@@ -0,0 +1,160 @@
+"""
+Benchmark: latência de rotas rápidas durante trabalho pesado concorrente
+
+Dispara várias gerações de designações em lote (CPU) ao mesmo tempo e, enquanto
+elas rodam, mede a latência de requisições rápidas (/health e S-89 individual).
+Cada modo roda num subprocesso:
+    inline   RVM_OFFLOAD=0: o trabalho bloqueante roda no event loop
+    offload  RVM_OFFLOAD=1: E/S em threads, motor no pool de processos
+
+Uso (a partir de backend/):
+    python benchmarks/bench_concurrency.py [--slow 4] [--weeks 52] [--publishers 300]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PART_TITLES = ["Leitura da Bíblia", "Iniciando conversas", "Cultivando o interesse",
+               "Fazendo discípulos", "Discurso", "Joias espirituais"]
+PART_TYPES = ["Tesouros da Palavra de Deus", "Faça Seu Melhor no Ministério", "Nossa Vida Cristã",
+              "Presidente", "Ajudante"]
+
+S89_ASSIGNMENT = {
+    "id": "bench", "date": "2026-03-05", "congregation": "Central", "part_number": 4,
+    "section": "ministerio", "title": "Iniciando conversas", "student": "Maria Souza",
+    "assistant": "Ana Lima", "duration_min": 3,
+}
+
+
+def build_batch_request(publishers: int, weeks: int, seed: int = 1) -> dict:
+    """Request sintético para /generate/batch (publicadores + histórico)"""
+    rng = random.Random(seed)
+    pubs = [
+        {
+            "id": f"p{i}",
+            "name": f"Publicador {i} Silva",
+            "gender": rng.choice(["brother", "sister"]),
+            "condition": rng.choice(["Ancião", "Servo Ministerial", "Publicador"]),
+            "is_baptized": rng.random() < 0.8,
+        }
+        for i in range(publishers)
+    ]
+    history = []
+    for j in range(publishers * 20):
+        day = date(2024, 1, 1) + timedelta(days=rng.randrange(800))
+        history.append({
+            "id": f"h{j}",
+            "publisher_name": f"Publicador {rng.randrange(publishers)} Silva",
+            "week": day.isoformat(),
+            "date": day.isoformat(),
+            "part_title": rng.choice(PART_TITLES),
+            "type": rng.choice(PART_TYPES),
+        })
+    start = date(2026, 3, 2)
+    batch_weeks = [
+        {"week": (start + timedelta(weeks=k)).isoformat(), "date": (start + timedelta(weeks=k, days=3)).isoformat()}
+        for k in range(weeks)
+    ]
+    return {"weeks": batch_weeks, "publishers": pubs, "participations": history}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_mode(args) -> dict:
+    """Executa a carga no processo atual (modo definido por RVM_OFFLOAD)"""
+    import httpx
+
+    from app.core import approval_service
+    from app.core.executors import shutdown_executors
+    from app.main import app
+
+    # Aprovações em memória: o benchmark não depende do Supabase
+    approval_service._approval_service = approval_service.ApprovalService(use_supabase=False)
+
+    payload = build_batch_request(args.publishers, args.weeks)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Aquecimento (inicia o pool de processos e carrega o template S-89)
+        (await client.post("/api/assignments/generate/batch", json=payload)).raise_for_status()
+        (await client.post("/api/pdf/s89", json={"assignment": S89_ASSIGNMENT})).raise_for_status()
+
+        fast_latencies = []
+        slow_done = asyncio.Event()
+
+        async def slow():
+            response = await client.post("/api/assignments/generate/batch", json=payload)
+            response.raise_for_status()
+
+        async def fast():
+            # Requisições em horários fixos; a latência conta a partir do horário
+            # previsto, então o tempo em que o event loop ficou travado entra na conta
+            paths = (("GET", "/health", None), ("POST", "/api/pdf/s89", {"assignment": S89_ASSIGNMENT}))
+            n = 0
+            while not slow_done.is_set():
+                method, path, body = paths[n % len(paths)]
+                scheduled = start + n * args.interval / 1000
+                n += 1
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                response = await client.request(method, path, json=body)
+                response.raise_for_status()
+                fast_latencies.append(time.perf_counter() - scheduled)
+
+        start = time.perf_counter()
+        probe = asyncio.create_task(fast())
+        await asyncio.gather(*(slow() for _ in range(args.slow)))
+        elapsed = time.perf_counter() - start
+        slow_done.set()
+        await probe
+
+    shutdown_executors()
+    return {
+        "elapsed": elapsed,
+        "fast_count": len(fast_latencies),
+        "fast_p50": statistics.median(fast_latencies) * 1000,
+        "fast_p95": percentile(fast_latencies, 0.95) * 1000,
+        "fast_max": max(fast_latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slow", type=int, default=4, help="gerações em lote concorrentes")
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--publishers", type=int, default=300)
+    parser.add_argument("--interval", type=float, default=10, help="ms entre requisições rápidas")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_mode(args))))
+        return
+
+    print(f"{args.slow} gerações concorrentes de {args.weeks} semanas, {args.publishers} publicadores "
+          f"({os.cpu_count()} CPUs)")
+    for label, offload in (("inline", "0"), ("offload", "1")):
+        env = dict(os.environ, RVM_OFFLOAD=offload)
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", *sys.argv[1:]],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:<8} total {r['elapsed']:6.2f} s ({args.slow / r['elapsed']:5.2f} lotes/s) | "
+              f"rápidas: {r['fast_count']:4d} req, p50 {r['fast_p50']:7.1f} ms, "
+              f"p95 {r['fast_p95']:7.1f} ms, máx {r['fast_max']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
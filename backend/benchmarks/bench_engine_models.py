@@ -0,0 +1,129 @@
+"""
+Benchmark: modelos Pydantic x representação compacta do motor
+
+Com um request sintético de geração em lote, compara:
+    memória   objetos retidos (tracemalloc) de publicadores + histórico
+    payload   tamanho e tempo de pickle enviado ao pool de processos
+    geração   generate_assignments_range_sync inline e via run_cpu
+
+Uso (a partir de backend/):
+    python benchmarks/bench_engine_models.py [--weeks 52] [--publishers 300] [--repeat 3]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pydantic import TypeAdapter
+
+from bench_concurrency import build_batch_request
+from app.api.assignments import build_parts_to_fill
+from app.core.assignment_engine import generate_assignments_range_sync, WeekToSchedule
+from app.core.engine_models import to_engine_participations, to_engine_publishers
+from app.core.executors import run_cpu, shutdown_executors
+from app.models.schemas import Publisher, Participation
+
+PUBLISHERS = TypeAdapter(list[Publisher])
+PARTICIPATIONS = TypeAdapter(list[Participation])
+
+
+def engine_inputs(publishers, participations):
+    return to_engine_publishers(publishers), to_engine_participations(participations)
+
+
+def timed(func, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def retained(build) -> int:
+    """Bytes ainda alocados pelo resultado de build() (intermediários descartados)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--weeks", type=int, default=52)
+    parser.add_argument("--publishers", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    request = build_batch_request(args.publishers, args.weeks)
+    raw_publishers = json.dumps(request["publishers"])
+    raw_participations = json.dumps(request["participations"])
+    weeks = [WeekToSchedule(w["week"], w["date"], build_parts_to_fill(None)) for w in request["weeks"]]
+
+    def models():
+        return (
+            PUBLISHERS.validate_json(raw_publishers),
+            PARTICIPATIONS.validate_json(raw_participations),
+        )
+
+    publishers, participations = models()
+    compact = engine_inputs(publishers, participations)
+    print(f"{args.publishers} publicadores, {len(participations)} participações, {args.weeks} semanas "
+          f"({os.cpu_count()} CPUs)")
+
+    # Validação do request (paga pelo FastAPI) e conversão (paga uma vez por geração)
+    validate_time, _ = timed(models, args.repeat)
+    convert_time, _ = timed(lambda: engine_inputs(publishers, participations), args.repeat)
+    print(f"{'validação Pydantic':<22} {validate_time * 1000:8.1f} ms | "
+          f"conversão compacta {convert_time * 1000:8.1f} ms")
+
+    model_bytes = retained(models)
+    compact_bytes = retained(lambda: engine_inputs(*models()))
+    print(f"{'memória retida':<22} Pydantic {model_bytes / 1024:8.0f} KB | "
+          f"compacta {compact_bytes / 1024:8.0f} KB | {model_bytes / compact_bytes:4.1f}x")
+
+    for label, payload in (("Pydantic", (publishers, participations)), ("compacta", compact)):
+        dump_time, data = timed(lambda: pickle.dumps(payload, pickle.HIGHEST_PROTOCOL), args.repeat)
+        load_time, _ = timed(lambda: pickle.loads(data), args.repeat)
+        print(f"{'pickle ' + label:<22} {len(data) / 1024:8.0f} KB | dumps {dump_time * 1000:7.1f} ms | "
+              f"loads {load_time * 1000:7.1f} ms")
+
+    def generate(pubs, parts):
+        return generate_assignments_range_sync(weeks, pubs, parts)
+
+    async def generate_offloaded(pubs, parts):
+        return await run_cpu(generate_assignments_range_sync, weeks, pubs, parts)
+
+    # Aquecimento do pool de processos
+    asyncio.run(generate_offloaded(*compact))
+
+    results = {}
+    for label, payload in (("Pydantic", (publishers, participations)), ("compacta", compact)):
+        inline_time, results[label] = timed(lambda: generate(*payload), args.repeat)
+        pool_time, _ = timed(lambda: asyncio.run(generate_offloaded(*payload)), args.repeat)
+        print(f"{'geração ' + label:<22} inline {inline_time * 1000:8.1f} ms | "
+              f"run_cpu {pool_time * 1000:8.1f} ms")
+
+    same = "idêntico" if results["Pydantic"] == results["compacta"] else "DIFERENTE"
+    print(f"resultado das gerações: {same}")
+
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: extração de páginas de apostila sequencial x em processos
+
+Gera uma apostila sintética (padrão: 60 páginas, uma semana por página),
+extrai com 1 processo e com N processos e confere que as semanas/partes
+resultantes são idênticas.
+
+Uso (a partir de backend/):
+    python benchmarks/bench_pdf_pages.py [--pages 60] [--workers N] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitz  # PyMuPDF
+
+from app.api.pdf_extractor import iter_workbook_weeks
+from app.core.executors import shutdown_executors
+from app.pdf.pages import iter_mupdf_pages, iter_pypdf_texts
+
+MONTHS = ["JANEIRO", "FEVEREIRO", "MARÇO", "ABRIL", "MAIO", "JUNHO", "JULHO",
+          "AGOSTO", "SETEMBRO", "OUTUBRO", "NOVEMBRO", "DEZEMBRO"]
+
+SECTION_COLORS = {
+    "INICIO": (0, 0, 0),
+    "TESOUROS": (0x5A / 255, 0x3C / 255, 0x25 / 255),
+    "MINISTERIO": (0xC1 / 255, 0x86 / 255, 0x26 / 255),
+    "VIDA": (0x6D / 255, 0x17 / 255, 0x19 / 255),
+}
+
+PARTS = [
+    ("INICIO", "Cântico 1 e oração"),
+    ("TESOUROS", "Discurso (10 min) Tema da semana"),
+    ("TESOUROS", "Joias espirituais (10 min)"),
+    ("TESOUROS", "Leitura da Bíblia (4 min) Gên. 1:1-10"),
+    ("MINISTERIO", "Iniciando conversas (3 min) DE CASA EM CASA."),
+    ("MINISTERIO", "Cultivando o interesse (4 min) TESTEMUNHO INFORMAL."),
+    ("MINISTERIO", "Discurso (5 min) Tema do estudante"),
+    ("VIDA", "Necessidades locais (15 min)"),
+    ("VIDA", "Estudo bíblico de congregação (30 min) lição 1"),
+]
+
+
+def build_workbook(pages: int) -> bytes:
+    """Apostila sintética com uma semana por página e texto de preenchimento"""
+    doc = fitz.open()
+    day, month = 5, 0
+    for n in range(pages):
+        page = doc.new_page()
+        y = 40
+        if n == 0:
+            page.insert_text((40, y), "Apostila Vida e Ministério 2026")
+            y += 20
+        end = min(day + 6, 28)
+        page.insert_text((40, y), f"{day} DE {MONTHS[month]} - {end} DE {MONTHS[month]}")
+        y += 18
+        for num, (section, title) in enumerate(PARTS, 1):
+            page.insert_text((40, y), f"{num}. {title}", color=SECTION_COLORS[section])
+            y += 14
+            for k in range(4):
+                page.insert_text((60, y), f"Detalhe {k + 1} da parte {num}: texto de apoio para a designação.")
+                y += 12
+        day += 7
+        if day > 28:
+            day, month = day - 28, (month + 1) % 12
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def timed(func, repeat: int):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    # O pool de processos compartilhado é dimensionado pelo número pedido
+    os.environ["RVM_CPU_WORKERS"] = str(args.workers)
+
+    data = build_workbook(args.pages)
+    print(f"Apostila sintética: {args.pages} páginas, {len(data) / 1024:.0f} KB; "
+          f"{args.workers} processos ({os.cpu_count()} CPUs)")
+
+    def weeks(workers):
+        return [(year, week) for year, week in iter_workbook_weeks(iter_mupdf_pages(data, workers))]
+
+    def texts(workers):
+        return list(iter_pypdf_texts(data, workers))
+
+    # Aquecimento do pool (o custo de iniciar os processos é pago uma vez no servidor)
+    list(iter_mupdf_pages(data, args.workers))
+
+    for label, func in (("PyMuPDF (semanas/partes)", weeks), ("pypdf layout (texto)", texts)):
+        seq_time, seq_result = timed(lambda: func(1), args.repeat)
+        par_time, par_result = timed(lambda: func(args.workers), args.repeat)
+        same = "idêntico" if seq_result == par_result else "DIFERENTE"
+        print(f"{label:<26} sequencial {seq_time * 1000:8.1f} ms | "
+              f"paralelo {par_time * 1000:8.1f} ms | {seq_time / par_time:4.2f}x | {same}")
+
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Configuração dos testes (executar a partir de backend/: python -m pytest -q)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.approval_service import ApprovalService  # noqa: E402
+from postgrest_stub import FakePostgrest  # noqa: E402
+
+
+@pytest.fixture
+def postgrest() -> FakePostgrest:
+    return FakePostgrest()
+
+
+@pytest.fixture
+def service(postgrest, monkeypatch) -> ApprovalService:
+    """Serviço de aprovação ligado ao PostgREST falso (clientes síncrono e assíncrono)"""
+    sync_client = postgrest.sync_client()
+    svc = ApprovalService(use_supabase=True)
+    monkeypatch.setattr(svc, "_get_supabase", lambda: sync_client)
+    monkeypatch.setattr(svc, "_get_async_supabase", postgrest.async_client)
+    return svc
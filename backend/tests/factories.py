@@ -0,0 +1,89 @@
+"""
+Dados aleatórios (mas reproduzíveis pela semente) para os testes do motor:
+publicadores, histórico de participações e as partes de uma reunião
+"""
+import random
+from datetime import date, timedelta
+from typing import List, Tuple
+
+from app.models.schemas import Participation, ParticipationType, Publisher
+
+TITLES = [
+    "Leitura da Bíblia",
+    "Iniciando conversas",
+    "Cultivando o interesse",
+    "Fazendo discípulos",
+    "Discurso",
+    "Joias espirituais",
+    "Ajudante",
+    "Explicando suas crenças",
+]
+
+# (título, tipo, precisa de ajudante)
+PARTS: List[Tuple[str, ParticipationType, bool]] = [
+    ("Presidente", ParticipationType.PRESIDENTE, False),
+    ("Oração Inicial", ParticipationType.ORACAO_INICIAL, False),
+    ("Discurso", ParticipationType.TESOUROS, False),
+    ("Joias espirituais", ParticipationType.TESOUROS, False),
+    ("Leitura da Bíblia", ParticipationType.TESOUROS, False),
+    ("Iniciando conversas", ParticipationType.MINISTERIO, True),
+    ("Cultivando o interesse", ParticipationType.MINISTERIO, True),
+    ("Fazendo discípulos", ParticipationType.MINISTERIO, True),
+    ("Necessidades locais", ParticipationType.VIDA_CRISTA, False),
+    ("Dirigente", ParticipationType.DIRIGENTE, False),
+    ("Leitor", ParticipationType.LEITOR, False),
+    ("Oração Final", ParticipationType.ORACAO_FINAL, False),
+]
+
+# Quintas-feiras de reunião usadas nas datas de ausência
+MEETING_DATES = [(date(2026, 10, 1) + timedelta(days=7 * i)).isoformat() for i in range(12)]
+
+
+def make_publishers(rng: random.Random, count: int) -> List[Publisher]:
+    publishers = []
+    for i in range(count):
+        publishers.append(Publisher(
+            id=f"p{i}",
+            name=f"Nome {i} Silva",
+            gender=rng.choice(["brother", "sister"]),
+            condition=rng.choice(["Ancião", "Servo Ministerial", "Publicador"]),
+            is_baptized=rng.random() < 0.8,
+            is_serving=rng.random() < 0.95,
+            is_helper_only=rng.random() < 0.05,
+            parent_ids=[f"p{rng.randrange(count)}"] if rng.random() < 0.2 else [],
+            privileges=dict(
+                can_give_talks=rng.random() < 0.4,
+                can_conduct_cbs=rng.random() < 0.2,
+                can_read_cbs=rng.random() < 0.3,
+                can_pray=rng.random() < 0.5,
+                can_preside=rng.random() < 0.2,
+            ),
+            privileges_by_section=dict(
+                can_participate_in_treasures=rng.random() < 0.9,
+                can_participate_in_ministry=rng.random() < 0.9,
+                can_participate_in_life=rng.random() < 0.9,
+            ),
+            availability=dict(
+                mode=rng.choice(["always"] * 4 + ["never"]),
+                exception_dates=rng.sample(MEETING_DATES, rng.randrange(4)),
+            ),
+            aliases=[f"N{i}"] if rng.random() < 0.3 else [],
+        ))
+    return publishers
+
+
+def make_participations(rng: random.Random, count: int, publishers: int) -> List[Participation]:
+    """Histórico com nomes em caixa variada e alguns nomes sem cadastro"""
+    participations = []
+    for j in range(count):
+        day = (date(2024, 1, 1) + timedelta(days=rng.randrange(1000))).isoformat()
+        name = f"Nome {rng.randrange(publishers + 10)} Silva"
+        participations.append(Participation(
+            id=f"x{j}",
+            publisher_name=name.upper() if rng.random() < 0.1 else name,
+            week=day,
+            date=day,
+            part_title=rng.choice(TITLES),
+            type=rng.choice(list(ParticipationType)),
+        ))
+    return participations
@@ -0,0 +1,192 @@
+"""
+PostgREST falso para os testes
+Tabelas em memória servidas por um handler do httpx.MockTransport: inserção,
+leitura com filtros (eq, neq, in, is, gt, gte, lt, lte, not, or/and), ordenação,
+limit, contagem (Prefer: count=exact), atualização e funções RPC
+"""
+import json
+import re
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+
+BASE_URL = "http://postgrest.test/rest/v1"
+
+Row = Dict[str, Any]
+
+
+def error_response(status: int, message: str = "erro simulado") -> httpx.Response:
+    """Resposta de erro no formato do PostgREST"""
+    return httpx.Response(status, json={"code": str(status), "message": message, "details": None, "hint": None})
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Separa por vírgulas fora de parênteses e aspas"""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quoted and char == "\\":
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', r'\1', value[1:-1])
+    return value
+
+
+def _compare(op: str, actual: Any, expected: str) -> bool:
+    if op == "not":
+        op, _, expected = expected.partition(".")
+        return not _compare(op, actual, expected)
+    if op == "is":
+        return actual is None if expected == "null" else str(actual).lower() == expected
+    if op == "in":
+        values = [_unquote(v) for v in _split_top_level(expected.strip("()"))]
+        return actual is not None and str(actual) in values
+    if actual is None:
+        return False  # comparações com NULL nunca são verdadeiras
+    actual, expected = str(actual), _unquote(expected)
+    return {
+        "eq": actual == expected,
+        "neq": actual != expected,
+        "gt": actual > expected,
+        "gte": actual >= expected,
+        "lt": actual < expected,
+        "lte": actual <= expected,
+    }[op]
+
+
+def _condition(expression: str) -> Callable[[Row], bool]:
+    """Condição de um filtro or=()/and=() ("col.op.valor" ou "and(...)")"""
+    for group, combine in (("and(", all), ("or(", any)):
+        if expression.startswith(group):
+            conditions = [_condition(e) for e in _split_top_level(expression[len(group):-1])]
+            return lambda row, conditions=conditions, combine=combine: combine(c(row) for c in conditions)
+    column, op, value = expression.split(".", 2)
+    return lambda row: _compare(op, row.get(column), value)
+
+
+class FakePostgrest:
+    """
+    Servidor PostgREST em memória. `fail` permite injetar respostas: recebe a
+    requisição e devolve uma resposta (simulando falha) ou None (segue normal).
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, List[Row]] = defaultdict(list)
+        self.functions: Dict[str, Callable[[dict], Any]] = {}
+        self.requests: List[httpx.Request] = []
+        self.fail: Optional[Callable[[httpx.Request], Optional[httpx.Response]]] = None
+
+    # ------------------------------------------------------------------
+    # Clientes
+    # ------------------------------------------------------------------
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def sync_client(self) -> SyncPostgrestClient:
+        return SyncPostgrestClient(BASE_URL, http_client=httpx.Client(base_url=BASE_URL, transport=self.transport()))
+
+    def async_client(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> AsyncPostgrestClient:
+        http_client = httpx.AsyncClient(base_url=BASE_URL, transport=transport or self.transport())
+        return AsyncPostgrestClient(BASE_URL, http_client=http_client)
+
+    def requests_to(self, method: str, table: str) -> List[httpx.Request]:
+        return [r for r in self.requests if r.method == method and r.url.path.endswith(f"/{table}")]
+
+    # ------------------------------------------------------------------
+    # Handler
+    # ------------------------------------------------------------------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail is not None:
+            response = self.fail(request)
+            if response is not None:
+                return response
+
+        path = request.url.path[len(httpx.URL(BASE_URL).path):].strip("/")
+        if path.startswith("rpc/"):
+            params = json.loads(request.content or b"{}")
+            return httpx.Response(200, json=self.functions[path[4:]](params))
+
+        rows = self.tables[path]
+        selected = self._filter(rows, request.url.params)
+        prefer = request.headers.get("Prefer", "")
+
+        if request.method == "POST":
+            body = json.loads(request.content)
+            new_rows = body if isinstance(body, list) else [body]
+            rows.extend(dict(row) for row in new_rows)
+            return httpx.Response(201, json=new_rows if "return=representation" in prefer else [])
+
+        if request.method == "PATCH":
+            changes = json.loads(request.content)
+            for row in selected:
+                row.update(changes)
+            return httpx.Response(200, json=[self._project(r, request.url.params) for r in selected])
+
+        headers = {}
+        if "count=exact" in prefer:
+            headers["Content-Range"] = f"*/{len(selected)}"
+        selected = self._order(selected, request.url.params.get("order"))
+        offset = int(request.url.params.get("offset", 0))
+        limit = request.url.params.get("limit")
+        selected = selected[offset:offset + int(limit) if limit is not None else None]
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+        return httpx.Response(200, headers=headers, json=[self._project(r, request.url.params) for r in selected])
+
+    def _filter(self, rows: List[Row], params: httpx.QueryParams) -> List[Row]:
+        conditions = []
+        for name, value in params.multi_items():
+            if name in ("select", "order", "limit", "offset", "columns", "on_conflict"):
+                continue
+            if name in ("or", "and"):
+                conditions.append(_condition(f"{name}{value}"))
+            else:
+                op, _, expected = value.partition(".")
+                conditions.append(lambda row, name=name, op=op, expected=expected: _compare(op, row.get(name), expected))
+        return [row for row in rows if all(c(row) for c in conditions)]
+
+    @staticmethod
+    def _order(rows: List[Row], order: Optional[str]) -> List[Row]:
+        # Ordenações aplicadas da última para a primeira (sort estável)
+        for term in reversed(_split_top_level(order or "")):
+            column, *modifiers = term.split(".")
+            descending = "desc" in modifiers
+            nulls_first = "nullsfirst" in modifiers or ("nullslast" not in modifiers and descending)
+            present = sorted((r for r in rows if r.get(column) is not None), key=lambda r: r[column], reverse=descending)
+            nulls = [r for r in rows if r.get(column) is None]
+            rows = nulls + present if nulls_first else present + nulls
+        return rows
+
+    @staticmethod
+    def _project(row: Row, params: httpx.QueryParams) -> Row:
+        select = params.get("select", "*")
+        if select == "*":
+            return dict(row)
+        return {column: row.get(column) for column in select.split(",")}
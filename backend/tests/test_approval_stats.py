@@ -0,0 +1,63 @@
+"""
+Estatísticas de aprovação: uma contagem agrupada por status
+"""
+import asyncio
+from collections import Counter
+
+import pytest
+
+from app.core.approval_service import STATUS_COUNTS_RPC
+
+TABLE = "scheduled_assignments"
+
+
+@pytest.fixture
+def status_counts(postgrest):
+    """Função RPC do PostgREST falso (mesmo resultado do GROUP BY status)"""
+    def counts(params):
+        statuses = Counter(row["status"] for row in postgrest.tables[TABLE])
+        return [{"status": status, "count": count} for status, count in statuses.items()]
+
+    postgrest.functions[STATUS_COUNTS_RPC] = counts
+
+
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def get_stats(request, service):
+    if request.param:
+        return lambda: asyncio.run(service.get_stats_async())
+    return service.get_stats
+
+
+def test_counts_in_one_request(postgrest, status_counts, get_stats):
+    statuses = ["PENDING_APPROVAL"] * 3 + ["APPROVED"] * 2 + ["COMPLETED"]
+    postgrest.tables[TABLE].extend({"id": str(i), "status": s} for i, s in enumerate(statuses))
+
+    stats = get_stats()
+
+    assert stats == {
+        "total": 6,
+        "by_status": {"PENDING_APPROVAL": 3, "APPROVED": 2, "COMPLETED": 1},
+        "pending_count": 3,
+        "approved_count": 2,
+        "rejected_count": 0,
+        "completed_count": 1,
+    }
+    assert len(postgrest.requests) == 1
+    request = postgrest.requests[0]
+    assert request.method == "GET"
+    assert request.url.path.endswith(f"/rpc/{STATUS_COUNTS_RPC}")
+
+
+def test_empty_table(postgrest, status_counts, get_stats):
+    assert get_stats()["total"] == 0
+
+
+def test_cached_until_a_write(postgrest, status_counts, get_stats, service):
+    postgrest.tables[TABLE].append({"id": "a1", "week_id": "2026-W41", "status": "DRAFT"})
+    get_stats()
+    get_stats()
+    assert len(postgrest.requests) == 1
+
+    service._invalidate_rows([{"week_id": "2026-W41", "status": "APPROVED"}])
+    get_stats()
+    assert len(postgrest.requests) == 2
@@ -0,0 +1,166 @@
+"""
+Solver de atribuição ótima: colunas fictícias (partes sem designado), pares
+proibidos, otimalidade contra força bruta e ganho sobre o modo guloso
+"""
+import itertools
+import random
+
+import pytest
+
+from app.core.assignment_engine import EngineConfig, SolverMode, generate_assignments_sync
+from app.core.assignment_solver import solve_max_weight_assignment
+from app.models.schemas import Participation, ParticipationType, Publisher
+from factories import PARTS, make_participations, make_publishers
+
+
+def objective(weights, choices):
+    """(partes preenchidas, soma dos pesos): o solver maximiza nessa ordem"""
+    filled = [(i, j) for i, j in enumerate(choices) if j is not None]
+    return len(filled), sum(weights[i][j] for i, j in filled)
+
+
+def brute_force(weights):
+    """Melhor objetivo entre todas as atribuições válidas"""
+    n, m = len(weights), len(weights[0])
+    options = [[None] + [j for j in range(m) if weights[i][j] is not None] for i in range(n)]
+    best = (0, 0.0)
+    for choices in itertools.product(*options):
+        used = [j for j in choices if j is not None]
+        if len(used) == len(set(used)):
+            best = max(best, objective(weights, choices))
+    return best
+
+
+def assert_valid(weights, choices):
+    used = [j for j in choices if j is not None]
+    assert len(used) == len(set(used))
+    assert all(weights[i][j] is not None for i, j in enumerate(choices) if j is not None)
+
+
+def random_matrix(rng, rows, cols, forbidden=0.4):
+    return [
+        [None if rng.random() < forbidden else float(rng.randrange(-50, 3000)) for _ in range(cols)]
+        for _ in range(rows)
+    ]
+
+
+# ============================================================================
+# Colunas fictícias e pares proibidos
+# ============================================================================
+
+def test_empty_matrix():
+    assert solve_max_weight_assignment([]) == []
+
+
+def test_row_without_candidates_is_unfilled():
+    weights = [
+        [None, None],
+        [10.0, None],
+    ]
+
+    assert solve_max_weight_assignment(weights) == [None, 0]
+
+
+def test_more_rows_than_columns():
+    weights = [
+        [5.0],
+        [9.0],
+        [7.0],
+    ]
+
+    assert solve_max_weight_assignment(weights) == [None, 0, None]
+
+
+def test_forbidden_pair_is_never_chosen_even_if_it_fills_more_rows():
+    weights = [
+        [None, 1.0],
+        [None, 2.0],
+    ]
+
+    choices = solve_max_weight_assignment(weights)
+
+    assert_valid(weights, choices)
+    assert choices.count(None) == 1
+
+
+def test_filling_more_rows_beats_a_higher_score():
+    # Preencher as duas partes vale mais que a pontuação alta da linha 0 na coluna 1
+    weights = [
+        [1.0, 5000.0],
+        [None, 1.0],
+    ]
+
+    assert solve_max_weight_assignment(weights) == [0, 1]
+
+
+def test_negative_weights_are_still_assigned():
+    assert solve_max_weight_assignment([[-500.0, None]]) == [0]
+
+
+# ============================================================================
+# Otimalidade
+# ============================================================================
+
+@pytest.mark.parametrize("seed", range(60))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    weights = random_matrix(rng, rng.randint(1, 5), rng.randint(1, 6))
+
+    choices = solve_max_weight_assignment(weights)
+
+    assert_valid(weights, choices)
+    filled, total = objective(weights, choices)
+    best_filled, best_total = brute_force(weights)
+    assert filled == best_filled
+    assert total == pytest.approx(best_total)
+
+
+# ============================================================================
+# Modo OPTIMAL x GREEDY
+# ============================================================================
+
+def brother(id: str, **privileges) -> Publisher:
+    return Publisher(id=id, name=id.capitalize(), gender="brother", condition="Ancião", privileges=privileges)
+
+
+def test_optimal_fills_a_part_the_greedy_mode_leaves_empty():
+    # Ana nunca participou e é a melhor para a leitura; só ela pode presidir.
+    # O modo guloso a usa na leitura e deixa a presidência sem designado.
+    publishers = [brother("ana", can_preside=True), brother("bruno")]
+    history = [Participation(
+        id="h1", publisher_name="Bruno", week="2026-09-24", date="2026-09-24",
+        part_title="Oração Final", type=ParticipationType.ORACAO_FINAL,
+    )]
+    parts = [
+        ("Leitura da Bíblia", ParticipationType.TESOUROS, False),
+        ("Presidente", ParticipationType.PRESIDENTE, False),
+    ]
+
+    def run(solver):
+        assignments = generate_assignments_sync(
+            "2026-W40", "2026-10-01", parts, publishers, history, EngineConfig(solver=solver)
+        )
+        return [a.principal_id for a in assignments]
+
+    assert run(SolverMode.GREEDY) == ["ana", ""]
+    assert run(SolverMode.OPTIMAL) == ["bruno", "ana"]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimal_is_never_worse_than_greedy(seed):
+    # Os titulares do modo guloso também são uma atribuição válida
+    rng = random.Random(seed)
+    publishers = make_publishers(rng, 25)
+    history = make_participations(rng, 200, publishers=25)
+
+    def titular_objective(solver):
+        assignments = generate_assignments_sync(
+            "2026-W40", "2026-10-01", PARTS, publishers, history, EngineConfig(solver=solver)
+        )
+        filled = [a for a in assignments if a.principal_id]
+        return len(filled), sum(a.score for a in filled)
+
+    greedy, optimal = titular_objective(SolverMode.GREEDY), titular_objective(SolverMode.OPTIMAL)
+    assert optimal[0] >= greedy[0]
+    if optimal[0] == greedy[0]:
+        assert optimal[1] >= greedy[1] - 1e-6
@@ -0,0 +1,161 @@
+"""
+Aprovação em lote: UPDATE condicional por blocos de ids
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import assignments
+from app.core import approval_service
+from app.core.approval_service import BulkApprovalAction
+from app.core.supabase_client import RetryTransport
+from app.main import app
+from postgrest_stub import error_response
+
+TABLE = "scheduled_assignments"
+
+STATUSES = {
+    "a": "DRAFT",
+    "b": "PENDING_APPROVAL",
+    "c": "APPROVED",
+    "d": "REJECTED",
+    "e": "PENDING_APPROVAL",
+    "f": "PENDING_APPROVAL",
+}
+
+
+@pytest.fixture
+def rows(postgrest):
+    postgrest.tables[TABLE].extend(
+        {"id": i, "week_id": "2026-W41", "status": status} for i, status in STATUSES.items()
+    )
+
+
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def bulk(request, service):
+    def run(ids, action="APPROVE"):
+        bulk_action = BulkApprovalAction(assignment_ids=ids, action=action, elder_id="e1", elder_name="Ancião")
+        if request.param:
+            return asyncio.run(service.process_bulk_approval_async(bulk_action))
+        return service.process_bulk_approval(bulk_action)
+    return run
+
+
+def outcomes(results):
+    return [(o.assignment_id, o.outcome, o.status) for o in results]
+
+
+def status_of(postgrest, row_id):
+    return next(row["status"] for row in postgrest.tables[TABLE] if row["id"] == row_id)
+
+
+def test_conditional_update(postgrest, rows, bulk):
+    results = bulk(["a", "b", "a"])
+
+    assert outcomes(results) == [("a", "updated", "APPROVED"), ("b", "updated", "APPROVED")]
+    (patch,) = postgrest.requests_to("PATCH", TABLE)
+    assert patch.url.params["status"] == "in.(DRAFT,PENDING_APPROVAL)"
+    assert patch.url.params["id"] == "in.(a,b)"
+    # Tudo atualizado: nenhuma leitura para diferenciar os demais
+    assert postgrest.requests_to("GET", TABLE) == []
+
+
+def test_invalid_status_and_not_found(postgrest, rows, bulk):
+    results = bulk(["c", "b", "missing", "d"])
+
+    assert outcomes(results) == [
+        ("c", "invalid_status", "APPROVED"),
+        ("b", "updated", "APPROVED"),
+        ("missing", "not_found", None),
+        ("d", "invalid_status", "REJECTED"),
+    ]
+    assert status_of(postgrest, "c") == "APPROVED"
+    assert status_of(postgrest, "d") == "REJECTED"
+    (lookup,) = postgrest.requests_to("GET", TABLE)
+    assert lookup.url.params["id"] == "in.(c,missing,d)"
+
+
+def test_complete_only_from_approved(postgrest, rows, bulk):
+    results = bulk(["a", "c"], action="COMPLETE")
+
+    assert outcomes(results) == [("a", "invalid_status", "DRAFT"), ("c", "updated", "COMPLETED")]
+
+
+def test_failed_chunk_reports_error_and_keeps_the_rest(postgrest, rows, bulk, monkeypatch):
+    monkeypatch.setattr(approval_service, "BULK_UPDATE_CHUNK_SIZE", 2)
+    postgrest.fail = lambda request: (
+        error_response(500, "timeout no banco") if request.method == "PATCH" and "e" in request.url.params["id"] else None
+    )
+
+    results = bulk(["a", "b", "e", "f", "c"])
+
+    assert outcomes(results) == [
+        ("a", "updated", "APPROVED"),
+        ("b", "updated", "APPROVED"),
+        ("e", "error", None),
+        ("f", "error", None),
+        ("c", "invalid_status", "APPROVED"),
+    ]
+    assert all("timeout no banco" in o.error for o in results if o.outcome == "error")
+    assert status_of(postgrest, "e") == "PENDING_APPROVAL"
+    # Os ids do bloco que falhou não entram na leitura de status
+    (lookup,) = postgrest.requests_to("GET", TABLE)
+    assert lookup.url.params["id"] == "in.(c)"
+
+
+def test_lost_response_is_not_reported_as_invalid_status(postgrest, rows, service, monkeypatch):
+    # O primeiro PATCH é aplicado, mas a resposta se perde no caminho
+    client = postgrest.async_client(RetryTransport(postgrest.transport(), retries=3, backoff=0))
+    monkeypatch.setattr(service, "_get_async_supabase", lambda: client)
+
+    def drop_first_response(request):
+        if request.method == "PATCH" and len(postgrest.requests_to("PATCH", TABLE)) == 1:
+            changes = json.loads(request.content)
+            for row in postgrest._filter(postgrest.tables[TABLE], request.url.params):
+                row.update(changes)
+            raise httpx.ReadTimeout("resposta perdida", request=request)
+        return None
+
+    postgrest.fail = drop_first_response
+    action = BulkApprovalAction(assignment_ids=["b", "c"], action="APPROVE", elder_id="e1", elder_name="Ancião")
+
+    results = asyncio.run(service.process_bulk_approval_async(action))
+
+    assert len(postgrest.requests_to("PATCH", TABLE)) == 1
+    assert outcomes(results) == [("b", "error", None), ("c", "error", None)]
+    assert status_of(postgrest, "b") == "APPROVED"
+
+
+def test_failed_lookup_reports_error(postgrest, rows, bulk):
+    postgrest.fail = lambda request: error_response(500) if request.method == "GET" else None
+
+    results = bulk(["b", "c"])
+
+    assert outcomes(results) == [("b", "updated", "APPROVED"), ("c", "error", None)]
+
+
+def test_route_returns_partial_results(postgrest, rows, service, monkeypatch):
+    monkeypatch.setattr(assignments, "get_approval_service", lambda: service)
+    monkeypatch.setattr(approval_service, "BULK_UPDATE_CHUNK_SIZE", 1)
+    postgrest.fail = lambda request: (
+        error_response(503) if request.method == "PATCH" and request.url.params["id"] == "in.(b)" else None
+    )
+
+    response = TestClient(app).patch("/api/assignments/approve", json={
+        "ids": ["a", "b", "missing"],
+        "action": "APPROVE",
+        "elder_id": "e1",
+        "elder_name": "Ancião",
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 1
+    assert body["failed"] == 1
+    assert [(r["id"], r["outcome"]) for r in body["results"]] == [
+        ("a", "updated"), ("b", "error"), ("missing", "not_found"),
+    ]
+    assert body["results"][1]["error"]
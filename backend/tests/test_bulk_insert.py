@@ -0,0 +1,133 @@
+"""
+Inserção em lote de designações geradas (_insert_rows / _insert_rows_async)
+"""
+import asyncio
+
+import pytest
+
+from app.core import approval_service
+from app.core.approval_service import BulkInsertError, _assignment_row
+from app.core.assignment_engine import ApprovalStatus, GeneratedAssignment, GeneratedWeek, TeachingCategory
+from app.models.schemas import ParticipationType
+from postgrest_stub import error_response
+
+TABLE = "scheduled_assignments"
+
+
+def generated(title: str = "Leitura da Bíblia") -> GeneratedAssignment:
+    return GeneratedAssignment(
+        part_title=title,
+        part_type=ParticipationType.TESOUROS,
+        category=list(TeachingCategory)[0],
+        principal_name="Ana",
+        principal_id="p1",
+        secondary_name=None,
+        secondary_id=None,
+        status=ApprovalStatus.PENDING_APPROVAL,
+        score=1.0,
+        reason="teste",
+        pairing_reason=None,
+    )
+
+
+def weeks(count: int, per_week: int = 3):
+    return [
+        GeneratedWeek(week=f"2026-W{i:02d}", date="2026-10-05", assignments=[generated() for _ in range(per_week)])
+        for i in range(count)
+    ]
+
+
+def store(service, async_mode: bool, generated_weeks):
+    rows = [
+        _assignment_row(w.week, w.date, a, None, "2026-10-01T12:00:00")
+        for w in generated_weeks
+        for a in w.assignments
+    ]
+    if async_mode:
+        return asyncio.run(service._insert_rows_async(rows))
+    return service._insert_rows(rows)
+
+
+@pytest.fixture(params=[False, True], ids=["sync", "async"])
+def async_mode(request) -> bool:
+    return request.param
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(approval_service, "INSERT_CHUNK_SIZE", 5)
+
+
+def test_single_chunk(service, postgrest, async_mode):
+    stored = store(service, async_mode, weeks(1))
+
+    posts = postgrest.requests_to("POST", TABLE)
+    assert len(posts) == 1
+    assert "return=representation" in posts[0].headers["Prefer"]
+    assert [s.id for s in stored] == [row["id"] for row in postgrest.tables[TABLE]]
+    assert all(s.duration_min == 4 for s in stored)
+
+
+def test_several_chunks(service, postgrest, async_mode, small_chunks):
+    stored = store(service, async_mode, weeks(4))  # 12 linhas em blocos de 5
+
+    assert len(postgrest.requests_to("POST", TABLE)) == 3
+    assert len(stored) == 12
+    assert [s.id for s in stored] == [row["id"] for row in postgrest.tables[TABLE]]
+    assert [s.week_id for s in stored] == [f"2026-W{i:02d}" for i in range(4) for _ in range(3)]
+
+
+def test_failure_in_second_chunk(service, postgrest, async_mode, small_chunks):
+    posts = []
+
+    def fail_second_post(request):
+        if request.method == "POST":
+            posts.append(request)
+            if len(posts) == 2:
+                return error_response(400, "null value violates not-null constraint")
+        return None
+
+    postgrest.fail = fail_second_post
+    generated_weeks = weeks(4)
+
+    # O cache da semana já gravada precisa ser descartado mesmo com a falha
+    week_key = ("week", "2026-W00")
+    service.cache.put(week_key, [], service.cache.generation())
+
+    with pytest.raises(BulkInsertError) as info:
+        store(service, async_mode, generated_weeks)
+
+    error = info.value
+    saved = postgrest.tables[TABLE]
+    assert len(posts) == 2  # o terceiro bloco não é enviado
+    assert [s.id for s in error.stored] == [row["id"] for row in saved]
+    assert len(error.stored) == 5
+    assert len(error.failed_ids) == 7
+    assert not set(error.failed_ids) & {row["id"] for row in saved}
+    assert "5 designações gravadas, 7 não gravadas" in str(error)
+    assert service.cache.get(week_key) is approval_service._MISSING
+
+
+def test_generate_route_reports_stored_and_failed_ids(service, postgrest, small_chunks, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.api import assignments
+    from app.main import app
+
+    monkeypatch.setenv("RVM_OFFLOAD", "0")
+    monkeypatch.setattr(assignments, "get_approval_service", lambda: service)
+    postgrest.fail = lambda request: (
+        error_response(503) if request.method == "POST" and len(postgrest.requests_to("POST", TABLE)) == 2 else None
+    )
+
+    response = TestClient(app).post("/api/assignments/generate/batch", json={
+        "weeks": [{"week": "2026-W41", "date": "2026-10-05"}, {"week": "2026-W42", "date": "2026-10-12"}],
+        "publishers": [],
+        "participations": [],
+    })
+
+    assert response.status_code == 502
+    detail = response.json()["detail"]
+    saved = [row["id"] for row in postgrest.tables[TABLE]]
+    assert detail["stored_ids"] == saved
+    assert len(saved) == 5
+    assert detail["failed_ids"] and not set(detail["failed_ids"]) & set(saved)
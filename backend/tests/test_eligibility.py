@@ -0,0 +1,166 @@
+"""
+Matriz de elegibilidade: mesmo resultado de `apply_rigid_filters` (a
+referência das regras) para publicadores, partes e datas aleatórios
+"""
+import random
+
+import pytest
+
+from app.core.assignment_engine import apply_rigid_filters
+from app.core.eligibility import EligibilityMatrix
+from app.models.schemas import ParticipationType, Publisher
+from factories import MEETING_DATES, make_publishers
+
+TITLES = [
+    "Discurso",
+    "Joias espirituais",
+    "Leitura da Bíblia",
+    "Discurso: Leitura comentada",
+    "Iniciando conversas",
+    "Necessidades locais",
+]
+
+# Datas de reunião, uma fora das exceções, formato com horário e datas ilegíveis
+DATES = MEETING_DATES + ["2027-01-07", "2026-10-01T19:30:00", "01/10/2026", ""]
+
+
+class FlaggedPublisher(Publisher):
+    """Publicador com os atributos opcionais lidos pelo motor"""
+    is_not_qualified: bool = False
+    requested_no_participation: bool = False
+    approval_needed: bool = False
+
+
+def flagged(rng: random.Random, publisher: Publisher) -> Publisher:
+    return FlaggedPublisher(
+        **publisher.model_dump(),
+        is_not_qualified=rng.random() < 0.1,
+        requested_no_participation=rng.random() < 0.1,
+    )
+
+
+def random_publishers(rng: random.Random, count: int):
+    publishers = [
+        flagged(rng, p) if rng.random() < 0.3 else p
+        for p in make_publishers(rng, count)
+    ]
+    # Datas de ausência ilegíveis e nomes repetidos
+    publishers[0].availability.exception_dates.append("amanhã")
+    publishers[1].name = publishers[2].name
+    return publishers
+
+
+def ids(publishers):
+    return [p.id for p in publishers]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_rigid_filters(seed):
+    rng = random.Random(seed)
+    publishers = random_publishers(rng, 40)
+    matrix = EligibilityMatrix(publishers)
+
+    for _ in range(60):
+        part_type = rng.choice(list(ParticipationType))
+        title = rng.choice(TITLES)
+        date = rng.choice(DATES)
+        chosen = rng.sample(publishers, rng.randrange(4))
+        already_assigned = [rng.choice([p.id, p.name]) for p in chosen]
+
+        expected = apply_rigid_filters(publishers, part_type, title, date, already_assigned)
+        actual = matrix.eligible(part_type, title, date, matrix.assigned_mask(already_assigned))
+
+        assert ids(actual) == ids(expected.eligible), (part_type, title, date, already_assigned)
+
+
+def test_marking_by_name_covers_every_publisher_with_that_name():
+    publishers = make_publishers(random.Random(1), 4)
+    publishers[1].name = publishers[0].name
+    matrix = EligibilityMatrix(publishers)
+
+    mask = matrix.assigned_mask([publishers[0].name])
+
+    assert list(mask) == [True, True, False, False]
+
+
+# ============================================================================
+# Disponibilidade
+# ============================================================================
+
+def publisher(mode: str, exception_dates, **fields) -> Publisher:
+    return Publisher(
+        id="p", name="Ana", gender="sister", condition="Publicador",
+        availability={"mode": mode, "exception_dates": exception_dates}, **fields,
+    )
+
+
+@pytest.mark.parametrize("mode, exceptions, date, available", [
+    ("always", [], "2026-10-01", True),
+    ("always", ["2026-10-01"], "2026-10-01", False),
+    ("always", ["2026-10-01"], "2026-10-01T19:30:00", False),
+    ("always", ["2026-10-01"], "2026-10-08", True),
+    ("never", [], "2026-10-01", False),
+    ("never", ["2026-10-01"], "2026-10-01", True),
+    ("never", ["2026-10-01"], "2026-10-08", False),
+    ("always", ["ilegível"], "2026-10-01", True),
+    ("always", ["2026-10-01"], "ilegível", True),
+    ("never", ["2026-10-01"], "ilegível", False),
+])
+def test_availability(mode, exceptions, date, available):
+    publishers = [publisher(mode, exceptions)]
+    matrix = EligibilityMatrix(publishers)
+    part = (ParticipationType.MINISTERIO, "Iniciando conversas", date)
+
+    assert bool(matrix.availability_mask(date)[0]) is available
+    assert ids(matrix.eligible(*part)) == ids(apply_rigid_filters(publishers, *part, []).eligible)
+
+
+# ============================================================================
+# Privilégios
+# ============================================================================
+
+PRIVILEGE_CASES = [
+    # (tipo, título, campos do publicador, elegível)
+    (ParticipationType.PRESIDENTE, "Presidente", {"gender": "brother", "privileges": {"can_preside": True}}, True),
+    (ParticipationType.PRESIDENTE, "Presidente", {"gender": "sister", "privileges": {"can_preside": True}}, False),
+    (ParticipationType.PRESIDENTE, "Presidente", {"gender": "brother"}, False),
+    (ParticipationType.ORACAO_FINAL, "Oração Final",
+     {"gender": "brother", "is_baptized": True, "privileges": {"can_pray": True}}, True),
+    (ParticipationType.ORACAO_FINAL, "Oração Final",
+     {"gender": "brother", "is_baptized": False, "privileges": {"can_pray": True}}, False),
+    (ParticipationType.TESOUROS, "Discurso", {"gender": "brother", "privileges": {"can_give_talks": True}}, True),
+    (ParticipationType.TESOUROS, "Joias espirituais", {"gender": "brother"}, False),
+    (ParticipationType.TESOUROS, "Leitura da Bíblia", {"gender": "brother"}, True),
+    (ParticipationType.TESOUROS, "Leitura da Bíblia", {"gender": "sister"}, False),
+    (ParticipationType.TESOUROS, "Leitura da Bíblia",
+     {"gender": "brother", "privileges_by_section": {"can_participate_in_treasures": False}}, False),
+    (ParticipationType.MINISTERIO, "Iniciando conversas", {"gender": "sister"}, True),
+    (ParticipationType.MINISTERIO, "Iniciando conversas",
+     {"gender": "sister", "privileges_by_section": {"can_participate_in_ministry": False}}, False),
+    (ParticipationType.VIDA_CRISTA, "Necessidades locais",
+     {"gender": "brother", "privileges_by_section": {"can_participate_in_life": False}}, False),
+    (ParticipationType.DIRIGENTE, "Dirigente", {"gender": "brother", "privileges": {"can_conduct_cbs": True}}, True),
+    (ParticipationType.LEITOR, "Leitor", {"gender": "sister", "privileges": {"can_read_cbs": True}}, False),
+    (ParticipationType.MINISTERIO, "Iniciando conversas", {"gender": "sister", "is_helper_only": True}, False),
+    (ParticipationType.AJUDANTE, "Ajudante", {"gender": "sister", "is_helper_only": True}, True),
+    (ParticipationType.MINISTERIO, "Iniciando conversas", {"gender": "sister", "is_serving": False}, False),
+]
+
+
+@pytest.mark.parametrize("part_type, title, fields, eligible", PRIVILEGE_CASES)
+def test_privileges(part_type, title, fields, eligible):
+    fields = {"gender": "sister", "condition": "Publicador", **fields}
+    publishers = [Publisher(id="p", name="Ana", **fields)]
+    matrix = EligibilityMatrix(publishers)
+
+    assert bool(matrix.part_mask(part_type, title)[0]) is eligible
+    assert bool(apply_rigid_filters(publishers, part_type, title, "2026-10-01", []).eligible) is eligible
+
+
+@pytest.mark.parametrize("flag", ["is_not_qualified", "requested_no_participation"])
+def test_optional_flags_exclude(flag):
+    publishers = [FlaggedPublisher(id="p", name="Ana", gender="sister", condition="Publicador", **{flag: True})]
+    matrix = EligibilityMatrix(publishers)
+
+    assert matrix.eligible(ParticipationType.MINISTERIO, "Iniciando conversas", "2026-10-01") == []
+    assert apply_rigid_filters(publishers, ParticipationType.MINISTERIO, "Iniciando conversas", "2026-10-01", []).eligible == []
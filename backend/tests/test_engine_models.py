@@ -0,0 +1,101 @@
+"""
+Representação compacta do motor: a geração com modelos já convertidos é
+igual à geração com os modelos da API, e os atributos opcionais são lidos
+de qualquer forma de publicador
+"""
+import random
+
+import pytest
+
+from app.core.assignment_engine import (
+    EngineConfig,
+    SolverMode,
+    WeekToSchedule,
+    generate_assignments_range_sync,
+    generate_assignments_sync,
+)
+from app.core.engine_models import (
+    APPROVAL_NEEDED,
+    NOT_QUALIFIED,
+    REQUESTED_NO_PARTICIPATION,
+    publisher_flags,
+    to_engine_participations,
+    to_engine_publishers,
+)
+from app.models.schemas import Participation, ParticipationType, Publisher
+from factories import PARTS, make_participations, make_publishers
+
+
+class FlaggedPublisher(Publisher):
+    """Atributos opcionais como campos do modelo"""
+    is_not_qualified: bool = False
+    requested_no_participation: bool = False
+
+
+class ReviewedPublisher(Publisher):
+    """Atributo opcional calculado (não fica no __dict__ da instância)"""
+
+    @property
+    def approval_needed(self) -> bool:
+        return not self.is_baptized
+
+
+def publishers_with_flags(rng: random.Random, count: int):
+    publishers = []
+    for p in make_publishers(rng, count):
+        kind = rng.random()
+        if kind < 0.2:
+            p = FlaggedPublisher(**p.model_dump(), is_not_qualified=rng.random() < 0.5,
+                                 requested_no_participation=rng.random() < 0.5)
+        elif kind < 0.4:
+            p = ReviewedPublisher(**p.model_dump())
+        publishers.append(p)
+    return publishers
+
+
+def history(rng: random.Random, count: int, publishers: int):
+    participations = make_participations(rng, count, publishers)
+    # Data ilegível: descartada nas duas representações
+    participations.append(Participation(id="ilegivel", publisher_name="Nome 1 Silva", week="x", date="ontem",
+                                        part_title="Discurso", type=ParticipationType.TESOUROS))
+    return participations
+
+
+@pytest.mark.parametrize("solver", list(SolverMode))
+@pytest.mark.parametrize("seed", range(3))
+def test_converted_inputs_generate_the_same_assignments(seed, solver):
+    rng = random.Random(seed)
+    publishers = publishers_with_flags(rng, 50)
+    participations = history(rng, 500, 50)
+    engine_publishers = to_engine_publishers(publishers)
+    engine_participations = to_engine_participations(participations)
+    config = EngineConfig(solver=solver)
+    weeks = [WeekToSchedule(f"2026-W{40 + i}", f"2026-10-{1 + 7 * i:02d}", PARTS) for i in range(3)]
+
+    assert generate_assignments_sync("2026-W40", "2026-10-01", PARTS, engine_publishers, engine_participations, config) \
+        == generate_assignments_sync("2026-W40", "2026-10-01", PARTS, publishers, participations, config)
+    assert generate_assignments_range_sync(weeks, engine_publishers, engine_participations, config) \
+        == generate_assignments_range_sync(weeks, publishers, participations, config)
+
+
+def test_conversion_keeps_converted_values_and_drops_bad_dates():
+    rng = random.Random(0)
+    publishers = make_publishers(rng, 5)
+    participations = history(rng, 20, 5)
+
+    engine_publishers = to_engine_publishers(publishers)
+    engine_participations = to_engine_participations(participations)
+
+    assert to_engine_publishers(engine_publishers) == engine_publishers
+    assert all(a is b for a, b in zip(to_engine_publishers(engine_publishers), engine_publishers))
+    assert to_engine_participations(engine_participations) == engine_participations
+    assert len(engine_participations) == len(participations) - 1
+
+
+def test_optional_flags_from_fields_properties_and_plain_objects():
+    base = dict(id="p", name="Ana", gender="sister", condition="Publicador")
+
+    assert publisher_flags(Publisher(**base)) & (NOT_QUALIFIED | REQUESTED_NO_PARTICIPATION | APPROVAL_NEEDED) == 0
+    assert publisher_flags(FlaggedPublisher(**base, is_not_qualified=True)) & NOT_QUALIFIED
+    assert publisher_flags(ReviewedPublisher(**base, is_baptized=False)) & APPROVAL_NEEDED
+    assert not publisher_flags(ReviewedPublisher(**base, is_baptized=True)) & APPROVAL_NEEDED
@@ -0,0 +1,117 @@
+"""
+Pool de processos: worker que morre durante a chamada e rotas que enviam
+trabalho de CPU ao pool
+"""
+import asyncio
+import os
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import assignments
+from app.core import executors
+from app.core.executors import WorkerCrashed, get_process_pool, run_cpu, shutdown_executors
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def pools(monkeypatch):
+    monkeypatch.setenv("RVM_OFFLOAD", "1")
+    monkeypatch.setenv("RVM_CPU_WORKERS", "1")
+    yield
+    shutdown_executors()
+
+
+def test_crash_raises_and_replaces_pool():
+    broken = get_process_pool()
+    with pytest.raises(WorkerCrashed):
+        asyncio.run(run_cpu(os._exit, 1))
+
+    # Pool novo já instalado e funcional
+    assert executors._process_pool is not None
+    assert executors._process_pool is not broken
+    assert asyncio.run(run_cpu(abs, -3)) == 3
+
+
+def test_crash_is_not_retried_in_process(monkeypatch):
+    calls = []
+    monkeypatch.setattr(executors, "get_io_executor", lambda: calls.append(1))
+    with pytest.raises(WorkerCrashed):
+        asyncio.run(run_cpu(os._exit, 1))
+    assert calls == []
+
+
+def test_route_answers_503(monkeypatch):
+    async def crashed(*args, **kwargs):
+        raise WorkerCrashed("Processo de cálculo encerrado inesperadamente; tente novamente")
+
+    monkeypatch.setattr(assignments, "run_cpu", crashed)
+    response = TestClient(app).post("/api/assignments/filter-test", json={
+        "publishers": [], "part_type": "leitura", "part_title": "Leitura da Bíblia", "date": "2026-10-05",
+    })
+    assert response.status_code == 503
+    assert "tente novamente" in response.json()["detail"]
+
+
+# ============================================================================
+# Trabalho de CPU das rotas no pool de processos
+# ============================================================================
+
+def inline_recorder(calls):
+    async def run(func, *args, **kwargs):
+        calls.append(func.__name__)
+        return func(*args, **kwargs)
+    return run
+
+
+def test_generation_converts_inputs_in_the_worker(service, monkeypatch):
+    from factories import make_participations, make_publishers
+
+    rng = random.Random(0)
+    publishers = make_publishers(rng, 12)
+    body = {
+        "publishers": [p.model_dump(mode="json") for p in publishers],
+        "participations": [p.model_dump(mode="json") for p in make_participations(rng, 40, len(publishers))],
+    }
+    cpu_calls, io_calls = [], []
+    monkeypatch.setattr(assignments, "run_cpu", inline_recorder(cpu_calls))
+    monkeypatch.setattr(assignments, "run_io", inline_recorder(io_calls))
+    monkeypatch.setattr(assignments, "get_approval_service", lambda: service)
+    client = TestClient(app)
+
+    single = client.post("/api/assignments/generate", json={**body, "week": "2026-W41", "date": "2026-10-05"})
+    batch = client.post("/api/assignments/generate/batch", json={
+        **body, "weeks": [{"week": "2026-W41", "date": "2026-10-05"}, {"week": "2026-W42", "date": "2026-10-12"}],
+    })
+
+    assert (single.status_code, batch.status_code) == (200, 200)
+    assert cpu_calls == ["generate_assignments_sync", "generate_assignments_range_sync"]
+    assert io_calls == []
+
+
+def test_workbook_extraction_runs_in_the_process_pool(tmp_path, monkeypatch):
+    from app.api import pdf
+    from app.core import extraction_cache
+    from app.core.extraction_cache import ExtractionCache
+    from workbook_pdf import make_workbook_pdf
+
+    cache = ExtractionCache(tmp_path / "cache", max_bytes=10**7)
+    monkeypatch.setattr(extraction_cache, "_cache", cache)
+    cpu_calls = []
+    original = pdf.run_cpu
+
+    async def recorded(func, *args, **kwargs):
+        cpu_calls.append(func.__name__)
+        return await original(func, *args, **kwargs)
+
+    monkeypatch.setattr(pdf, "run_cpu", recorded)
+    client = TestClient(app)
+    upload = {"file": ("mwb.pdf", make_workbook_pdf(2), "application/pdf")}
+
+    first = client.post("/api/pdf/extract/upload", files=upload).json()
+    second = client.post("/api/pdf/extract/upload", files=upload).json()
+
+    assert first["success"] and first == second
+    assert cpu_calls == ["extract_workbook_data"]  # segunda leitura vem do cache
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
@@ -0,0 +1,135 @@
+"""
+Cache de extrações de PDF: chave por conteúdo e versão do extrator,
+remoção LRU pelo tamanho e IDs novos a cada extração da apostila
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import pdf_extractor
+from app.core import extraction_cache
+from app.core.extraction_cache import ExtractionCache
+from workbook_pdf import make_workbook_pdf
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(tmp_path / "cache", max_bytes=10_000)
+
+
+@pytest.fixture
+def global_cache(cache, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "_cache", cache)
+    return cache
+
+
+def counting(calls, value):
+    def compute():
+        calls.append(value)
+        return value
+    return compute
+
+
+def test_hits_by_content_and_version(cache):
+    calls = []
+
+    assert cache.get_or_compute("workbook", "1", b"pdf-a", counting(calls, {"a": 1})) == {"a": 1}
+    assert cache.get_or_compute("workbook", "1", b"pdf-a", counting(calls, {"a": 2})) == {"a": 1}
+    assert cache.get_or_compute("workbook", "2", b"pdf-a", counting(calls, {"a": 3})) == {"a": 3}
+    assert cache.get_or_compute("workbook", "1", b"pdf-b", counting(calls, {"b": 1})) == {"b": 1}
+    assert cache.get_or_compute("history", "1", b"pdf-a", counting(calls, {"h": 1})) == {"h": 1}
+
+    assert len(calls) == 4
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 4, 4)
+    assert stats["by_kind"]["workbook"] == {"hits": 1, "misses": 3}
+
+
+def test_results_rejected_by_should_store_are_not_cached(cache):
+    calls = []
+
+    for _ in range(2):
+        cache.get_or_compute("workbook", "1", b"pdf", counting(calls, {"success": False}),
+                             should_store=lambda value: value["success"])
+
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_corrupt_entry_is_a_miss(cache):
+    digest = ExtractionCache.digest(b"pdf")
+    cache.put("workbook", "1", digest, {"ok": True})
+    cache._path("workbook", "1", digest).write_text("{", encoding="utf-8")
+    calls = []
+
+    assert cache.get_or_compute("workbook", "1", b"pdf", counting(calls, {"ok": 2})) == {"ok": 2}
+    assert cache.get("workbook", "1", digest) == {"ok": 2}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    payload = "x" * 1000
+    probe = ExtractionCache(tmp_path / "probe", max_bytes=10**9)
+    probe.put("k", "1", "probe", payload)
+    entry_size = probe.stats()["bytes"]
+    cache = ExtractionCache(tmp_path / "cache", max_bytes=3 * entry_size)
+
+    for age, name in enumerate(["a", "b", "c"]):
+        cache.put("k", "1", name, payload)
+        os.utime(cache._path("k", "1", name), ns=(age * 10**9, age * 10**9))
+    cache.get("k", "1", "a")  # leitura renova "a": "b" passa a ser a mais antiga
+
+    cache.put("k", "1", "d", payload)
+
+    present = sorted(name for name in "abcd" if cache._path("k", "1", name).exists())
+    assert present == ["a", "c", "d"]
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_clear(cache):
+    for name in ("a", "b"):
+        cache.put("k", "1", name, {"name": name})
+
+    assert cache.clear() == 2
+    assert cache.get("k", "1", "a") is None
+    assert cache.clear() == 0
+
+
+def test_workbook_extraction_is_cached_with_fresh_ids(global_cache, monkeypatch):
+    monkeypatch.setenv("RVM_PDF_WORKERS", "1")
+    pdf = make_workbook_pdf(2)
+    calls = []
+    original = pdf_extractor.extract_workbook_from_pdf
+
+    def counted(source, on_page=None):
+        calls.append(source)
+        return original(source, on_page)
+
+    monkeypatch.setattr(pdf_extractor, "extract_workbook_from_pdf", counted)
+
+    first = pdf_extractor.extract_workbook_parts_cached(pdf)
+    second = pdf_extractor.extract_workbook_parts_cached(pdf)
+
+    assert len(calls) == 1
+    assert first.success and first.totalWeeks == 2
+    assert [r.tituloParte for r in first.records] == [r.tituloParte for r in second.records]
+    assert not {r.id for r in first.records} & {r.id for r in second.records}
+
+    # Falhas não ficam no cache
+    pdf_extractor.extract_workbook_parts_cached(b"nao e pdf")
+    pdf_extractor.extract_workbook_parts_cached(b"nao e pdf")
+    assert len(calls) == 3
+
+
+def test_cache_routes(global_cache):
+    from app.main import app
+
+    client = TestClient(app)
+    global_cache.put("k", "1", "a", {"ok": True})
+    global_cache.get("k", "1", "a")
+
+    stats = client.get("/api/pdf/cache/stats").json()
+    assert (stats["hits"], stats["entries"]) == (1, 1)
+
+    assert client.delete("/api/pdf/cache").json() == {"message": "1 entradas removidas"}
+    assert client.get("/api/pdf/cache/stats").json()["entries"] == 0
@@ -0,0 +1,209 @@
+"""
+Fila de tarefas: execução e resultado, cancelamento, limite da fila,
+listagem limitada, leases entre processos, retenção e encerramento
+"""
+import threading
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import jobs
+from app.core.jobs import Job, JobFile, JobManager, JobQueueFull, JobStatus
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    managers = []
+
+    def make(**kwargs):
+        kwargs.setdefault("lease_interval", 3600)
+        manager = JobManager(tmp_path / "jobs", **kwargs)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+
+@pytest.fixture
+def gate():
+    """Handler que espera ser liberado, passando por pontos de progresso"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def handler(ctx, params):
+        started.set()
+        while not release.is_set():
+            ctx.progress(0, 1)
+            time.sleep(0.01)
+        return {"ok": True}
+
+    handler.release = release
+    handler.started = started
+    return handler
+
+
+def wait(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"tarefa {job_id} não terminou")
+
+
+def test_json_and_file_results(make_manager):
+    manager = make_manager()
+
+    def handler(ctx, params):
+        ctx.progress(1, 2, "Metade")
+        return {"echo": params, "input": ctx.path("input.txt").read_text()}
+
+    manager.register("echo", handler)
+    manager.register("file", lambda ctx, params: JobFile(b"%PDF", "application/pdf", "S-89.pdf"))
+
+    job = wait(manager, manager.submit("echo", {"n": 1}, files={"input.txt": b"abc"}).id)
+    assert (job.status, job.progress, job.message) == (JobStatus.SUCCEEDED, 1.0, "Metade")
+    assert manager.result_path(job).read_text(encoding="utf-8") == '{"echo": {"n": 1}, "input": "abc"}'
+
+    job = wait(manager, manager.submit("file").id)
+    assert manager.result_path(job).read_bytes() == b"%PDF"
+    assert (job.result_media_type, job.result_filename) == ("application/pdf", "S-89.pdf")
+
+
+def test_failures_are_recorded(make_manager):
+    manager = make_manager()
+
+    def handler(ctx, params):
+        raise RuntimeError("PDF inválido")
+
+    manager.register("bad", handler)
+
+    job = wait(manager, manager.submit("bad").id)
+
+    assert (job.status, job.error) == (JobStatus.FAILED, "PDF inválido")
+    assert manager.result_path(job) is None
+    with pytest.raises(ValueError):
+        manager.submit("desconhecido")
+
+
+def test_cancel_queued_and_running(make_manager, gate):
+    manager = make_manager(workers=1)
+    manager.register("gate", gate)
+
+    running = manager.submit("gate")
+    queued = manager.submit("gate")
+    assert gate.started.wait(5)
+
+    manager.cancel(queued.id)
+    assert manager.get(queued.id).status == JobStatus.CANCELLED
+
+    manager.cancel(running.id)
+    assert wait(manager, running.id).status == JobStatus.CANCELLED
+
+
+def test_queue_limit(make_manager, gate):
+    manager = make_manager(workers=1, queue_limit=2)
+    manager.register("gate", gate)
+    manager.submit("gate")
+    manager.submit("gate")
+
+    with pytest.raises(JobQueueFull):
+        manager.submit("gate")
+
+    gate.release.set()
+
+
+def test_list_is_newest_first_and_clamped(make_manager, monkeypatch):
+    manager = make_manager()
+    manager.register("noop", lambda ctx, params: {})
+    ids = []
+    for _ in range(4):
+        ids.append(manager.submit("noop").id)
+        time.sleep(0.01)
+
+    assert [job.id for job in manager.list()] == ids[::-1]
+    assert [job.id for job in manager.list(limit=2)] == ids[:1:-1]
+    assert len(manager.list(limit=0)) == 1
+
+    monkeypatch.setattr(jobs, "MAX_LIST_LIMIT", 3)
+    assert len(manager.list(limit=10_000)) == 3
+
+
+def test_only_jobs_of_dead_owners_are_recovered(make_manager):
+    first = make_manager()
+    orphan = Job(id=str(uuid.uuid4()), kind="noop", status=JobStatus.RUNNING, owner="processo-morto")
+    legacy = Job(id=str(uuid.uuid4()), kind="noop", status=JobStatus.QUEUED)
+    alive = Job(id=str(uuid.uuid4()), kind="noop", status=JobStatus.RUNNING, owner=first.owner)
+    for job in (orphan, legacy, alive):
+        first.job_dir(job.id).mkdir(parents=True)
+        first.save(job)
+
+    second = make_manager()
+
+    assert second.get(orphan.id).status == JobStatus.FAILED
+    assert second.get(legacy.id).status == JobStatus.FAILED
+    assert second.get(alive.id).status == JobStatus.RUNNING  # dono ainda renova o lease
+
+    first.shutdown()  # lease removido: o próximo ciclo de recuperação assume a tarefa
+    second._recover()
+    assert second.get(alive.id).status == JobStatus.FAILED
+
+
+def test_finished_jobs_expire(make_manager):
+    manager = make_manager(retention_hours=1)
+    manager.register("noop", lambda ctx, params: {})
+    job = wait(manager, manager.submit("noop").id)
+
+    assert manager.cleanup() == 0
+    job.finished_at = time.time() - 2 * 3600
+    manager.save(job)
+
+    assert manager.cleanup() == 1
+    assert manager.get(job.id) is None
+    assert not manager.job_dir(job.id).exists()
+
+
+def test_shutdown_fails_pending_jobs(make_manager, gate):
+    manager = make_manager(workers=1)
+    manager.register("gate", gate)
+    running = manager.submit("gate")
+    queued = manager.submit("gate")
+    assert gate.started.wait(5)
+
+    manager.shutdown()
+
+    for job in (running, queued):
+        job = manager.get(job.id)
+        assert job.status == JobStatus.FAILED
+        assert "encerrado" in job.error
+
+
+def test_ids_must_be_uuids(make_manager):
+    manager = make_manager()
+
+    assert manager.get("../jobs") is None
+    assert manager.get(str(uuid.uuid4())) is None
+
+
+def test_routes(make_manager, monkeypatch):
+    from app.main import app
+
+    client = TestClient(app)
+    monkeypatch.setattr(jobs, "_manager", None)
+    assert client.get("/api/jobs/").status_code == 503
+
+    manager = make_manager()
+    manager.register("noop", lambda ctx, params: {"ok": True})
+    job = wait(manager, manager.submit("noop").id)
+    monkeypatch.setattr(jobs, "_manager", manager)
+
+    assert [j["id"] for j in client.get("/api/jobs/").json()] == [job.id]
+    assert client.get(f"/api/jobs/?limit={jobs.MAX_LIST_LIMIT + 1}").status_code == 422
+    assert client.get(f"/api/jobs/{job.id}/result").json() == {"ok": True}
+    assert client.get(f"/api/jobs/{uuid.uuid4()}").status_code == 404
+    assert client.delete(f"/api/jobs/{job.id}").json() == {"message": "Tarefa removida"}
@@ -0,0 +1,112 @@
+"""
+Resolução de nomes em lote: etapas (exato, apelido, normalizado, aproximado),
+confiança, cache por nome bruto e preenchimento dos registros de histórico
+"""
+from difflib import SequenceMatcher
+
+import pytest
+
+from app.api.pdf_parser import ParsedPart, ParsedWeek, convert_to_history_records
+from app.core.name_resolver import NameResolution, NameResolver
+from app.core.publisher_search import fold_text
+
+PUBLISHERS = [
+    {"id": "p1", "name": "Antônio Souza", "aliases": ["Toninho"]},
+    {"id": "p2", "name": "Maria da Conceição", "aliases": []},
+    {"id": "p3", "name": "Jó", "aliases": []},
+    {"id": "p4", "name": "Mariana Lima", "aliases": ["Mari"]},
+]
+
+
+@pytest.fixture
+def resolver():
+    return NameResolver.from_publishers(PUBLISHERS)
+
+
+@pytest.mark.parametrize("raw, publisher_id, method, confidence", [
+    ("Antônio Souza", "p1", "exact", 100),
+    ("  Antônio Souza ", "p1", "exact", 100),
+    ("Toninho", "p1", "alias", 100),
+    ("ANTONIO SOUZA", "p1", "normalized", 95),
+    ("maria da conceicao", "p2", "normalized", 95),
+    ("jo", "p3", "normalized", 95),
+])
+def test_deterministic_stages(resolver, raw, publisher_id, method, confidence):
+    result = resolver.resolve(raw)
+
+    assert (result.publisher_id, result.method, result.confidence) == (publisher_id, method, confidence)
+    assert result.raw_name == raw
+    assert result.status == "HIGH"
+
+
+def test_fuzzy_match_uses_similarity(resolver):
+    result = resolver.resolve("Antonio Sousa")
+
+    expected = round(SequenceMatcher(None, fold_text("Antônio Souza"), "antonio sousa").ratio() * 100)
+    assert (result.publisher_id, result.method, result.confidence) == ("p1", "fuzzy", expected)
+
+
+def test_short_names_are_scored(resolver):
+    # Nomes curtos ainda compartilham o trigrama de início de palavra
+    result = resolver.resolve("Ju")
+
+    assert not result.resolved
+    assert result.confidence == round(SequenceMatcher(None, "jo", "ju").ratio() * 100)
+
+
+def test_below_min_confidence_is_unresolved():
+    strict = NameResolver.from_publishers(PUBLISHERS, min_confidence=99)
+
+    result = strict.resolve("Antonio Sousa")
+
+    assert not result.resolved
+    assert result.method == "unresolved"
+    assert result.confidence > 0
+
+
+@pytest.mark.parametrize("raw", ["", "   ", "---", "Xyzw Qqq"])
+def test_unresolvable(resolver, raw):
+    result = resolver.resolve(raw)
+
+    assert not result.resolved
+    assert result.status == "LOW"
+
+
+def test_status_scale():
+    def status(confidence):
+        return NameResolution("x", "p", "X", confidence, "fuzzy").status
+
+    assert [status(c) for c in (100, 85, 84, 60, 59, 0)] == ["HIGH", "HIGH", "MEDIUM", "MEDIUM", "LOW", "LOW"]
+
+
+def test_resolve_many_dedupes_and_caches(resolver, monkeypatch):
+    calls = []
+    original = resolver._resolve
+
+    def counted(raw_name):
+        calls.append(raw_name)
+        return original(raw_name)
+
+    monkeypatch.setattr(resolver, "_resolve", counted)
+
+    result = resolver.resolve_many(["Toninho", None, "", "Toninho", "Mari", "  "])
+    resolver.resolve("Mari")
+
+    assert list(result) == ["Toninho", "Mari"]
+    assert calls == ["Toninho", "Mari"]
+
+
+def test_history_records_are_resolved(resolver):
+    weeks = [ParsedWeek(label="6-12 de outubro", date="2026-10-06", parts=[
+        ParsedPart(section="MINISTERIO", title="Iniciando conversas", student="ANTONIO SOUZA", assistant="Mari"),
+        ParsedPart(section="MINISTERIO", title="Cultivando o interesse", student="Fulano Desconhecido", assistant=None),
+        ParsedPart(section="TESOUROS", title="Leitura", student=None, assistant=None),
+    ])]
+
+    records = convert_to_history_records(weeks, "lote", resolver)
+
+    assert len(records) == 2
+    assert (records[0]["resolvedPublisherId"], records[0]["matchConfidence"]) == ("p1", 95)
+    assert records[0]["rawPublisherName"] == "ANTONIO SOUZA"
+    assert "resolvedPublisherId" not in records[1]
+    assert "resolvedPublisherId" not in convert_to_history_records(weeks, "lote")[0]
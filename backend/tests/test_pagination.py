@@ -0,0 +1,149 @@
+"""
+Listagens de designações: paginação por chave (week_id, created_at, id)
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import assignments
+from app.core.approval_service import ApprovalService, decode_cursor, encode_cursor
+from app.core.assignment_engine import ApprovalStatus
+from app.main import app
+
+TABLE = "scheduled_assignments"
+
+
+def make_rows():
+    """Duas semanas; algumas linhas sem created_at e várias com o mesmo created_at"""
+    rows = []
+    for week in ("2026-W41", "2026-W42"):
+        for i in range(7):
+            created_at = None if i < 2 else f"2026-10-0{1 + i // 3}T12:00:00"
+            rows.append({
+                "id": f"{week}-{i:02d}",
+                "week_id": week,
+                "part_id": f"{week}-parte-{i}",
+                "part_title": f"Parte {i}",
+                "part_type": "MINISTERIO",
+                "teaching_category": "TEACHING",
+                "principal_publisher_id": None,
+                "principal_publisher_name": "Ana",
+                "secondary_publisher_name": None,
+                "date": "2026-10-05",
+                "status": "PENDING_APPROVAL",
+                "selection_reason": "teste",
+                "score": 1.0,
+                "approved_by_elder_name": None,
+                "rejection_reason": None,
+                "created_at": created_at,
+            })
+    return rows
+
+
+def expected_order(rows):
+    return [r["id"] for r in sorted(rows, key=lambda r: (r["week_id"], r["created_at"] is not None, r["created_at"] or "", r["id"]))]
+
+
+@pytest.fixture
+def memory_service():
+    from app.core.approval_service import _row_to_stored
+
+    svc = ApprovalService(use_supabase=False)
+    for row in make_rows():
+        svc._memory_storage[row["id"]] = _row_to_stored(row)
+    return svc
+
+
+@pytest.fixture(params=["postgrest", "memory"])
+def paged_service(request, service, postgrest, memory_service):
+    if request.param == "memory":
+        return memory_service
+    postgrest.tables[TABLE].extend(make_rows())
+    return service
+
+
+def collect(service, week_id=None, limit=3):
+    ids, cursor, pages = [], None, 0
+    while True:
+        if week_id is None:
+            page = asyncio.run(service.list_pending_page_async(limit, cursor))
+        else:
+            page = asyncio.run(service.list_week_page_async(week_id, limit, cursor))
+        ids.extend(row["id"] for row in page.rows)
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 14])
+def test_pending_pages_cover_every_row_once(paged_service, limit):
+    ids, _ = collect(paged_service, limit=limit)
+    assert ids == expected_order(make_rows())
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4])
+def test_week_pages_with_null_created_at(paged_service, limit):
+    ids, _ = collect(paged_service, week_id="2026-W42", limit=limit)
+    assert ids == expected_order([r for r in make_rows() if r["week_id"] == "2026-W42"])
+
+
+def test_without_limit_returns_everything(paged_service):
+    page = asyncio.run(paged_service.list_pending_page_async())
+    assert [row["id"] for row in page.rows] == expected_order(make_rows())
+    assert page.next_cursor is None
+
+
+def test_null_created_at_cursor_round_trip():
+    row = {"week_id": "2026-W41", "created_at": None, "id": "a1"}
+    assert decode_cursor(encode_cursor(row)) == ("2026-W41", None, "a1")
+
+
+@pytest.mark.parametrize("cursor", ["não-é-base64", encode_cursor({"week_id": 1, "created_at": None, "id": "a"})])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+# ============================================================================
+# Rotas
+# ============================================================================
+
+@pytest.fixture
+def client(memory_service, monkeypatch):
+    monkeypatch.setattr(assignments, "get_approval_service", lambda: memory_service)
+    return TestClient(app)
+
+
+def test_route_without_limit_keeps_full_list(client):
+    response = client.get("/api/assignments/pending")
+    assert response.status_code == 200
+    assert len(response.json()) == 14
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_route_paginates_with_limit(client):
+    ids, cursor = [], None
+    while True:
+        response = client.get("/api/assignments/week/2026-W41", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert ids == expected_order([r for r in make_rows() if r["week_id"] == "2026-W41"])
+
+
+def test_route_rejects_invalid_cursor(client):
+    assert client.get("/api/assignments/pending", params={"cursor": "xyz"}).status_code == 400
+
+
+def test_cors_exposes_next_cursor(client):
+    response = client.get(
+        "/api/assignments/pending",
+        params={"limit": 1},
+        headers={"Origin": "http://localhost:5173"},
+    )
+    assert "X-Next-Cursor" in response.headers
+    assert "x-next-cursor" in response.headers["Access-Control-Expose-Headers"].lower()
@@ -0,0 +1,107 @@
+"""
+Índice do histórico de participações: mesmas respostas da varredura linear
+que ele substituiu
+"""
+import random
+from datetime import datetime
+
+import pytest
+
+from app.core.assignment_engine import calculate_cooldown_penalty, calculate_days_since_last, DEFAULT_CONFIG
+from app.core.engine_models import to_engine_participations
+from app.core.participation_index import ParticipationIndex, parse_date_ordinal
+from app.models.schemas import Participation, ParticipationType
+from factories import TITLES, make_participations
+
+
+def participation(name: str, title: str, date: str) -> Participation:
+    return Participation(
+        id=f"{name}-{date}", publisher_name=name, week=date, date=date,
+        part_title=title, type=ParticipationType.TESOUROS,
+    )
+
+
+def scan_last_date(participations, name, title=None):
+    """Varredura linear de referência"""
+    ordinals = [
+        datetime.fromisoformat(p.date).toordinal()
+        for p in participations
+        if p.publisher_name.lower() == name.lower()
+        and (title is None or p.part_title.lower() == title.lower())
+    ]
+    return max(ordinals, default=None)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_linear_scan(seed):
+    rng = random.Random(seed)
+    history = make_participations(rng, 400, publishers=30)
+    index = ParticipationIndex(history)
+
+    assert len(index) == len(history)
+    for i in range(40):  # inclui nomes que nunca participaram
+        name = f"Nome {i} Silva"
+        assert index.last_date(name) == scan_last_date(history, name)
+        assert index.dates_for(name) == sorted(
+            datetime.fromisoformat(p.date).toordinal()
+            for p in history if p.publisher_name.lower() == name.lower()
+        )
+        for title in TITLES:
+            assert index.last_part_date(name, title) == scan_last_date(history, name, title)
+
+
+def test_engine_participations_build_the_same_index():
+    history = make_participations(random.Random(7), 200, publishers=20)
+    from_models = ParticipationIndex(history)
+    from_engine = ParticipationIndex(to_engine_participations(history))
+
+    for i in range(20):
+        name = f"Nome {i} Silva"
+        assert from_engine.dates_for(name) == from_models.dates_for(name)
+        for title in TITLES:
+            assert from_engine.last_part_date(name, title) == from_models.last_part_date(name, title)
+
+
+def test_names_and_titles_are_case_insensitive():
+    index = ParticipationIndex([participation("Ana Souza", "Leitura da Bíblia", "2026-01-08")])
+
+    assert index.last_date("ANA SOUZA") == index.last_date("ana souza") is not None
+    assert index.last_part_date("Ana Souza", "LEITURA DA BÍBLIA") is not None
+
+
+def test_unreadable_dates_are_ignored():
+    index = ParticipationIndex()
+
+    assert index.add("Ana", "Discurso", "08/01/2026") is False
+    assert index.add("Ana", "Discurso", "") is False
+    assert len(index) == 0
+    assert index.last_date("Ana") is None
+    assert parse_date_ordinal("não é data") is None
+
+
+def test_incremental_add_keeps_dates_sorted():
+    index = ParticipationIndex()
+    for date in ["2026-03-05", "2026-01-08", "2026-02-12"]:
+        index.add_participation(participation("Ana", "Discurso", date))
+
+    assert index.dates_for("Ana") == sorted(index.dates_for("Ana"))
+    assert index.last_date("Ana") == parse_date_ordinal("2026-03-05")
+    assert index.last_part_date("Ana", "Discurso") == parse_date_ordinal("2026-03-05")
+
+
+def test_calculations_use_the_index():
+    history = [
+        participation("Ana", "Discurso", "2026-01-01"),
+        participation("Ana", "Leitura da Bíblia", "2026-01-29"),
+    ]
+    reference = datetime(2026, 2, 5)
+    index = ParticipationIndex(history)
+
+    assert calculate_days_since_last("Ana", history, reference) == 7
+    assert calculate_days_since_last("Ana", [], reference, index=index) == 7
+    assert calculate_days_since_last("Bia", history, reference) == 9999
+
+    # Cooldown: mesma parte dentro da janela de semanas
+    assert calculate_cooldown_penalty("Ana", "Leitura da Bíblia", history, DEFAULT_CONFIG, reference_date=reference) \
+        == DEFAULT_CONFIG.cooldown_penalty_points
+    assert calculate_cooldown_penalty("Ana", "Oração Final", history, DEFAULT_CONFIG, reference_date=reference) == 0
@@ -0,0 +1,100 @@
+"""
+Índice de busca de publicadores: mesmo resultado de uma varredura completa,
+sem distinguir acentos, com ordem por relevância
+"""
+import random
+
+import pytest
+
+from app.core import publisher_search, repository, storage
+from app.core.publisher_search import PublisherSearchIndex, _match_rank, fold_text, get_publisher_search_index
+from app.core.storage import SqliteBackend
+
+FIRST = ["Antônio", "Antonio", "João", "Joana", "Ângela", "Ana", "José", "Mário", "Maria", "Luís", "Conceição"]
+LAST = ["Souza", "Sousa", "D'Ávila", "da Silva", "Gonçalves", "Araújo", "Lima"]
+
+
+def people(rng: random.Random, count: int):
+    return [
+        {
+            "name": f"{rng.choice(FIRST)} {rng.choice(LAST)}",
+            "aliases": [rng.choice(FIRST)] if rng.random() < 0.3 else [],
+        }
+        for _ in range(count)
+    ]
+
+
+def scan(publishers, query):
+    """Varredura completa de referência com as mesmas regras de ordem"""
+    folded = fold_text(query)
+    if not folded:
+        return []
+    best = {}
+    for position, p in enumerate(publishers):
+        for n, name in enumerate([p["name"], *p["aliases"]]):
+            rank = _match_rank(fold_text(name), folded) if fold_text(name) else None
+            if rank is not None:
+                best[position] = min(best.get(position, (rank, n > 0)), (rank, n > 0))
+    return [publishers[pos] for pos in sorted(best, key=lambda pos: (best[pos], pos))]
+
+
+def test_fold_text():
+    assert fold_text("  Antônio  D'Ávila ") == "antonio d avila"
+    assert fold_text("CONCEIÇÃO") == "conceicao"
+    assert fold_text("") == ""
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_search_matches_full_scan(seed):
+    rng = random.Random(seed)
+    publishers = people(rng, 80)
+    index = PublisherSearchIndex(publishers)
+    queries = ["an", "Antonio", "ANTÔNIO SOUZA", "sou", "d'avila", "silva", "a", "ção", "xyz", "maria lima", " "]
+
+    for query in queries + [p["name"][2:7] for p in rng.sample(publishers, 10)]:
+        assert index.search(query) == scan(publishers, query), query
+
+
+def test_relevance_order():
+    publishers = [
+        {"name": "Mariana Lima", "aliases": []},
+        {"name": "Ana Maria", "aliases": []},
+        {"name": "Joana", "aliases": ["Ana"]},
+        {"name": "Ana", "aliases": []},
+        {"name": "Ana Souza", "aliases": []},
+    ]
+    index = PublisherSearchIndex(publishers)
+
+    # igual (nome antes de apelido), começa com, palavra começa com, contém
+    assert [p["name"] for p in index.search("ana")] == ["Ana", "Joana", "Ana Maria", "Ana Souza", "Mariana Lima"]
+    assert [p["name"] for p in index.search("ana", limit=2)] == ["Ana", "Joana"]
+
+
+def test_closest():
+    publishers = [{"name": "Antônio Souza", "aliases": ["Toninho"]}, {"name": "Maria Lima", "aliases": []}]
+    index = PublisherSearchIndex(publishers)
+
+    assert index.closest("antonio souza") == (publishers[0], 1.0)
+    assert index.closest("TONINHO") == (publishers[0], 1.0)
+    match, ratio = index.closest("Antonio Sousa")
+    assert match is publishers[0] and 0.8 < ratio < 1
+    assert index.closest("Zzz", min_ratio=0.5) is None
+    assert index.closest("") is None
+
+
+def test_global_index_is_rebuilt_only_after_changes(tmp_path, monkeypatch):
+    backend = SqliteBackend(tmp_path / "rvm.db")
+    monkeypatch.setattr(storage, "_storage", backend)
+    repository.publishers_repository.invalidate()
+    monkeypatch.setattr(publisher_search, "_index", None)
+
+    backend.insert("publishers", {"id": "p1", "name": "Antônio", "gender": "brother", "condition": "Publicador"})
+    first = get_publisher_search_index()
+    assert get_publisher_search_index() is first
+
+    backend.insert("publishers", {"id": "p2", "name": "Joana", "gender": "sister", "condition": "Publicador"})
+    second = get_publisher_search_index()
+    assert second is not first
+    assert [p.id for p in second.search("jo")] == ["p2"]
+
+    repository.publishers_repository.invalidate()
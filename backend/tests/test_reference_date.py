@@ -0,0 +1,86 @@
+"""
+Data de referência do motor: derivada da data da reunião (gerações
+reproduzíveis), datas do histórico memoizadas e datas inválidas rejeitadas
+com 400 pelas rotas
+"""
+import random
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import assignment_engine
+from app.core.assignment_engine import generate_assignments_sync, parse_reference_date
+from app.core.participation_index import parse_date_ordinal
+from app.main import app
+from app.models.schemas import Participation, ParticipationType, Publisher
+from factories import PARTS, make_participations, make_publishers
+
+
+class FrozenClock(datetime):
+    """Relógio fixo bem longe da data da reunião"""
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2031, 5, 20)
+
+
+def test_parse_reference_date():
+    assert parse_reference_date("2026-10-01") == datetime(2026, 10, 1)
+    with pytest.raises(ValueError, match="Data da reunião inválida"):
+        parse_reference_date("01/10/2026")
+
+
+def test_generation_does_not_depend_on_the_clock(monkeypatch):
+    rng = random.Random(5)
+    publishers = make_publishers(rng, 40)
+    history = make_participations(rng, 400, publishers=40)
+
+    def run():
+        return [
+            (a.principal_id, a.secondary_id, a.score, a.reason)
+            for a in generate_assignments_sync("2026-W40", "2026-10-01", PARTS, publishers, history)
+        ]
+
+    today = run()
+    monkeypatch.setattr(assignment_engine, "datetime", FrozenClock)
+
+    assert run() == today
+
+
+def test_days_are_counted_from_the_meeting_date():
+    publishers = [Publisher(id="p1", name="Ana", gender="sister", condition="Publicador")]
+    history = [Participation(
+        id="h1", publisher_name="Ana", week="2026-09-24", date="2026-09-24",
+        part_title="Leitura da Bíblia", type=ParticipationType.TESOUROS,
+    )]
+    parts = [("Iniciando conversas", ParticipationType.MINISTERIO, False)]
+
+    [assignment] = generate_assignments_sync("2026-W40", "2026-10-01", parts, publishers, history)
+
+    assert assignment.principal_id == "p1"
+    assert assignment.reason == "7 dias sem participar"
+
+
+def test_date_parsing_is_memoized():
+    parse_date_ordinal.cache_clear()
+    for _ in range(100):
+        parse_date_ordinal("2026-10-01")
+
+    info = parse_date_ordinal.cache_info()
+    assert (info.misses, info.hits) == (1, 99)
+
+
+# ============================================================================
+# Rotas
+# ============================================================================
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/assignments/generate", {"week": "2026-W40", "date": "01/10/2026"}),
+    ("/api/assignments/generate/batch", {"weeks": [{"week": "2026-W40", "date": "2026-10-01"}, {"week": "2026-W41", "date": "outubro"}]}),
+    ("/api/jobs/schedule", {"weeks": [{"week": "2026-W40", "date": ""}]}),
+])
+def test_invalid_meeting_date_is_a_bad_request(path, body):
+    response = TestClient(app).post(path, json={**body, "publishers": [], "participations": []})
+
+    assert response.status_code == 400
+    assert "Data da reunião inválida" in response.json()["detail"]
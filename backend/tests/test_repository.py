@@ -0,0 +1,100 @@
+"""
+Repositório em cache: modelos validados uma vez e recarregados só quando o
+token de versão da coleção muda (escrita local ou de outro processo)
+"""
+import pytest
+
+from app.core.repository import CachedRepository
+from app.core.storage import JsonFileBackend, SqliteBackend
+from app.models.schemas import Publisher
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SqliteBackend(tmp_path / "rvm.db")
+    return JsonFileBackend(tmp_path)
+
+
+def publisher(publisher_id: str, name: str) -> dict:
+    return {"id": publisher_id, "name": name, "gender": "brother", "condition": "Publicador"}
+
+
+def counting_parser(calls):
+    def parse(record):
+        calls.append(record["id"])
+        return Publisher.model_validate(record)
+    return parse
+
+
+def test_models_are_parsed_once(backend):
+    backend.insert("publishers", publisher("p1", "Ana"))
+    calls = []
+    repository = CachedRepository("publishers", counting_parser(calls), lambda: backend)
+
+    for _ in range(5):
+        assert [p.name for p in repository.all()] == ["Ana"]
+        assert repository.get("p1").name == "Ana"
+
+    assert calls == ["p1"]
+
+
+def test_local_writes_invalidate(backend):
+    repository = CachedRepository("publishers", Publisher.model_validate, lambda: backend)
+    generation, _ = repository.snapshot()
+
+    backend.insert("publishers", publisher("p1", "Ana"))
+    assert repository.get("p1").name == "Ana"
+
+    backend.update("publishers", "p1", publisher("p1", "Ana Souza"))
+    assert repository.get("p1").name == "Ana Souza"
+
+    backend.delete("publishers", "p1")
+    assert repository.get("p1") is None
+    assert repository.snapshot()[0] > generation
+
+
+def test_writes_from_another_process_invalidate(tmp_path):
+    ours = SqliteBackend(tmp_path / "rvm.db")
+    theirs = SqliteBackend(tmp_path / "rvm.db")  # outra conexão, contador de escritas próprio
+    repository = CachedRepository("publishers", Publisher.model_validate, lambda: ours)
+    assert repository.all() == []
+
+    theirs.insert("publishers", publisher("p1", "Ana"))
+
+    assert [p.id for p in repository.all()] == ["p1"]
+
+
+def test_week_index_and_first_id_wins(backend):
+    for record in [
+        {"id": "m1", "week": "2026-W40", "date": "2026-10-01"},
+        {"id": "m2", "week": "2026-W41", "date": "2026-10-08"},
+        {"id": "m1", "week": "2026-W42", "date": "2026-10-15"},
+    ]:
+        backend.insert("meetings", record)
+    repository = CachedRepository("meetings", dict, lambda: backend)
+
+    assert repository.get("m1")["week"] == "2026-W40"
+    assert [m["id"] for m in repository.by_week("2026-W41")] == ["m2"]
+    assert repository.by_week("2026-W50") == []
+    assert sorted(repository.weeks()) == ["2026-W40", "2026-W41", "2026-W42"]
+
+
+def test_snapshot_generation_is_stable_without_changes(backend):
+    repository = CachedRepository("publishers", Publisher.model_validate, lambda: backend)
+
+    assert repository.snapshot()[0] == repository.snapshot()[0]
+    repository.invalidate()
+    backend.insert("publishers", publisher("p1", "Ana"))
+    generation, items = repository.snapshot()
+    assert [p.id for p in items] == ["p1"]
+    assert repository.snapshot()[0] == generation
+
+
+def test_returned_lists_are_copies(backend):
+    backend.insert("publishers", publisher("p1", "Ana"))
+    repository = CachedRepository("publishers", Publisher.model_validate, lambda: backend)
+
+    repository.all().clear()
+
+    assert len(repository.all()) == 1
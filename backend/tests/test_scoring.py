@@ -0,0 +1,98 @@
+"""
+Pontuação vetorizada: mesmos scores da fórmula escalar e top-k igual ao
+início da ordenação estável completa
+"""
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.core.assignment_engine import (
+    DEFAULT_CONFIG,
+    ScoredCandidates,
+    TeachingCategory,
+    calculate_cooldown_penalty,
+    calculate_days_since_last,
+    get_weight_for_category,
+    rank_candidates,
+    score_candidates,
+)
+from app.core.engine_models import to_engine_publishers
+from app.core.participation_index import ParticipationIndex
+from factories import TITLES, make_participations, make_publishers
+
+REFERENCE = datetime(2026, 10, 1)
+
+
+def scalar_score(publisher, part_title, category, history, index):
+    """Fórmula escalar: Score = (Dias × Peso) - Penalidade + Bônus"""
+    days = calculate_days_since_last(publisher.name, history, REFERENCE, index=index)
+    cooldown = calculate_cooldown_penalty(publisher.name, part_title, history, DEFAULT_CONFIG, index, REFERENCE)
+    bonus = DEFAULT_CONFIG.bonus_never_participated if days >= 9999 else 0
+    return days * get_weight_for_category(category, DEFAULT_CONFIG) - cooldown + bonus
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scores_match_scalar_formula(seed):
+    rng = random.Random(seed)
+    publishers = to_engine_publishers(make_publishers(rng, 50))
+    history = make_participations(rng, 500, publishers=50)
+    index = ParticipationIndex(history)
+
+    for category in TeachingCategory:
+        for title in TITLES:
+            scored = score_candidates(publishers, title, category, index, DEFAULT_CONFIG, REFERENCE)
+            expected = [scalar_score(p, title, category, history, index) for p in publishers]
+            assert scored.scores.tolist() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_rank_matches_stable_sort(seed):
+    rng = random.Random(seed)
+    publishers = make_publishers(rng, 50)
+    history = make_participations(rng, 300, publishers=50)
+
+    ranked = rank_candidates(publishers, history, "Discurso", TeachingCategory.TEACHING, reference_date=REFERENCE)
+
+    index = ParticipationIndex(history)
+    engine = to_engine_publishers(publishers)
+    scores = [scalar_score(p, "Discurso", TeachingCategory.TEACHING, history, index) for p in engine]
+    expected = sorted(range(len(engine)), key=lambda i: -scores[i])
+    assert [r.publisher.id for r in ranked] == [engine[i].id for i in expected]
+
+
+def scored(values):
+    values = np.array(values, dtype=np.float64)
+    zeros = np.zeros(len(values), dtype=np.int64)
+    return ScoredCandidates(candidates=[], days=zeros, cooldown=zeros, bonus=zeros, scores=values, weight=1.0)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_top_k_is_prefix_of_full_ranking(seed):
+    rng = random.Random(seed)
+    # Poucos valores distintos: muitos empates no limiar
+    candidates = scored([rng.randrange(5) for _ in range(rng.randint(1, 20))])
+    full = candidates.top_k().tolist()
+
+    for k in range(len(full) + 2):
+        assert candidates.top_k(k).tolist() == full[:k]
+
+
+def test_top_k_ties_keep_original_order():
+    assert scored([1, 3, 3, 2, 3]).top_k(2).tolist() == [1, 2]
+    assert scored([1, 3, 3, 2, 3]).top_k(0).tolist() == []
+
+
+def test_candidate_reasons():
+    publishers = to_engine_publishers(make_publishers(random.Random(0), 3))
+    index = ParticipationIndex()
+    index.add(publishers[1].name, "Discurso", "2026-09-24")
+    index.add(publishers[2].name, "Leitura da Bíblia", "2026-09-24")
+
+    result = score_candidates(publishers, "Discurso", TeachingCategory.TEACHING, index, DEFAULT_CONFIG, REFERENCE)
+    never, repeated, other = (result.candidate(i) for i in range(3))
+
+    assert never.reason == "Nunca participou" and never.days_since_last == -1
+    assert repeated.cooldown_penalty == DEFAULT_CONFIG.cooldown_penalty_points
+    assert other.reason == "7 dias sem participar" and other.days_since_last == 7
@@ -0,0 +1,150 @@
+"""
+Estatísticas de publicadores: store incremental igual ao cálculo completo,
+leituras sem recálculo e reconstrução após escritas externas
+"""
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import stats_store, storage
+from app.core.stats_store import PublisherStatsStore, compute_publisher_stats, publisher_stats_id
+from app.core.storage import JsonFileBackend, SqliteBackend
+from factories import make_participations
+
+PARTICIPATIONS = "participations"
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SqliteBackend(tmp_path / "rvm.db")
+    return JsonFileBackend(tmp_path)
+
+
+def records(rng, count, publishers=8):
+    # Poucos dias distintos: datas repetidas por publicador (desempate pela inserção)
+    result = [p.model_dump(mode="json") for p in make_participations(rng, count, publishers)]
+    for r in result:
+        r["date"] = r["week"] = f"2026-0{rng.randint(1, 3)}-0{rng.randint(1, 4)}"
+    # Nomes diferentes que colidem no mesmo id de estatística
+    result[0]["publisher_name"] = "Ana Souza"
+    result[1]["publisher_name"] = "ana souza"
+    return result
+
+
+def reference(all_records):
+    """Mesmas regras de calculate_stats, direto da lista de registros"""
+    by_name = {}
+    for r in all_records:
+        by_name.setdefault(r["publisher_name"], []).append(r)
+    stats = [(len(items), publisher_stats_id(name), name) for name, items in by_name.items()]
+    return sorted(stats, key=lambda s: s[0])
+
+
+def summary(stats):
+    return [(s.total_assignments, s.publisher_id, s.publisher_name, s.last_assignment_date) for s in stats]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_updates_match_full_computation(backend, seed):
+    rng = random.Random(seed)
+    store = PublisherStatsStore(backend)
+    pending = records(rng, 120)
+
+    for step, record in enumerate(pending):
+        store.insert(record)
+        if step % 4 == 3:
+            victim = rng.choice(backend.list_all(PARTICIPATIONS))
+            assert store.delete(victim["id"])
+        if step % 10 == 0:
+            assert summary(store.all()) == summary(compute_publisher_stats(backend))
+
+    assert summary(store.all()) == summary(compute_publisher_stats(backend))
+    expected = reference(backend.list_all(PARTICIPATIONS))
+    assert [(s.total_assignments, s.publisher_id, s.publisher_name) for s in store.all()] == expected
+
+    # Busca por id: nomes que colidem resolvem como na listagem
+    for stats in compute_publisher_stats(backend):
+        first = next(s for s in compute_publisher_stats(backend) if s.publisher_id == stats.publisher_id)
+        assert store.get(stats.publisher_id) == first
+
+
+def test_average_interval(backend):
+    store = PublisherStatsStore(backend)
+    for i, date in enumerate(["2026-01-01", "2026-01-15", "2026-01-08"]):
+        store.insert({"id": f"x{i}", "publisher_name": "Ana", "week": date, "date": date,
+                      "part_title": "Discurso", "type": "Tesouros da Palavra de Deus"})
+
+    stats = store.get("ana")
+    assert stats.total_assignments == 3
+    assert stats.last_assignment_date == "2026-01-15"
+    assert stats.avg_days_between_assignments == 7
+
+
+def test_delete_unknown_id(backend):
+    store = PublisherStatsStore(backend)
+
+    assert store.delete("nao-existe") is False
+    assert store.get("ana") is None
+
+
+def test_reads_do_not_recompute(tmp_path, monkeypatch):
+    backend = SqliteBackend(tmp_path / "rvm.db")
+    for r in records(random.Random(1), 50):
+        backend.insert(PARTICIPATIONS, r)
+    calls = []
+    original = backend.participation_summary
+
+    def counted(publisher_name=None):
+        calls.append(publisher_name)
+        return original(publisher_name)
+
+    monkeypatch.setattr(backend, "participation_summary", counted)
+
+    store = PublisherStatsStore(backend)
+    store.get("ana-souza")
+    for _ in range(5):
+        store.get("nome-1-silva")
+        store.all()
+    assert calls == [None]  # só a carga inicial
+
+    store.insert({"id": "novo", "publisher_name": "Nome 1 Silva", "week": "2026-04-02",
+                  "date": "2026-04-02", "part_title": "Discurso", "type": "Tesouros da Palavra de Deus"})
+    assert calls == [None, "Nome 1 Silva"]  # só o publicador afetado
+    assert store.get("nome-1-silva").last_assignment_date == "2026-04-02"
+
+
+def test_external_write_triggers_rebuild(backend):
+    store = PublisherStatsStore(backend)
+    store.insert({"id": "a", "publisher_name": "Ana", "week": "2026-01-01", "date": "2026-01-01",
+                  "part_title": "Discurso", "type": "Tesouros da Palavra de Deus"})
+
+    # Escrita feita direto no armazenamento (ex.: outro processo)
+    backend.insert(PARTICIPATIONS, {"id": "b", "publisher_name": "Bia", "week": "2026-01-08",
+                                    "date": "2026-01-08", "part_title": "Discurso", "type": "Tesouros da Palavra de Deus"})
+
+    assert store.get("bia") is not None
+    assert summary(store.all()) == summary(compute_publisher_stats(backend))
+
+
+def test_rebuild_route(tmp_path, monkeypatch):
+    from app.main import app
+
+    backend = SqliteBackend(tmp_path / "rvm.db")
+    monkeypatch.setattr(storage, "_storage", backend)
+    monkeypatch.setattr(stats_store, "_stats_store", None)
+    client = TestClient(app)
+
+    created = client.post("/api/assignments/participations", json={
+        "id": "a", "publisher_name": "Ana Souza", "week": "2026-01-01", "date": "2026-01-01",
+        "part_title": "Discurso", "type": "Tesouros da Palavra de Deus",
+    })
+    assert created.status_code == 200
+    assert client.get("/api/assignments/stats/ana-souza").json()["total_assignments"] == 1
+
+    rebuilt = client.post("/api/assignments/stats/rebuild")
+    assert rebuilt.json()["publishers"] == 1
+
+    assert client.delete("/api/assignments/participations/a").status_code == 200
+    assert client.get("/api/assignments/stats/ana-souza").status_code == 404
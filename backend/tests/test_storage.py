@@ -0,0 +1,268 @@
+"""
+Camada de armazenamento: paridade entre SQLite e JSON, id único, migração
+dos ids repetidos, importação única dos JSON legados e consultas indexadas
+"""
+import json
+import random
+import sqlite3
+
+import pytest
+
+from app.core import storage
+from app.core.storage import (
+    COLLECTIONS,
+    LEGACY_IMPORT_KEY,
+    UNIQUE_ID_MIGRATION_KEY,
+    DuplicateIdError,
+    JsonFileBackend,
+    SqliteBackend,
+    import_legacy_json_once,
+)
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    return SqliteBackend(tmp_path / "db" / "rvm.db")
+
+
+@pytest.fixture
+def json_backend(tmp_path):
+    return JsonFileBackend(tmp_path / "json")
+
+
+def record(collection: str, rng: random.Random, record_id: str) -> dict:
+    fields = {key: f"{key}-{rng.randrange(4)}" for key in COLLECTIONS[collection].values()}
+    return {**fields, "id": record_id, "extra": rng.random()}
+
+
+# ============================================================================
+# Paridade SQLite x JSON
+# ============================================================================
+
+@pytest.mark.parametrize("seed", range(5))
+def test_crud_parity(sqlite_backend, json_backend, seed):
+    rng = random.Random(seed)
+    backends = (sqlite_backend, json_backend)
+
+    def both(method, *args):
+        results = []
+        for backend in backends:
+            try:
+                results.append(("ok", getattr(backend, method)(*args)))
+            except DuplicateIdError:
+                results.append(("duplicate", None))
+        assert results[0] == results[1], (method, args)
+        return results[0]
+
+    for _ in range(200):
+        collection = rng.choice(list(COLLECTIONS))
+        record_id = f"r{rng.randrange(15)}"
+        operation = rng.choice(["insert", "insert", "update", "delete", "get", "find"])
+        if operation == "insert":
+            both("insert", collection, record(collection, rng, record_id))
+        elif operation == "update":
+            both("update", collection, record_id, record(collection, rng, record_id))
+        elif operation in ("delete", "get"):
+            both(operation, collection, record_id)
+        else:
+            field = rng.choice(list(COLLECTIONS[collection]))
+            both("find", collection, field, f"{COLLECTIONS[collection][field]}-{rng.randrange(4)}")
+
+    for collection in COLLECTIONS:
+        both("list_all", collection)
+
+
+def test_replace_all_parity(sqlite_backend, json_backend):
+    rng = random.Random(0)
+    for collection in COLLECTIONS:
+        records = [record(collection, rng, f"r{i % 5}") for i in range(12)]
+        counts = [b.replace_all(collection, records) for b in (sqlite_backend, json_backend)]
+
+        assert counts[0] == counts[1]
+        assert sqlite_backend.list_all(collection) == json_backend.list_all(collection)
+
+
+def test_participation_summary_parity(sqlite_backend, json_backend):
+    rng = random.Random(3)
+    records = [record("participations", rng, f"x{i}") for i in range(60)]
+    for backend in (sqlite_backend, json_backend):
+        backend.replace_all("participations", records)
+
+    def without_seq(summary):
+        # first_seq só vale como ordem (seq no SQLite, posição na lista no JSON)
+        return [{k: v for k, v in item.items() if k != "first_seq"} for item in summary]
+
+    assert without_seq(sqlite_backend.participation_summary()) == without_seq(json_backend.participation_summary())
+    name = records[0]["publisher_name"]
+    assert without_seq(sqlite_backend.participation_summary(name)) == without_seq(json_backend.participation_summary(name))
+
+
+# ============================================================================
+# Id único
+# ============================================================================
+
+@pytest.mark.parametrize("kind", ["sqlite", "json"])
+def test_unique_id(kind, sqlite_backend, json_backend):
+    backend = sqlite_backend if kind == "sqlite" else json_backend
+    backend.insert("publishers", {"id": "p1", "name": "Ana"})
+
+    with pytest.raises(DuplicateIdError):
+        backend.insert("publishers", {"id": "p1", "name": "Outra Ana"})
+
+    # Nas demais coleções ids repetidos continuam aceitos (como no JSON legado)
+    backend.insert("participations", {"id": "x1", "publisher_name": "Ana"})
+    backend.insert("participations", {"id": "x1", "publisher_name": "Bia"})
+    assert [r["name"] for r in backend.list_all("publishers")] == ["Ana"]
+    assert backend.get("participations", "x1")["publisher_name"] == "Ana"
+
+
+def old_database(path, publishers):
+    """Banco criado antes do índice único de id (sem a tabela meta)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    with conn:
+        conn.execute(
+            "CREATE TABLE publishers (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT, name TEXT, data TEXT NOT NULL)"
+        )
+        conn.executemany(
+            "INSERT INTO publishers (id, name, data) VALUES (?, ?, ?)",
+            [(p["id"], p["name"], json.dumps(p)) for p in publishers],
+        )
+    conn.close()
+
+
+def test_duplicate_ids_are_moved_aside_once(tmp_path):
+    path = tmp_path / "rvm.db"
+    old_database(path, [
+        {"id": "p1", "name": "Ana"},
+        {"id": "p2", "name": "Bia"},
+        {"id": "p1", "name": "Ana (cópia)"},
+    ])
+
+    backend = SqliteBackend(path)
+
+    assert [p["name"] for p in backend.list_all("publishers")] == ["Ana", "Bia"]
+    conn = sqlite3.connect(str(path))
+    moved = [json.loads(data)["name"] for (data,) in conn.execute("SELECT data FROM publishers_duplicates")]
+    assert moved == ["Ana (cópia)"]
+    marker = json.loads(backend.get_meta(UNIQUE_ID_MIGRATION_KEY.format(collection="publishers")))
+    assert marker["moved_duplicates"] == 1
+
+    # Registrada na tabela meta: reabrir não mexe mais nos dados
+    with conn:
+        conn.execute("DROP INDEX uq_publishers_id")
+        conn.execute("INSERT INTO publishers (id, name, data) VALUES ('p2', 'Bia', '{}')")
+    conn.close()
+    assert len(SqliteBackend(path).list_all("publishers")) == 3
+
+
+# ============================================================================
+# Importação única dos JSON legados
+# ============================================================================
+
+def legacy_files(data_dir, publishers=2, participations=3):
+    data_dir.mkdir(parents=True, exist_ok=True)
+    (data_dir / "publishers.json").write_text(
+        json.dumps([{"id": f"p{i}", "name": f"Nome {i}"} for i in range(publishers)]), encoding="utf-8"
+    )
+    (data_dir / "participations.json").write_text(
+        json.dumps([{"id": f"x{i}", "publisher_name": "Nome 0"} for i in range(participations)]), encoding="utf-8"
+    )
+
+
+def test_legacy_import(sqlite_backend, tmp_path):
+    data_dir = tmp_path / "legacy"
+    legacy_files(data_dir)
+
+    assert import_legacy_json_once(sqlite_backend, data_dir) == {"publishers": 2, "participations": 3}
+    assert len(sqlite_backend.list_all("participations")) == 3
+    assert sqlite_backend.get_meta(LEGACY_IMPORT_KEY) is not None
+    assert sorted(p.name for p in data_dir.iterdir()) == ["participations.json.imported", "publishers.json.imported"]
+
+    # Uma vez só, mesmo com os arquivos de volta e o banco vazio
+    legacy_files(data_dir)
+    sqlite_backend.replace_all("publishers", [])
+    sqlite_backend.replace_all("participations", [])
+    assert import_legacy_json_once(sqlite_backend, data_dir) == {}
+    assert sqlite_backend.is_empty()
+
+
+def test_legacy_import_skips_a_database_with_data(sqlite_backend, tmp_path):
+    data_dir = tmp_path / "legacy"
+    legacy_files(data_dir)
+    sqlite_backend.insert("meetings", {"id": "m1", "week": "2026-W40"})
+
+    assert import_legacy_json_once(sqlite_backend, data_dir) == {}
+
+    # Nada importado: os arquivos não são renomeados
+    assert sqlite_backend.get_meta(LEGACY_IMPORT_KEY) is not None
+    assert (data_dir / "publishers.json").exists()
+    assert sqlite_backend.list_all("publishers") == []
+
+
+def test_failed_legacy_import_leaves_nothing_behind(sqlite_backend, tmp_path, monkeypatch):
+    data_dir = tmp_path / "legacy"
+    legacy_files(data_dir)
+    (data_dir / "meetings.json").write_text("[{", encoding="utf-8")
+
+    # JSON inválido: falha antes de gravar
+    with pytest.raises(ValueError):
+        import_legacy_json_once(sqlite_backend, data_dir)
+    assert sqlite_backend.get_meta(LEGACY_IMPORT_KEY) is None
+    assert (data_dir / "publishers.json").exists()
+
+    # Falha no meio da gravação: a transação inteira é desfeita
+    (data_dir / "meetings.json").write_text("[]", encoding="utf-8")
+    original = SqliteBackend._replace_rows
+    calls = []
+
+    def fail_second_collection(self, conn, collection, records):
+        calls.append(collection)
+        if len(calls) == 2:
+            raise sqlite3.OperationalError("disco cheio")
+        return original(self, conn, collection, records)
+
+    monkeypatch.setattr(SqliteBackend, "_replace_rows", fail_second_collection)
+    with pytest.raises(sqlite3.OperationalError):
+        import_legacy_json_once(sqlite_backend, data_dir)
+    assert sqlite_backend.is_empty()
+    assert sqlite_backend.get_meta(LEGACY_IMPORT_KEY) is None
+    assert (data_dir / "publishers.json").exists()
+
+    # A próxima abertura tenta de novo
+    monkeypatch.setattr(SqliteBackend, "_replace_rows", original)
+    assert import_legacy_json_once(sqlite_backend, data_dir) == {"publishers": 2, "meetings": 0, "participations": 3}
+    assert not (data_dir / "publishers.json").exists()
+
+
+def test_create_storage_imports_on_first_open(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    legacy_files(data_dir)
+    monkeypatch.setattr(storage, "DATA_DIR", data_dir)
+    monkeypatch.setenv("RVM_STORAGE", "sqlite")
+    monkeypatch.setenv("RVM_DATABASE_PATH", str(tmp_path / "rvm.db"))
+
+    backend = storage.create_storage()
+
+    assert [p["id"] for p in backend.list_all("publishers")] == ["p0", "p1"]
+
+
+# ============================================================================
+# Consultas indexadas
+# ============================================================================
+
+@pytest.mark.parametrize("collection, field", [
+    (collection, field) for collection, columns in COLLECTIONS.items() for field in columns
+])
+def test_lookups_use_the_indexes(sqlite_backend, collection, field):
+    conn = sqlite_backend._connection()
+    plan = conn.execute(
+        f"EXPLAIN QUERY PLAN SELECT data FROM {collection} WHERE {field} = ? ORDER BY seq", ("x",)
+    ).fetchall()
+
+    assert any("USING INDEX" in row[-1] for row in plan), plan
+
+
+def test_find_rejects_unindexed_fields(sqlite_backend):
+    with pytest.raises(ValueError):
+        sqlite_backend.find("publishers", "gender", "brother")
@@ -0,0 +1,234 @@
+"""
+Cliente PostgREST assíncrono: novas tentativas (RetryTransport) e um
+cliente por event loop
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from app.core import supabase_client
+from app.core.supabase_client import (
+    NO_RETRY_HEADER,
+    RetryTransport,
+    close_async_supabase,
+    get_async_supabase,
+    without_resend,
+)
+from postgrest_stub import error_response
+
+TABLE = "scheduled_assignments"
+
+
+def fail_first(status: int, method: str, times: int = 1):
+    """Injeção de falha: as primeiras `times` requisições `method` recebem `status`"""
+    seen = []
+
+    def fail(request):
+        if request.method == method and len(seen) < times:
+            seen.append(request)
+            return error_response(status)
+        return None
+
+    return fail
+
+
+@pytest.fixture
+def retrying(postgrest):
+    """Cliente assíncrono do PostgREST falso atrás de RetryTransport sem espera"""
+    return postgrest.async_client(RetryTransport(postgrest.transport(), retries=3, backoff=0))
+
+
+@pytest.fixture
+def row(postgrest):
+    postgrest.tables[TABLE].append({"id": "a1", "week_id": "2026-W41", "status": "DRAFT"})
+
+
+# ============================================================================
+# Novas tentativas
+# ============================================================================
+
+@pytest.mark.parametrize("status", [429, 502, 503, 504])
+def test_get_is_retried(postgrest, retrying, row, status):
+    postgrest.fail = fail_first(status, "GET", times=2)
+
+    result = asyncio.run(retrying.table(TABLE).select("*").eq("id", "a1").execute())
+
+    assert [r["id"] for r in result.data] == ["a1"]
+    assert len(postgrest.requests_to("GET", TABLE)) == 3
+
+
+@pytest.mark.parametrize("status", [429, 502, 503, 504])
+def test_head_is_retried(postgrest, retrying, row, status):
+    postgrest.fail = fail_first(status, "HEAD")
+
+    result = asyncio.run(retrying.table(TABLE).select("id", count="exact", head=True).execute())
+
+    assert result.count == 1
+    assert len(postgrest.requests_to("HEAD", TABLE)) == 2
+
+
+@pytest.mark.parametrize("status", [429, 502, 503, 504])
+def test_patch_is_retried(postgrest, retrying, row, status):
+    postgrest.fail = fail_first(status, "PATCH")
+
+    result = asyncio.run(retrying.table(TABLE).update({"status": "APPROVED"}).eq("id", "a1").execute())
+
+    assert [r["status"] for r in result.data] == ["APPROVED"]
+    assert len(postgrest.requests_to("PATCH", TABLE)) == 2
+
+
+@pytest.mark.parametrize("status", [500, 502, 503, 504])
+def test_post_with_5xx_is_not_retried(postgrest, retrying, status):
+    postgrest.fail = fail_first(status, "POST")
+
+    with pytest.raises(APIError):
+        asyncio.run(retrying.table(TABLE).insert([{"id": "a1"}]).execute())
+
+    assert len(postgrest.requests_to("POST", TABLE)) == 1
+
+
+def test_post_with_429_is_retried(postgrest, retrying):
+    # 429: a requisição foi recusada antes de ser processada
+    postgrest.fail = fail_first(429, "POST")
+
+    asyncio.run(retrying.table(TABLE).insert([{"id": "a1"}]).execute())
+
+    assert len(postgrest.requests_to("POST", TABLE)) == 2
+    assert [r["id"] for r in postgrest.tables[TABLE]] == ["a1"]
+
+
+def test_post_is_retried_when_connection_fails(postgrest, retrying):
+    attempts = []
+
+    def refuse_first(request):
+        if request.method == "POST" and not attempts:
+            attempts.append(request)
+            raise httpx.ConnectError("conexão recusada", request=request)
+        return None
+
+    postgrest.fail = refuse_first
+    asyncio.run(retrying.table(TABLE).insert([{"id": "a1"}]).execute())
+
+    assert [r["id"] for r in postgrest.tables[TABLE]] == ["a1"]
+
+
+def marked_patch(retrying):
+    query = retrying.table(TABLE).update({"status": "APPROVED"}).eq("id", "a1").in_("status", ["DRAFT"])
+    return without_resend(query).execute()
+
+
+def test_marked_patch_is_not_resent_after_a_lost_response(postgrest, retrying, row):
+    def drop_response(request):
+        raise httpx.ReadTimeout("resposta perdida", request=request)
+
+    postgrest.fail = drop_response
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(marked_patch(retrying))
+
+    (patch,) = postgrest.requests_to("PATCH", TABLE)
+    assert NO_RETRY_HEADER not in patch.headers  # a marca não chega ao servidor
+
+
+def test_marked_patch_is_retried_only_before_being_processed(postgrest, retrying, row):
+    postgrest.fail = fail_first(502, "PATCH")
+    with pytest.raises(APIError):
+        asyncio.run(marked_patch(retrying))
+    assert len(postgrest.requests_to("PATCH", TABLE)) == 1
+
+    postgrest.fail = fail_first(429, "PATCH")
+    result = asyncio.run(marked_patch(retrying))
+    assert [r["status"] for r in result.data] == ["APPROVED"]
+    assert len(postgrest.requests_to("PATCH", TABLE)) == 3
+
+
+def test_gives_up_after_retries(postgrest, retrying, row):
+    postgrest.fail = fail_first(502, "GET", times=10)
+
+    with pytest.raises(APIError):
+        asyncio.run(retrying.table(TABLE).select("*").execute())
+
+    assert len(postgrest.requests_to("GET", TABLE)) == 4  # 1 + 3 novas tentativas
+
+
+def test_postgrest_retries_are_not_multiplied(postgrest, retrying, row, monkeypatch):
+    # O postgrest repete leituras com 503 (X-Retry-Count): essas passam direto
+    monkeypatch.setattr("postgrest._async.request_builder.get_retry_delay", lambda *args: 0)
+    postgrest.fail = fail_first(503, "GET", times=5)
+
+    asyncio.run(retrying.table(TABLE).select("*").execute())
+
+    requests = postgrest.requests_to("GET", TABLE)
+    assert len(requests) == 6
+    assert [r.headers.get("X-Retry-Count") for r in requests] == [None] * 4 + ["1", "2"]
+
+
+def test_retry_after_is_respected():
+    transport = RetryTransport(httpx.MockTransport(lambda request: httpx.Response(200)), max_backoff=5)
+
+    assert transport._delay(0, httpx.Response(429, headers={"Retry-After": "2"})) == 2
+    assert transport._delay(0, httpx.Response(429, headers={"Retry-After": "60"})) == 5
+
+
+# ============================================================================
+# Um cliente por event loop
+# ============================================================================
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("VITE_SUPABASE_URL", "http://postgrest.test")
+    monkeypatch.setenv("VITE_SUPABASE_ANON_KEY", "chave-de-teste")
+    yield
+    supabase_client._async_clients.clear()
+
+
+def test_one_client_per_event_loop(credentials):
+    async def clients():
+        return get_async_supabase(), get_async_supabase()
+
+    first, same = asyncio.run(clients())
+    other, _ = asyncio.run(clients())
+
+    assert first is same
+    assert other is not first
+
+    in_thread = []
+    thread = threading.Thread(target=lambda: in_thread.extend(asyncio.run(clients())))
+    thread.start()
+    thread.join()
+    assert in_thread[0] is not first and in_thread[0] is not other
+
+
+def test_client_uses_retry_transport(credentials):
+    async def transport():
+        return get_async_supabase().session._transport
+
+    assert isinstance(asyncio.run(transport()), RetryTransport)
+
+
+def test_close_releases_the_loop_client(credentials):
+    async def open_and_close():
+        client = get_async_supabase()
+        await close_async_supabase()
+        return client, get_async_supabase()
+
+    closed, fresh = asyncio.run(open_and_close())
+
+    assert closed.session.is_closed
+    assert fresh is not closed
+    assert not fresh.session.is_closed
+
+
+def test_clients_of_finished_loops_are_dropped(credentials):
+    import gc
+
+    async def create():
+        get_async_supabase()
+
+    asyncio.run(create())
+    gc.collect()
+
+    assert len(supabase_client._async_clients) == 0
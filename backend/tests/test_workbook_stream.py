@@ -0,0 +1,99 @@
+"""
+Extração da apostila em streaming: mesmas partes da extração completa,
+semanas liberadas assim que a seguinte começa e NDJSON na rota
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import pdf_extractor
+from app.api.pdf_extractor import extract_workbook_from_pdf, iter_workbook_weeks, stream_workbook_from_file
+from workbook_pdf import make_workbook_pdf
+
+
+@pytest.fixture(autouse=True)
+def sequential_pages(monkeypatch):
+    monkeypatch.setenv("RVM_PDF_WORKERS", "1")
+
+
+def without_ids(records):
+    return [{k: v for k, v in r.items() if k != "id"} for r in records]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_stream_matches_full_extraction(tmp_path, seed):
+    path = tmp_path / "mwb.pdf"
+    path.write_bytes(make_workbook_pdf(9, seed))
+
+    lines = [json.loads(line) for line in stream_workbook_from_file(str(path))]
+    full = extract_workbook_from_pdf(str(path))
+
+    weeks, done = lines[:-1], lines[-1]
+    assert [w["type"] for w in weeks] == ["week"] * 9
+    streamed = [r for w in weeks for r in w["records"]]
+    assert without_ids(streamed) == without_ids(r.model_dump() for r in full.records)
+    assert done == {"type": "done", "totalParts": full.totalParts, "totalWeeks": 9, "year": 2026}
+
+
+def page(text, *parts):
+    return text, [{"text": p, "color": 0x5A3C25, "y": float(i)} for i, p in enumerate(parts)]
+
+
+def test_weeks_are_released_when_the_next_one_starts():
+    read = []
+
+    def pages():
+        for number, item in enumerate([
+            page("2026\n5 DE JANEIRO - 11 DE JANEIRO", "1. Discurso (10 min)"),
+            page("", "2. Joias espirituais (10 min)"),  # continuação, sem cabeçalho
+            page("12 DE JANEIRO - 18 DE JANEIRO", "1. Discurso (10 min)"),
+        ]):
+            read.append(number)
+            yield item
+
+    weeks = iter_workbook_weeks(pages())
+
+    year, first = next(weeks)
+    assert (year, first["weekId"], sorted(first["parts"])) == (2026, "2026-01-05", [1, 2])
+    assert read == [0, 1, 2]  # liberada ao ler o cabeçalho seguinte, não ao fim do documento
+
+    _, last = next(weeks)
+    assert last["weekId"] == "2026-01-12"
+    assert next(weeks, None) is None
+
+
+def test_stream_reports_errors(tmp_path):
+    path = tmp_path / "quebrado.pdf"
+    path.write_bytes(b"isto nao e um pdf")
+
+    lines = [json.loads(line) for line in stream_workbook_from_file(str(path))]
+
+    assert [line["type"] for line in lines] == ["error"]
+
+
+def test_stream_route(monkeypatch):
+    from app.main import app
+
+    removed = []
+    original_remove = pdf_extractor.os.remove
+
+    def remove(path):
+        removed.append(path)
+        original_remove(path)
+
+    monkeypatch.setattr(pdf_extractor.os, "remove", remove)
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/workbook/extract-pdf/stream",
+        files={"file": ("mwb.pdf", make_workbook_pdf(3), "application/pdf")},
+    )
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["week", "week", "week", "done"]
+    assert len(removed) == 1  # arquivo temporário apagado ao fim da resposta
+
+    rejected = client.post("/api/workbook/extract-pdf/stream", files={"file": ("mwb.txt", b"x", "text/plain")})
+    assert rejected.status_code == 400
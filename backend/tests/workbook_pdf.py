@@ -0,0 +1,62 @@
+"""
+Apostilas sintéticas em PDF (PyMuPDF): cabeçalho de semana e partes
+numeradas com as cores das seções, como no arquivo original
+"""
+import random
+from typing import List
+
+import fitz  # PyMuPDF
+
+MONTHS = ["janeiro", "fevereiro", "março", "abril", "maio", "junho",
+          "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"]
+
+# (tema, cor da seção)
+PARTS = [
+    ("Discurso (10 min)", 0x5A3C25),
+    ("Joias espirituais (10 min)", 0x5A3C25),
+    ("Leitura da Bíblia (4 min) Mat. 5:1-12", 0x5A3C25),
+    ("Iniciando conversas (3 min) De casa em casa", 0xC18626),
+    ("Cultivando o interesse (4 min) Testemunho informal", 0xC18626),
+    ("Discurso (5 min) Tema da semana", 0xC18626),
+    ("Necessidades locais (15 min)", 0x6D1719),
+    ("Estudo bíblico de congregação (30 min)", 0x6D1719),
+]
+
+
+def _rgb(color: int):
+    return tuple(((color >> shift) & 0xFF) / 255 for shift in (16, 8, 0))
+
+
+def _write(page, y: float, text: str, color: int = 0) -> float:
+    page.insert_text((40, y), text, fontsize=10, color=_rgb(color))
+    return y + 14
+
+
+def make_workbook_pdf(weeks: int, seed: int = 0, year: int = 2026) -> bytes:
+    """
+    Uma semana por página; algumas semanas continuam na página seguinte
+    (partes sem cabeçalho), que o extrator deve atribuir à mesma semana.
+    """
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for w in range(weeks):
+        month = MONTHS[(w // 4) % 12]
+        day = 1 + (w % 4) * 7
+        parts: List[str] = [f"{n}. {text}" for n, (text, _) in enumerate(PARTS, 1)]
+        colors = [color for _, color in PARTS]
+        split = rng.randint(3, len(parts)) if rng.random() < 0.4 else len(parts)
+
+        page = doc.new_page()
+        y = _write(page, 40, f"Apostila Vida e Ministério {year}" if w == 0 else "Apostila Vida e Ministério")
+        y = _write(page, y, f"{day} DE {month.upper()} - {day + 6} DE {month.upper()}")
+        for text, color in zip(parts[:split], colors[:split]):
+            y = _write(page, y, text, color)
+            y = _write(page, y, "Detalhes da parte")
+        if split < len(parts):
+            page = doc.new_page()
+            y = 40
+            for text, color in zip(parts[split:], colors[split:]):
+                y = _write(page, y, text, color)
+    data = doc.tobytes()
+    doc.close()
+    return data
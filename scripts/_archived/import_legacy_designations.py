@@ -19,9 +19,11 @@ import re
 import requests
 from datetime import datetime
 from pathlib import Path
-from difflib import SequenceMatcher
 import sys
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+from app.core.name_resolver import NameResolver
+
 # ==============================================================================
 # Configuração
 # ==============================================================================
@@ -336,27 +338,15 @@ def find_name_for_part(part: dict, pdf_data: dict) -> str | None:
     
     return None
 
-def match_publisher_name(pdf_name: str, publishers: list) -> dict:
-    """Match fuzzy do nome com cadastro"""
-    best_match = None
-    best_ratio = 0
-    
-    pdf_name_lower = pdf_name.lower().strip()
-    
-    for pub in publishers:
-        pub_name = pub.get('name', '')
-        ratio = SequenceMatcher(None, pdf_name_lower, pub_name.lower()).ratio()
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_match = pub
-    
-    status = 'HIGH' if best_ratio >= 0.85 else ('MEDIUM' if best_ratio >= 0.6 else 'LOW')
+def match_publisher_name(pdf_name: str, resolver: NameResolver) -> dict:
+    """Match do nome com cadastro (resolvedor em lote, com cache por nome)"""
+    resolution = resolver.resolve(pdf_name)
     
     return {
         'pdf_name': pdf_name,
-        'matched_publisher': best_match.get('name') if best_match else None,
-        'confidence': round(best_ratio * 100),
-        'status': status
+        'matched_publisher': resolution.publisher_name,
+        'confidence': resolution.confidence,
+        'status': resolution.status
     }
 
 # ==============================================================================
@@ -390,6 +380,7 @@ def main():
     
     publishers = fetch_publishers()
     print(f"[Supabase] {len(publishers)} publicadores carregados")
+    resolver = NameResolver.from_publishers(publishers, min_confidence=0)
     
     # 3. Processar cada parte sem nome
     print("\n[3] PROCESSAMENTO")
@@ -422,7 +413,7 @@ def main():
             continue
         
         # Match com cadastro
-        name_match = match_publisher_name(pdf_name, publishers)
+        name_match = match_publisher_name(pdf_name, resolver)
         name_matches.append(name_match)
         
         # Atualizar
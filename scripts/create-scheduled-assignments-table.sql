@@ -59,6 +59,19 @@ CREATE INDEX idx_scheduled_status ON scheduled_assignments(status);
 CREATE INDEX idx_scheduled_date ON scheduled_assignments(date);
 CREATE INDEX idx_scheduled_principal ON scheduled_assignments(principal_publisher_id);
 
+-- Paginação por chave (backend: week_id, created_at NULLS FIRST, id), por semana e por status
+CREATE INDEX IF NOT EXISTS idx_scheduled_keyset ON scheduled_assignments(week_id, created_at NULLS FIRST, id);
+CREATE INDEX IF NOT EXISTS idx_scheduled_status_keyset ON scheduled_assignments(status, week_id, created_at NULLS FIRST, id);
+
+-- Contagem por status numa única consulta (backend: estatísticas de aprovação)
+CREATE OR REPLACE FUNCTION scheduled_assignments_status_counts()
+RETURNS TABLE (status TEXT, count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT status, count(*) FROM scheduled_assignments GROUP BY status
+$$;
+
 -- Trigger para atualizar updated_at
 CREATE OR REPLACE FUNCTION update_scheduled_assignments_timestamp()
 RETURNS TRIGGER AS $$